@@ -0,0 +1,30 @@
+export const BEDROCK_CONFIG = {
+  // Per model concurrency governor shared by every Bedrock-calling function,
+  // see src/layer/python/data/governor.py. The limit adapts between min and
+  // max: it grows while calls succeed and halves when Bedrock throttles.
+  governor: {
+    initialLimit: 4,
+    minLimit: 1,
+    maxLimit: 32,
+
+    // Seconds a call waits for a slot before failing, API requests time
+    // out after 30 seconds so they give up sooner
+    workflowMaxWait: 120,
+    apiMaxWait: 10,
+
+    // Seconds before a slot held by a caller that died is reclaimed. Must
+    // exceed the longest function timeout (15 minutes), streamed calls
+    // hold their slot until the reply ends.
+    leaseSeconds: 960,
+  },
+
+  // Workflow functions stream model replies. The analyze function parses
+  // the <thinking>/<response> tags as they arrive, failing fast on
+  // malformed output, and writes the partial result to the analysis at
+  // most every flushSeconds so the UI can show progress.
+  streaming: {
+    enabled: true,
+    partialResults: true,
+    flushSeconds: 2,
+  },
+};
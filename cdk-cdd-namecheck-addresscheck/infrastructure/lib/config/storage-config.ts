@@ -8,10 +8,29 @@ export const STORAGE_CONFIG = {
 
       // GSI configuration
       gsi: {
+        // Legacy listing index on the single yearMonth partition. New items
+        // no longer write yearMonth; set enabled to false in a later deploy
+        // to delete it (CloudFormation changes one GSI per update).
         createdAtIndex: {
+          enabled: true,
           partitionKey: "yearMonth",
           sortKey: "createdAt",
         },
+        createdAtShardIndex: {
+          partitionKey: "yearMonthShard",
+          sortKey: "createdAt",
+          // Must match between writers and readers, see ANALYSIS_GSI_SHARDS
+          shardCount: 8,
+          // ANALYSIS_SUMMARY_FIELDS in data/analysis.py besides the keys, so
+          // page content is not copied into the index
+          nonKeyAttributes: [
+            "analysisId",
+            "description",
+            "documentType",
+            "status",
+            "lastUpdatedAt",
+          ],
+        },
       },
     },
   },
@@ -0,0 +1,59 @@
+export const WORKFLOW_CONFIG = {
+  analysis: {
+    // Concurrent ProcessPagesMap iterations per analysis. Bedrock calls are
+    // limited by the concurrency governor (bedrock-config.ts), so this only
+    // needs to be high enough to keep the governor's slots busy.
+    pageConcurrency: 16,
+
+    // Pages per ProcessPagesMap task. Above 1, extract-pdf-content renders
+    // each batch across worker processes and overlaps Bedrock calls; compare
+    // with src/layer/benchmarks/render_benchmark.py before changing.
+    pageBatchSize: 1,
+
+    // extract-pdf-content memory in batch mode. Lambda allocates vCPUs with
+    // memory, 3538 MB gives 2 and 10240 MB gives 6 render workers.
+    batchMemorySize: 3538,
+
+    // Concurrent Bedrock requests within one batch task
+    bedrockConcurrency: 4,
+
+    // Pages sent in one Bedrock request within a batch task. Groups are cut
+    // earlier when the estimated output (pageOutputTokens, then the observed
+    // average) would not fit max_tokens or the page images exceed
+    // maxRequestInputTokens, see utilities/page_batching.py.
+    pagesPerRequest: 4,
+    pageOutputTokens: 700,
+    maxRequestInputTokens: 16000,
+
+    // Pages with a usable text layer (see utilities/text_layer.py): "text"
+    // sends their markdown to the model without an image, "markdown" stores
+    // the conversion without a model call, "off" sends every page as an image.
+    textLayerMode: "text",
+
+    // Reuse extraction results of identical pages (same rendered page, model
+    // and prompt version) for this many days
+    extractionCache: true,
+    extractionCacheDays: 90,
+
+    // The analyze function checks documents whose estimated prompt exceeds
+    // maxPromptTokens in chunks of chunkTokens, concurrency at a time, then
+    // merges the findings. Claude 3.5 Sonnet takes 200k tokens; estimates
+    // are rough (see utilities/chunking.py), so keep a margin.
+    mapReduce: {
+      maxPromptTokens: 150000,
+      chunkTokens: 50000,
+      concurrency: 4,
+    },
+
+    // Page images sent to the model, see utilities/render.py ImageOptions.
+    // format "auto" sends PNG for text pages and JPEG for scans; maxEdge is
+    // the longest edge the model takes without downscaling.
+    image: {
+      dpi: 144,
+      grayscale: false,
+      format: "auto",
+      jpegQuality: 85,
+      maxEdge: 1568,
+    },
+  },
+};
@@ -0,0 +1,45 @@
+import * as cdk from "aws-cdk-lib";
+import * as iam from "aws-cdk-lib/aws-iam";
+import { Construct } from "constructs";
+import { PythonLambda } from "../../../common/lambda/python-lambda";
+import * as path from "path";
+
+interface AppendMessageFunctionProps {
+  tableName: string;
+  commonLayer: cdk.aws_lambda.ILayerVersion;
+}
+
+export class AppendMessageFunction extends Construct {
+  public readonly function: cdk.aws_lambda.Function;
+
+  constructor(scope: Construct, id: string, props: AppendMessageFunctionProps) {
+    super(scope, id);
+
+    // Create Lambda function
+    const lambda = new PythonLambda(this, "Function", {
+      name: "append-message",
+      entry: path.join(__dirname, "../../../../src/api/analysis/append-message"),
+      handler: "append_message.lambda_handler",
+      description: "Appends a chat message to an analysis",
+      environment: {
+        ANALYSIS_TABLE_NAME: props.tableName,
+      },
+      layers: [props.commonLayer],
+      timeout: cdk.Duration.seconds(30),
+      initialPolicy: [
+        // DynamoDB permissions
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: ["dynamodb:GetItem", "dynamodb:PutItem"],
+          resources: [
+            `arn:aws:dynamodb:${cdk.Stack.of(this).region}:${
+              cdk.Stack.of(this).account
+            }:table/${props.tableName}`,
+          ],
+        }),
+      ],
+    });
+
+    this.function = lambda.function;
+  }
+}
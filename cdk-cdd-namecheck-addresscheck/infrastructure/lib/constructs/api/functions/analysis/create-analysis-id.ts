@@ -3,6 +3,7 @@ import * as iam from "aws-cdk-lib/aws-iam";
 import { Construct } from "constructs";
 import { PythonLambda } from "../../../common/lambda/python-lambda";
 import * as path from "path";
+import { STORAGE_CONFIG } from "../../../../config/storage-config";
 
 interface CreateAnalysisIdFunctionProps {
   tableName: string;
@@ -30,6 +31,9 @@ export class CreateAnalysisIdFunction extends Construct {
       description: "Creates a new analysis ID",
       environment: {
         ANALYSIS_TABLE_NAME: props.tableName,
+        ANALYSIS_GSI_SHARDS: String(
+          STORAGE_CONFIG.tables.analysis.gsi.createdAtShardIndex.shardCount
+        ),
       },
       layers: [props.commonLayer],
       timeout: cdk.Duration.seconds(30),
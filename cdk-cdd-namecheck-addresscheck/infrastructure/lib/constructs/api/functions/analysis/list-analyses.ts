@@ -3,6 +3,7 @@ import * as iam from "aws-cdk-lib/aws-iam";
 import { Construct } from "constructs";
 import { PythonLambda } from "../../../common/lambda/python-lambda";
 import * as path from "path";
+import { STORAGE_CONFIG } from "../../../../config/storage-config";
 
 interface ListAnalysesFunctionProps {
   tableName: string;
@@ -23,6 +24,9 @@ export class ListAnalysesFunction extends Construct {
       description: "Lists analyses with pagination",
       environment: {
         ANALYSIS_TABLE_NAME: props.tableName,
+        ANALYSIS_GSI_SHARDS: String(
+          STORAGE_CONFIG.tables.analysis.gsi.createdAtShardIndex.shardCount
+        ),
       },
       layers: [props.commonLayer],
       timeout: cdk.Duration.seconds(30),
@@ -37,7 +41,7 @@ export class ListAnalysesFunction extends Construct {
             }:table/${props.tableName}`,
             `arn:aws:dynamodb:${cdk.Stack.of(this).region}:${
               cdk.Stack.of(this).account
-            }:table/${props.tableName}/index/createdAtIndex`,
+            }:table/${props.tableName}/index/createdAtShardIndex`,
           ],
         }),
       ],
@@ -4,33 +4,33 @@ import { Construct } from "constructs";
 import { PythonLambda } from "../../../common/lambda/python-lambda";
 import * as path from "path";
 
-interface UpdateStatusFunctionProps {
+interface ListMessagesFunctionProps {
   tableName: string;
   commonLayer: cdk.aws_lambda.ILayerVersion;
 }
 
-export class UpdateStatusFunction extends Construct {
+export class ListMessagesFunction extends Construct {
   public readonly function: cdk.aws_lambda.Function;
 
-  constructor(scope: Construct, id: string, props: UpdateStatusFunctionProps) {
+  constructor(scope: Construct, id: string, props: ListMessagesFunctionProps) {
     super(scope, id);
 
+    // Create Lambda function
     const lambda = new PythonLambda(this, "Function", {
-      name: "update-onboarding-status",
-      entry: path.join(
-        __dirname,
-        "../../../../../lib/src/workflow/onboarding/update-status"
-      ),
-      handler: "index.lambda_handler",
-      description: "Updates onboarding request status",
+      name: "list-messages",
+      entry: path.join(__dirname, "../../../../src/api/analysis/list-messages"),
+      handler: "list_messages.lambda_handler",
+      description: "Lists chat messages of an analysis with pagination",
       environment: {
-        ONBOARDING_TABLE_NAME: props.tableName,
+        ANALYSIS_TABLE_NAME: props.tableName,
       },
-      timeout: cdk.Duration.minutes(1),
+      layers: [props.commonLayer],
+      timeout: cdk.Duration.seconds(30),
       initialPolicy: [
+        // DynamoDB read permissions
         new iam.PolicyStatement({
           effect: iam.Effect.ALLOW,
-          actions: ["dynamodb:UpdateItem"],
+          actions: ["dynamodb:Query", "dynamodb:GetItem"],
           resources: [
             `arn:aws:dynamodb:${cdk.Stack.of(this).region}:${
               cdk.Stack.of(this).account
@@ -38,7 +38,6 @@ export class UpdateStatusFunction extends Construct {
           ],
         }),
       ],
-      layers: [props.commonLayer],
     });
 
     this.function = lambda.function;
@@ -3,6 +3,7 @@ import { Construct } from "constructs";
 import * as cdk from "aws-cdk-lib";
 import * as iam from "aws-cdk-lib/aws-iam";
 import { PythonLambda } from "../../../common/lambda/python-lambda";
+import { BEDROCK_CONFIG } from "../../../../config/bedrock-config";
 
 // Constants for Bedrock resources
 const BEDROCK_MODEL_ID = "anthropic.claude-3-5-sonnet-20240620-v1:0";
@@ -11,6 +12,7 @@ const BEDROCK_PROMPT_ID =
 
 export interface GenerateEmailLambdaProps {
   commonLayer: cdk.aws_lambda.ILayerVersion;
+  governorTableName: string;
 }
 
 export class GenerateEmailLambda extends Construct {
@@ -29,10 +31,30 @@ export class GenerateEmailLambda extends Construct {
       description: "Generates email content for onboarding communications",
       environment: {
         POWERTOOLS_SERVICE_NAME: "onboarding-email-generator",
+        GOVERNOR_TABLE_NAME: props.governorTableName,
+        GOVERNOR_INITIAL_LIMIT: String(BEDROCK_CONFIG.governor.initialLimit),
+        GOVERNOR_MIN_LIMIT: String(BEDROCK_CONFIG.governor.minLimit),
+        GOVERNOR_MAX_LIMIT: String(BEDROCK_CONFIG.governor.maxLimit),
+        GOVERNOR_MAX_WAIT: String(BEDROCK_CONFIG.governor.apiMaxWait),
+        GOVERNOR_LEASE_SECONDS: String(BEDROCK_CONFIG.governor.leaseSeconds),
       },
       layers: [props.commonLayer],
       timeout: cdk.Duration.seconds(30),
       initialPolicy: [
+        // Bedrock concurrency governor
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: [
+            "dynamodb:GetItem",
+            "dynamodb:PutItem",
+            "dynamodb:UpdateItem",
+          ],
+          resources: [
+            `arn:aws:dynamodb:${cdk.Stack.of(this).region}:${
+              cdk.Stack.of(this).account
+            }:table/${props.governorTableName}`,
+          ],
+        }),
         new iam.PolicyStatement({
           effect: iam.Effect.ALLOW,
           actions: ["bedrock:InvokeModel"],
@@ -45,7 +67,8 @@ export class GenerateEmailLambda extends Construct {
         new iam.PolicyStatement({
           effect: iam.Effect.ALLOW,
           actions: ["bedrock:GetPrompt"],
-          resources: [BEDROCK_PROMPT_ID],
+          // Versioned ARNs for a pinned PROMPT_VERSION
+          resources: [BEDROCK_PROMPT_ID, `${BEDROCK_PROMPT_ID}:*`],
         }),
       ],
     });
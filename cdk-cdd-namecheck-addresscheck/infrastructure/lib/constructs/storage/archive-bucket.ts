@@ -0,0 +1,42 @@
+import * as cdk from "aws-cdk-lib";
+import * as s3 from "aws-cdk-lib/aws-s3";
+import { Construct } from "constructs";
+
+export class ArchiveBucket extends Construct {
+  public readonly bucket: s3.Bucket;
+
+  constructor(scope: Construct, id: string) {
+    super(scope, id);
+
+    // Create S3 bucket for analyses expired from the analysis table
+    this.bucket = new s3.Bucket(this, "Bucket", {
+      encryption: s3.BucketEncryption.S3_MANAGED,
+      enforceSSL: true,
+      blockPublicAccess: s3.BlockPublicAccess.BLOCK_ALL,
+      lifecycleRules: [
+        {
+          enabled: true,
+          transitions: [
+            {
+              storageClass: s3.StorageClass.GLACIER_INSTANT_RETRIEVAL,
+              transitionAfter: cdk.Duration.days(180),
+            },
+          ],
+        },
+      ],
+      removalPolicy: cdk.RemovalPolicy.RETAIN,
+      autoDeleteObjects: false,
+    });
+
+    // Add stack outputs
+    new cdk.CfnOutput(this, "BucketName", {
+      value: this.bucket.bucketName,
+      description: "Analysis archive S3 bucket name",
+    });
+
+    new cdk.CfnOutput(this, "BucketArn", {
+      value: this.bucket.bucketArn,
+      description: "Analysis archive S3 bucket ARN",
+    });
+  }
+}
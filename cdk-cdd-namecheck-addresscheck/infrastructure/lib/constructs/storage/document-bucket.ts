@@ -1,6 +1,7 @@
 import * as cdk from "aws-cdk-lib";
 import * as s3 from "aws-cdk-lib/aws-s3";
 import { Construct } from "constructs";
+import { WORKFLOW_CONFIG } from "../../config/workflow-config";
 
 export class DocumentBucket extends Construct {
   public readonly bucket: s3.Bucket;
@@ -18,6 +19,20 @@ export class DocumentBucket extends Construct {
           enabled: true,
           noncurrentVersionExpiration: cdk.Duration.days(30),
         },
+        {
+          // Single-page PDFs split for page tasks, only needed while an analysis runs
+          enabled: true,
+          prefix: "pages/",
+          expiration: cdk.Duration.days(7),
+          noncurrentVersionExpiration: cdk.Duration.days(1),
+        },
+        {
+          // Page extraction results reused for identical pages
+          enabled: true,
+          prefix: "extraction-cache/",
+          expiration: cdk.Duration.days(WORKFLOW_CONFIG.analysis.extractionCacheDays),
+          noncurrentVersionExpiration: cdk.Duration.days(1),
+        },
       ],
       cors: [
         {
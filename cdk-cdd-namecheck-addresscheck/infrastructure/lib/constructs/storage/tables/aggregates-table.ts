@@ -0,0 +1,37 @@
+import * as cdk from "aws-cdk-lib";
+import * as dynamodb from "aws-cdk-lib/aws-dynamodb";
+import { Construct } from "constructs";
+
+export class AggregatesTable extends Construct {
+  public readonly table: dynamodb.Table;
+
+  constructor(scope: Construct, id: string) {
+    super(scope, id);
+
+    // Create DynamoDB table holding per-day counters, pk DAY#yyyy-mm-dd, sk TYPE#documentType
+    this.table = new dynamodb.Table(this, "Table", {
+      partitionKey: {
+        name: "pk",
+        type: dynamodb.AttributeType.STRING,
+      },
+      sortKey: {
+        name: "sk",
+        type: dynamodb.AttributeType.STRING,
+      },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      removalPolicy: cdk.RemovalPolicy.RETAIN,
+      pointInTimeRecovery: true,
+    });
+
+    // Add stack outputs
+    new cdk.CfnOutput(this, "TableName", {
+      value: this.table.tableName,
+      description: "Aggregates DynamoDB table name",
+    });
+
+    new cdk.CfnOutput(this, "TableArn", {
+      value: this.table.tableArn,
+      description: "Aggregates DynamoDB table ARN",
+    });
+  }
+}
@@ -1,6 +1,7 @@
 import * as cdk from "aws-cdk-lib";
 import * as dynamodb from "aws-cdk-lib/aws-dynamodb";
 import { Construct } from "constructs";
+import { STORAGE_CONFIG } from "../../../config/storage-config";
 
 export class AnalysisTable extends Construct {
   public readonly table: dynamodb.Table;
@@ -25,18 +26,38 @@ export class AnalysisTable extends Construct {
       stream: dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
     });
 
-    // Add GSI for listing analyses by creation date
+    const gsi = STORAGE_CONFIG.tables.analysis.gsi;
+
+    // Legacy GSI for listing analyses by creation date, no longer written
+    if (gsi.createdAtIndex.enabled) {
+      this.table.addGlobalSecondaryIndex({
+        indexName: "createdAtIndex",
+        partitionKey: {
+          name: gsi.createdAtIndex.partitionKey,
+          type: dynamodb.AttributeType.STRING,
+        },
+        sortKey: {
+          name: gsi.createdAtIndex.sortKey,
+          type: dynamodb.AttributeType.STRING,
+        },
+        projectionType: dynamodb.ProjectionType.ALL,
+      });
+    }
+
+    // Write-sharded listing index, yearMonth#shard spreads a month's creates
+    // over ANALYSIS_GSI_SHARDS partitions
     this.table.addGlobalSecondaryIndex({
-      indexName: "createdAtIndex",
+      indexName: "createdAtShardIndex",
       partitionKey: {
-        name: "yearMonth",
+        name: gsi.createdAtShardIndex.partitionKey,
         type: dynamodb.AttributeType.STRING,
       },
       sortKey: {
-        name: "createdAt",
+        name: gsi.createdAtShardIndex.sortKey,
         type: dynamodb.AttributeType.STRING,
       },
-      projectionType: dynamodb.ProjectionType.ALL,
+      projectionType: dynamodb.ProjectionType.INCLUDE,
+      nonKeyAttributes: gsi.createdAtShardIndex.nonKeyAttributes,
     });
 
     // Add stack outputs
@@ -0,0 +1,33 @@
+import * as cdk from "aws-cdk-lib";
+import * as dynamodb from "aws-cdk-lib/aws-dynamodb";
+import { Construct } from "constructs";
+
+export class GovernorTable extends Construct {
+  public readonly table: dynamodb.Table;
+
+  constructor(scope: Construct, id: string) {
+    super(scope, id);
+
+    // Create DynamoDB table holding Bedrock concurrency governors, pk GOVERNOR#modelId
+    this.table = new dynamodb.Table(this, "Table", {
+      partitionKey: {
+        name: "pk",
+        type: dynamodb.AttributeType.STRING,
+      },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      // Only transient limits and leases, nothing to keep
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+
+    // Add stack outputs
+    new cdk.CfnOutput(this, "TableName", {
+      value: this.table.tableName,
+      description: "Governor DynamoDB table name",
+    });
+
+    new cdk.CfnOutput(this, "TableArn", {
+      value: this.table.tableArn,
+      description: "Governor DynamoDB table ARN",
+    });
+  }
+}
@@ -3,9 +3,13 @@ import * as iam from "aws-cdk-lib/aws-iam";
 import { Construct } from "constructs";
 import { PythonLambda } from "../../../common/lambda/python-lambda";
 import * as path from "path";
+import { BEDROCK_CONFIG } from "../../../../config/bedrock-config";
+import { WORKFLOW_CONFIG } from "../../../../config/workflow-config";
 
 interface AnalyzeFunctionProps {
   tableName: string;
+  aggregatesTableName: string;
+  governorTableName: string;
   commonLayer: cdk.aws_lambda.ILayerVersion;
 }
 
@@ -27,11 +31,48 @@ export class AnalyzeFunction extends Construct {
       description: "Analyzes document content using Bedrock prompt",
       environment: {
         ANALYSIS_TABLE_NAME: props.tableName,
+        AGGREGATES_TABLE_NAME: props.aggregatesTableName,
         PROMPT_ID: promptId,
+        GOVERNOR_TABLE_NAME: props.governorTableName,
+        GOVERNOR_INITIAL_LIMIT: String(BEDROCK_CONFIG.governor.initialLimit),
+        GOVERNOR_MIN_LIMIT: String(BEDROCK_CONFIG.governor.minLimit),
+        GOVERNOR_MAX_LIMIT: String(BEDROCK_CONFIG.governor.maxLimit),
+        GOVERNOR_MAX_WAIT: String(BEDROCK_CONFIG.governor.workflowMaxWait),
+        GOVERNOR_LEASE_SECONDS: String(BEDROCK_CONFIG.governor.leaseSeconds),
+        BEDROCK_STREAMING: String(BEDROCK_CONFIG.streaming.enabled),
+        STREAM_PARTIAL_RESULTS: String(BEDROCK_CONFIG.streaming.partialResults),
+        STREAM_FLUSH_SECONDS: String(BEDROCK_CONFIG.streaming.flushSeconds),
+        ANALYSIS_MAX_PROMPT_TOKENS: String(WORKFLOW_CONFIG.analysis.mapReduce.maxPromptTokens),
+        ANALYSIS_CHUNK_TOKENS: String(WORKFLOW_CONFIG.analysis.mapReduce.chunkTokens),
+        ANALYSIS_CONCURRENCY: String(WORKFLOW_CONFIG.analysis.mapReduce.concurrency),
       },
       timeout: cdk.Duration.minutes(15),
       memorySize: 1024,
       initialPolicy: [
+        // Aggregates counter permissions
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: ["dynamodb:UpdateItem"],
+          resources: [
+            `arn:aws:dynamodb:${cdk.Stack.of(this).region}:${
+              cdk.Stack.of(this).account
+            }:table/${props.aggregatesTableName}`,
+          ],
+        }),
+        // Bedrock concurrency governor
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: [
+            "dynamodb:GetItem",
+            "dynamodb:PutItem",
+            "dynamodb:UpdateItem",
+          ],
+          resources: [
+            `arn:aws:dynamodb:${cdk.Stack.of(this).region}:${
+              cdk.Stack.of(this).account
+            }:table/${props.governorTableName}`,
+          ],
+        }),
         // DynamoDB permissions
         new iam.PolicyStatement({
           effect: iam.Effect.ALLOW,
@@ -47,6 +88,7 @@ export class AnalyzeFunction extends Construct {
           effect: iam.Effect.ALLOW,
           actions: [
             "bedrock:InvokeModel",
+            "bedrock:InvokeModelWithResponseStream",
             "bedrock-runtime:InvokeModel"
           ],
           resources: ["*"],
@@ -55,7 +97,8 @@ export class AnalyzeFunction extends Construct {
         new iam.PolicyStatement({
           effect: iam.Effect.ALLOW,
           actions: ["bedrock:GetPrompt"],
-          resources: [promptId],
+          // Versioned ARNs for a pinned PROMPT_VERSION
+          resources: [promptId, `${promptId}:*`],
         }),
       ],
       layers: [props.commonLayer],
@@ -3,9 +3,13 @@ import * as iam from "aws-cdk-lib/aws-iam";
 import { Construct } from "constructs";
 import { PythonLambda } from "../../../common/lambda/python-lambda";
 import * as path from "path";
+import { WORKFLOW_CONFIG } from "../../../../config/workflow-config";
+import { BEDROCK_CONFIG } from "../../../../config/bedrock-config";
 
 interface ExtractPdfContentFunctionProps {
   tableName: string;
+  aggregatesTableName: string;
+  governorTableName: string;
   bucketName: string;
   commonLayer: cdk.aws_lambda.ILayerVersion;
 }
@@ -30,18 +34,75 @@ export class ExtractPdfContentFunction extends Construct {
       description: "Extracts content from PDF documents using Bedrock",
       environment: {
         ANALYSIS_TABLE_NAME: props.tableName,
+        AGGREGATES_TABLE_NAME: props.aggregatesTableName,
         BUCKET_NAME: props.bucketName,
+        GOVERNOR_TABLE_NAME: props.governorTableName,
+        GOVERNOR_INITIAL_LIMIT: String(BEDROCK_CONFIG.governor.initialLimit),
+        GOVERNOR_MIN_LIMIT: String(BEDROCK_CONFIG.governor.minLimit),
+        GOVERNOR_MAX_LIMIT: String(BEDROCK_CONFIG.governor.maxLimit),
+        GOVERNOR_MAX_WAIT: String(BEDROCK_CONFIG.governor.workflowMaxWait),
+        GOVERNOR_LEASE_SECONDS: String(BEDROCK_CONFIG.governor.leaseSeconds),
+        BEDROCK_STREAMING: String(BEDROCK_CONFIG.streaming.enabled),
         MODEL_ID: "anthropic.claude-3-sonnet-20240307-v1:0",
+        BEDROCK_CONCURRENCY: String(WORKFLOW_CONFIG.analysis.bedrockConcurrency),
+        PAGES_PER_REQUEST: String(WORKFLOW_CONFIG.analysis.pagesPerRequest),
+        PAGE_OUTPUT_TOKENS: String(WORKFLOW_CONFIG.analysis.pageOutputTokens),
+        MAX_REQUEST_INPUT_TOKENS: String(WORKFLOW_CONFIG.analysis.maxRequestInputTokens),
+        TEXT_LAYER_MODE: WORKFLOW_CONFIG.analysis.textLayerMode,
+        EXTRACTION_CACHE_ENABLED: String(WORKFLOW_CONFIG.analysis.extractionCache),
+        RENDER_DPI: String(WORKFLOW_CONFIG.analysis.image.dpi),
+        RENDER_GRAYSCALE: String(WORKFLOW_CONFIG.analysis.image.grayscale),
+        RENDER_FORMAT: WORKFLOW_CONFIG.analysis.image.format,
+        RENDER_JPEG_QUALITY: String(WORKFLOW_CONFIG.analysis.image.jpegQuality),
+        RENDER_MAX_EDGE: String(WORKFLOW_CONFIG.analysis.image.maxEdge),
       },
       timeout: cdk.Duration.minutes(15),
-      memorySize: 1024,
+      memorySize:
+        WORKFLOW_CONFIG.analysis.pageBatchSize > 1
+          ? WORKFLOW_CONFIG.analysis.batchMemorySize
+          : 1024,
       initialPolicy: [
+        // Aggregates counter permissions
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: ["dynamodb:UpdateItem"],
+          resources: [
+            `arn:aws:dynamodb:${cdk.Stack.of(this).region}:${
+              cdk.Stack.of(this).account
+            }:table/${props.aggregatesTableName}`,
+          ],
+        }),
+        // Bedrock concurrency governor
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: [
+            "dynamodb:GetItem",
+            "dynamodb:PutItem",
+            "dynamodb:UpdateItem",
+          ],
+          resources: [
+            `arn:aws:dynamodb:${cdk.Stack.of(this).region}:${
+              cdk.Stack.of(this).account
+            }:table/${props.governorTableName}`,
+          ],
+        }),
         // S3 read permissions
         new iam.PolicyStatement({
           effect: iam.Effect.ALLOW,
           actions: ["s3:GetObject"],
           resources: [`arn:aws:s3:::${props.bucketName}/*`],
         }),
+        // Extraction cache writes, ListBucket makes a miss a 404 rather than a 403
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: ["s3:PutObject"],
+          resources: [`arn:aws:s3:::${props.bucketName}/extraction-cache/*`],
+        }),
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: ["s3:ListBucket"],
+          resources: [`arn:aws:s3:::${props.bucketName}`],
+        }),
         // DynamoDB permissions
         new iam.PolicyStatement({
           effect: iam.Effect.ALLOW,
@@ -54,14 +115,19 @@ export class ExtractPdfContentFunction extends Construct {
         }),
         new iam.PolicyStatement({
           effect: iam.Effect.ALLOW,
-          actions: ["bedrock:InvokeModel"],
+          actions: [
+            "bedrock:InvokeModel",
+            "bedrock:InvokeModelWithResponseStream",
+          ],
           resources: ["*"],
         }),
         new iam.PolicyStatement({
           effect: iam.Effect.ALLOW,
           actions: ["bedrock:GetPrompt"],
+          // Versioned ARNs for a pinned PROMPT_VERSION
           resources: [
             "arn:aws:bedrock:us-west-2:694900249028:prompt/BRWZQENLG9",
+            "arn:aws:bedrock:us-west-2:694900249028:prompt/BRWZQENLG9:*",
           ],
         }),
       ],
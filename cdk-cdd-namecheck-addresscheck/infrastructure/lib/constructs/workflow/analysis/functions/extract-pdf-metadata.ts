@@ -3,6 +3,7 @@ import * as iam from "aws-cdk-lib/aws-iam";
 import { Construct } from "constructs";
 import { PythonLambda } from "../../../common/lambda/python-lambda";
 import * as path from "path";
+import { WORKFLOW_CONFIG } from "../../../../config/workflow-config";
 
 interface ExtractPdfMetadataFunctionProps {
   tableName: string;
@@ -20,13 +21,14 @@ export class ExtractPdfMetadataFunction extends Construct {
       name: "extract-pdf-metadata",
       entry: path.join(__dirname, "../../../../../lib/src/workflow/analysis/extract-pdf-metadata"),
       handler: "index.lambda_handler",
-      description: "Extracts metadata from PDF documents",
+      description: "Extracts metadata from PDF documents and splits them into pages",
       environment: {
         ANALYSIS_TABLE_NAME: props.tableName,
         BUCKET_NAME: props.bucketName,
+        PAGE_BATCH_SIZE: String(WORKFLOW_CONFIG.analysis.pageBatchSize),
       },
       timeout: cdk.Duration.minutes(5),
-      memorySize: 512,
+      memorySize: 1024,
       initialPolicy: [
         // S3 read permissions
         new iam.PolicyStatement({
@@ -34,6 +36,12 @@ export class ExtractPdfMetadataFunction extends Construct {
           actions: ["s3:GetObject"],
           resources: [`arn:aws:s3:::${props.bucketName}/*`],
         }),
+        // Split page writes
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: ["s3:PutObject"],
+          resources: [`arn:aws:s3:::${props.bucketName}/pages/*`],
+        }),
         // DynamoDB permissions
         new iam.PolicyStatement({
           effect: iam.Effect.ALLOW,
@@ -6,6 +6,7 @@ import * as path from "path";
 
 interface UpdateStatusFunctionProps {
   tableName: string;
+  aggregatesTableName: string;
   commonLayer: cdk.aws_lambda.ILayerVersion;
 }
 
@@ -22,9 +23,20 @@ export class UpdateStatusFunction extends Construct {
       description: "Updates analysis status in DynamoDB",
       environment: {
         ANALYSIS_TABLE_NAME: props.tableName,
+        AGGREGATES_TABLE_NAME: props.aggregatesTableName,
       },
       timeout: cdk.Duration.seconds(30),
       initialPolicy: [
+        // Aggregates counter permissions
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: ["dynamodb:UpdateItem"],
+          resources: [
+            `arn:aws:dynamodb:${cdk.Stack.of(this).region}:${
+              cdk.Stack.of(this).account
+            }:table/${props.aggregatesTableName}`,
+          ],
+        }),
         // DynamoDB write permissions
         new iam.PolicyStatement({
           effect: iam.Effect.ALLOW,
@@ -7,9 +7,12 @@ import { ExtractPdfContentFunction } from "./functions/extract-pdf-content";
 import { UpdateStatusFunction } from "./functions/update-status";
 import { CallbackFunction } from "./functions/callback";
 import { AnalyzeFunction } from "./functions/analyze";
+import { WORKFLOW_CONFIG } from "../../../config/workflow-config";
 
 interface AnalysisStateMachineProps {
   tableName: string;
+  aggregatesTableName: string;
+  governorTableName: string;
   bucketName: string;
   commonLayer: cdk.aws_lambda.ILayerVersion;
 }
@@ -36,6 +39,8 @@ export class AnalysisStateMachine extends Construct {
       "ExtractPdfContentFunction",
       {
         tableName: props.tableName,
+        aggregatesTableName: props.aggregatesTableName,
+        governorTableName: props.governorTableName,
         bucketName: props.bucketName,
         commonLayer: props.commonLayer,
       }
@@ -46,6 +51,7 @@ export class AnalysisStateMachine extends Construct {
       "UpdateStatusFunction",
       {
         tableName: props.tableName,
+        aggregatesTableName: props.aggregatesTableName,
         commonLayer: props.commonLayer,
       }
     );
@@ -57,6 +63,8 @@ export class AnalysisStateMachine extends Construct {
 
     const analyzeFunction = new AnalyzeFunction(this, "AnalyzeFunction", {
       tableName: props.tableName,
+      aggregatesTableName: props.aggregatesTableName,
+      governorTableName: props.governorTableName,
       commonLayer: props.commonLayer,
     });
 
@@ -82,6 +90,7 @@ export class AnalysisStateMachine extends Construct {
             "$[0].dynamodb.NewImage.analysisId.S"
           ),
           status: "STARTED",
+          includeObjectsData: true,
         }),
         outputPath: "$.Payload",
       }
@@ -96,6 +105,7 @@ export class AnalysisStateMachine extends Construct {
         lambdaFunction: extractPdfMetadataFunction.function,
         payload: sfn.TaskInput.fromObject({
           analysisId: sfn.JsonPath.stringAt("$.analysisId"),
+          documentType: sfn.JsonPath.stringAt("$.documentType"),
           objectsData: sfn.JsonPath.stringAt("$.objectsData"),
         }),
         outputPath: "$.Payload",
@@ -106,13 +116,14 @@ export class AnalysisStateMachine extends Construct {
 
     // Create Map state for processing pages
     const processPages = new sfn.Map(this, "ProcessPagesMap", {
-      maxConcurrency: 1,
+      // Bedrock throughput is bounded by the concurrency governor
+      maxConcurrency: WORKFLOW_CONFIG.analysis.pageConcurrency,
       itemsPath: "$.pageTasks",
       parameters: {
         "analysisId.$": "$.analysisId",
-        "objectKey.$": "$$.Map.Item.Value.objectKey",
-        "pageNumber.$": "$$.Map.Item.Value.pageNumber",
-        "totalPages.$": "$$.Map.Item.Value.totalPages",
+        "documentType.$": "$.documentType",
+        // A page task, or a batch task listing its pages
+        "task.$": "$$.Map.Item.Value",
       },
       resultPath: "$.processedPages",
     });
@@ -124,9 +135,8 @@ export class AnalysisStateMachine extends Construct {
         lambdaFunction: extractPdfContentFunction.function,
         payload: sfn.TaskInput.fromObject({
           analysisId: sfn.JsonPath.stringAt("$.analysisId"),
-          objectKey: sfn.JsonPath.stringAt("$.objectKey"),
-          pageNumber: sfn.JsonPath.stringAt("$.pageNumber"),
-          totalPages: sfn.JsonPath.stringAt("$.totalPages"),
+          documentType: sfn.JsonPath.stringAt("$.documentType"),
+          task: sfn.JsonPath.stringAt("$.task"),
         }),
         outputPath: "$.Payload",
         retryOnServiceExceptions: true,
@@ -168,6 +178,7 @@ export class AnalysisStateMachine extends Construct {
         lambdaFunction: updateStatusFunction.function,
         payload: sfn.TaskInput.fromObject({
           analysisId: sfn.JsonPath.stringAt("$.analysisId"),
+          documentType: sfn.JsonPath.stringAt("$.documentType"),
           status: "COMPLETED",
         }),
         outputPath: "$.Payload",
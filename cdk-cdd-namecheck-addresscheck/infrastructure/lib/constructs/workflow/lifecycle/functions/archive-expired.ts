@@ -0,0 +1,84 @@
+import * as cdk from "aws-cdk-lib";
+import * as iam from "aws-cdk-lib/aws-iam";
+import * as lambda from "aws-cdk-lib/aws-lambda";
+import { DynamoEventSource } from "aws-cdk-lib/aws-lambda-event-sources";
+import { Construct } from "constructs";
+import { PythonLambda } from "../../../common/lambda/python-lambda";
+import * as path from "path";
+
+interface ArchiveExpiredFunctionProps {
+  table: cdk.aws_dynamodb.ITable;
+  archiveBucketName: string;
+  commonLayer: cdk.aws_lambda.ILayerVersion;
+}
+
+export class ArchiveExpiredFunction extends Construct {
+  public readonly function: cdk.aws_lambda.Function;
+
+  constructor(
+    scope: Construct,
+    id: string,
+    props: ArchiveExpiredFunctionProps
+  ) {
+    super(scope, id);
+
+    const archiveFunction = new PythonLambda(this, "Function", {
+      name: "archive-expired",
+      entry: path.join(
+        __dirname,
+        "../../../../../lib/src/workflow/lifecycle/archive-expired"
+      ),
+      handler: "index.lambda_handler",
+      description: "Archives analyses expired by DynamoDB TTL to S3",
+      environment: {
+        ARCHIVE_BUCKET_NAME: props.archiveBucketName,
+        ANALYSIS_TABLE_NAME: props.table.tableName,
+      },
+      timeout: cdk.Duration.minutes(5),
+      memorySize: 512,
+      initialPolicy: [
+        // S3 write permissions, reads let retries find objects already written
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: ["s3:PutObject", "s3:GetObject"],
+          resources: [`arn:aws:s3:::${props.archiveBucketName}/*`],
+        }),
+        // A missing object is reported as 404 instead of 403
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: ["s3:ListBucket"],
+          resources: [`arn:aws:s3:::${props.archiveBucketName}`],
+        }),
+        // Chat messages are removed with their expired analysis
+        new iam.PolicyStatement({
+          effect: iam.Effect.ALLOW,
+          actions: ["dynamodb:Query", "dynamodb:DeleteItem"],
+          resources: [props.table.tableArn],
+        }),
+      ],
+      layers: [props.commonLayer],
+    });
+
+    // Only TTL deletions, made by the DynamoDB service principal
+    archiveFunction.function.addEventSource(
+      new DynamoEventSource(props.table, {
+        startingPosition: lambda.StartingPosition.TRIM_HORIZON,
+        batchSize: 100,
+        maxBatchingWindow: cdk.Duration.seconds(60),
+        retryAttempts: 5,
+        bisectBatchOnError: true,
+        filters: [
+          lambda.FilterCriteria.filter({
+            eventName: lambda.FilterRule.isEqual("REMOVE"),
+            userIdentity: {
+              type: lambda.FilterRule.isEqual("Service"),
+              principalId: lambda.FilterRule.isEqual("dynamodb.amazonaws.com"),
+            },
+          }),
+        ],
+      })
+    );
+
+    this.function = archiveFunction.function;
+  }
+}
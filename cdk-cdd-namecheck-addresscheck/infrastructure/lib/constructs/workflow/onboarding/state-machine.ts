@@ -5,7 +5,6 @@ import * as events from "aws-cdk-lib/aws-events";
 import * as targets from "aws-cdk-lib/aws-events-targets";
 import * as pipes from "aws-cdk-lib/aws-pipes";
 import { Construct } from "constructs";
-import { UpdateStatusFunction } from "./functions/update-status";
 import { AnalyzeDocumentFunction } from "./functions/analyze-document";
 import { StorageStack } from "../../../stacks/storage-stack";
 import { LogAnalysisCompletion } from "./functions/log-analysis-completion";
@@ -27,11 +26,6 @@ export class OnboardingStateMachine extends Construct {
     super(scope, id);
 
     // Create Lambda functions
-    const updateStatus = new UpdateStatusFunction(this, "UpdateStatus", {
-      tableName: props.storageStack.onboardingRequestTable.tableName,
-      commonLayer: props.commonLayer,
-    });
-
     const analyzeDocument = new AnalyzeDocumentFunction(
       this,
       "AnalyzeDocument",
@@ -44,19 +38,8 @@ export class OnboardingStateMachine extends Construct {
     );
 
     // Create Step Function tasks
-    const updateStatusTask = new tasks.LambdaInvoke(
-      this,
-      "Update Status to Checking",
-      {
-        lambdaFunction: updateStatus.function,
-        payload: sfn.TaskInput.fromObject({
-          "pk.$": "$[0].dynamodb.NewImage.pk.S",
-          status: "CHECKING",
-        }),
-        outputPath: "$.Payload",
-      }
-    );
-
+    // Analyze Document moves the request to CHECKING and starts the analysis
+    // in a single DynamoDB transaction
     const analyzeDocumentTask = new tasks.LambdaInvoke(
       this,
       "Analyze Document",
@@ -64,11 +47,16 @@ export class OnboardingStateMachine extends Construct {
         lambdaFunction: analyzeDocument.function,
         integrationPattern: sfn.IntegrationPattern.WAIT_FOR_TASK_TOKEN,
         payload: sfn.TaskInput.fromObject({
-          requestId: sfn.JsonPath.stringAt("$.requestId"),
+          pk: sfn.JsonPath.stringAt("$[0].dynamodb.NewImage.pk.S"),
           taskToken: sfn.JsonPath.taskToken,
         }),
       }
-    );
+    ).addRetry({
+      errors: ["TransactionFailedError"],
+      interval: cdk.Duration.seconds(2),
+      backoffRate: 2,
+      maxAttempts: 3,
+    });
 
     const logAnalysisCompletion = new LogAnalysisCompletion(
       this,
@@ -117,8 +105,7 @@ export class OnboardingStateMachine extends Construct {
     );
 
     // Create state machine definition with sequential tasks
-    const definition = updateStatusTask
-      .next(analyzeDocumentTask)
+    const definition = analyzeDocumentTask
       .next(logCompletionTask)
       .next(updateOnboardingStatusTask);
 
@@ -0,0 +1,78 @@
+import os
+from typing import Dict, Any
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.event_handler.api_gateway import Response
+from utilities.api_config import app, logger, tracer, metrics
+from data.analysis import AnalysisUtil
+from data.chat import ChatUtil
+from utilities.exceptions import ValidationError
+
+# Initialize utilities
+analysis_util = AnalysisUtil(os.environ['ANALYSIS_TABLE_NAME'])
+chat_util = ChatUtil(os.environ['ANALYSIS_TABLE_NAME'])
+
+# Longest message accepted from the API, in characters
+MAX_CONTENT_LENGTH = 20000
+
+@app.post("/analyses/<analysis_id>/messages")
+@tracer.capture_method
+def append_message(analysis_id: str) -> Dict[str, Any]:
+    """Append a chat message to the conversation of an analysis
+
+    Args:
+        analysis_id: Analysis ID from path parameter
+    """
+    try:
+        # Get request body
+        body = app.current_event.json_body
+        if not body or not isinstance(body.get('content'), str) or not body['content'].strip():
+            raise ValidationError('Missing content in request body')
+        if len(body['content']) > MAX_CONTENT_LENGTH:
+            raise ValidationError(f'content must be at most {MAX_CONTENT_LENGTH} characters')
+
+        role = body.get('role', 'human')
+        metadata = body.get('metadata')
+        if metadata is not None and not isinstance(metadata, dict):
+            raise ValidationError('metadata must be an object')
+
+        # Messages are only stored for existing analyses
+        if not analysis_util.get_analysis(analysis_id, fields=['analysisId']):
+            logger.info("Analysis not found", extra={"analysisId": analysis_id})
+            metrics.add_metric(name="NotFoundErrors", unit=MetricUnit.Count, value=1)
+            return Response(
+                status_code=404,
+                content_type="application/json",
+                body={"message": "Analysis not found"}
+            )
+
+        message = chat_util.append_message(analysis_id, role, body['content'], metadata)
+
+        # Record metrics
+        metrics.add_metric(name="ChatMessagesAppended", unit=MetricUnit.Count, value=1)
+
+        logger.info("Appended chat message", extra={
+            "analysisId": analysis_id,
+            "messageId": message['messageId']
+        })
+
+        return {
+            "data": message,
+            "createdAt": message['timestamp']
+        }
+
+    except ValidationError as e:
+        logger.warning("Validation error in append_message", extra={"error": str(e)})
+        metrics.add_metric(name="ValidationErrors", unit=MetricUnit.Count, value=1)
+        raise
+    except Exception as e:
+        logger.exception("Error in append_message")
+        metrics.add_metric(name="UnhandledErrors", unit=MetricUnit.Count, value=1)
+        raise
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+@metrics.log_metrics
+def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """Lambda handler for the append chat message endpoint"""
+    return app.resolve(event, context)
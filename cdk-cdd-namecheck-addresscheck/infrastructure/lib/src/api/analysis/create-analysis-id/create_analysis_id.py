@@ -28,7 +28,6 @@ def create_analysis_id() -> Dict[str, Any]:
             description="",  # Default empty description
             document_type=DocumentType.MIXED,  # Default document type
             objects_data=[],
-            chat_history=[],
             status=AnalysisStatus.CREATED  # Using CREATED from the enum
         )
         
@@ -6,9 +6,16 @@ from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.event_handler.api_gateway import Response
 from utilities.api_config import app, logger, tracer, metrics
 from data.analysis import AnalysisUtil
+from data.cache import ItemCache
+from data.chat import ChatUtil
 
 # Initialize utilities
-analysis_util = AnalysisUtil(os.environ["ANALYSIS_TABLE_NAME"])
+analysis_util = AnalysisUtil(os.environ["ANALYSIS_TABLE_NAME"], cache=ItemCache(ttl_seconds=60))
+chat_util = ChatUtil(os.environ["ANALYSIS_TABLE_NAME"])
+
+# Latest chat messages returned with an analysis, earlier ones are paged
+# through GET /analyses/{analysis_id}/messages
+CHAT_HISTORY_LIMIT = 20
 
 @app.get("/analyses/<analysis_id>")
 @tracer.capture_method
@@ -19,7 +26,8 @@ def get_analysis(analysis_id: str) -> Dict[str, Any]:
     """
     try:
         # Get analysis details using correct key structure
-        result = analysis_util.get_analysis(analysis_id)
+        # Polling clients only pay for a version check while the item is unchanged
+        result = analysis_util.get_analysis(analysis_id, validate=True)
         
         # Check if analysis exists
         if not result:
@@ -30,6 +38,12 @@ def get_analysis(analysis_id: str) -> Dict[str, Any]:
                 body={"message": "Analysis not found"}
             )
             
+        # Legacy analyses keep their history inline, newer ones store
+        # one item per message
+        chat_history = result.get("chatHistory")
+        if chat_history is None:
+            chat_history = chat_util.get_messages(analysis_id, limit=CHAT_HISTORY_LIMIT)["items"]
+        
         # Transform item for response
         response = {
             "data": {
@@ -37,7 +51,7 @@ def get_analysis(analysis_id: str) -> Dict[str, Any]:
                 "description": result["description"],
                 "documentType": result["documentType"],
                 "objectsData": result["objectsData"],
-                "chatHistory": result["chatHistory"],
+                "chatHistory": chat_history,
                 "status": result["status"],
                 "createdAt": result["createdAt"],
                 "lastUpdatedAt": result["lastUpdatedAt"],
@@ -0,0 +1,73 @@
+import os
+from typing import Dict, Any
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from aws_lambda_powertools.metrics import MetricUnit
+from utilities.api_config import app, logger, tracer, metrics
+from data.chat import ChatUtil
+from utilities.exceptions import ValidationError
+
+# Initialize utilities
+chat_util = ChatUtil(os.environ['ANALYSIS_TABLE_NAME'])
+
+@app.get("/analyses/<analysis_id>/messages")
+@tracer.capture_method
+def list_messages(analysis_id: str) -> Dict[str, Any]:
+    """List the chat messages of an analysis
+    
+    Returns the latest messages oldest first, nextToken pages back to
+    earlier messages. The conversation summary is included on the first page.
+    """
+    try:
+        # Get query parameters
+        query_params = app.current_event.query_string_parameters or {}
+        next_token = query_params.get('nextToken')
+        
+        # Validate and parse limit
+        limit = 20  # default
+        if 'limit' in query_params:
+            try:
+                limit = int(query_params['limit'])
+                if not 1 <= limit <= 100:
+                    raise ValidationError("Limit must be between 1 and 100")
+            except ValueError:
+                raise ValidationError("Invalid limit value")
+        
+        result = chat_util.get_messages(analysis_id, limit=limit, next_token=next_token)
+        
+        if not next_token:
+            summary = chat_util.get_summary(analysis_id)
+            if summary:
+                result['summary'] = {
+                    'summary': summary['summary'],
+                    'summarizedThrough': summary['summarizedThrough']
+                }
+        
+        metrics.add_metric(
+            name="ChatMessagesReturned",
+            unit=MetricUnit.Count,
+            value=len(result['items'])
+        )
+        
+        logger.info("Successfully listed chat messages", extra={
+            "analysisId": analysis_id,
+            "itemCount": len(result['items']),
+            "hasNextToken": 'nextToken' in result
+        })
+        
+        return result
+        
+    except ValidationError as e:
+        logger.warning("Validation error in list_messages", extra={"error": str(e)})
+        metrics.add_metric(name="ValidationErrors", unit=MetricUnit.Count, value=1)
+        raise
+    except Exception as e:
+        logger.exception("Error in list_messages")
+        metrics.add_metric(name="UnhandledErrors", unit=MetricUnit.Count, value=1)
+        raise
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+@metrics.log_metrics
+def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """Lambda handler for the list chat messages endpoint"""
+    return app.resolve(event, context)
@@ -31,7 +31,7 @@ def start_analysis(analysis_id: str) -> Dict[str, Any]:
             raise ValidationError('objectKeys must be a non-empty array')
         
         # Get analysis and verify status
-        analysis = analysis_util.get_analysis(analysis_id)
+        analysis = analysis_util.get_analysis(analysis_id, fields=['status'])
         
         if analysis['status'] != AnalysisStatus.PENDING:
             raise ValidationError(f"Analysis cannot be started in status: {analysis['status']}")
@@ -1,16 +1,16 @@
 import os
-import boto3
 import re
 from typing import Dict, Any, Tuple, Optional
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.utilities.validation import validate
 from utilities.api_config import app, logger, tracer, metrics
-import json
+from utilities.bedrock import BedrockRuntime
+from utilities.prompt_cache import PromptCache
 
-# Initialize Bedrock clients
-bedrock_client = boto3.client('bedrock-runtime')
-bedrock_agent = boto3.client('bedrock-agent')
+# Initialize Bedrock client and prompt cache
+bedrock = BedrockRuntime()
+prompt_cache = PromptCache()
 
 MODEL_ID = "anthropic.claude-3-5-sonnet-20240620-v1:0"
 PROMPT_ID = "arn:aws:bedrock:us-west-2:694900249028:prompt/FNOCOGP9HZ"
@@ -25,23 +25,9 @@ REQUEST_SCHEMA = {
     "additionalProperties": False
 }
 
-@tracer.capture_method
 def retrieve_prompt() -> str:
-    """Retrieve prompt from Bedrock"""
-    try:
-        response = bedrock_agent.get_prompt(
-            promptIdentifier=PROMPT_ID
-        )
-        # Get the prompt text from the first variant's template configuration
-        variants = response.get('variants', [])
-        if variants and 'templateConfiguration' in variants[0]:
-            template_config = variants[0]['templateConfiguration']
-            if 'text' in template_config:
-                return template_config['text'].get('text', '')
-        raise ValueError("No valid prompt template found in response")
-    except Exception as e:
-        logger.exception(f"Error retrieving prompt {PROMPT_ID}")
-        raise
+    """Retrieve the prompt template, cached across invocations"""
+    return prompt_cache.get_text(PROMPT_ID)
 
 @tracer.capture_method
 def extract_content_from_tags(text: str) -> Tuple[Optional[str], Optional[str]]:
@@ -99,12 +85,7 @@ def generate_email() -> Dict[str, Any]:
         }
 
         # Invoke Bedrock model
-        response = bedrock_client.invoke_model(
-            modelId=MODEL_ID,
-            body=json.dumps(request)
-        )
-
-        response_body = json.loads(response['body'].read())
+        response_body = bedrock.invoke_model(MODEL_ID, request)
         full_content = response_body['content'][0]['text']
         
         # Extract thinking and response content
@@ -0,0 +1,238 @@
+"""Micro-benchmarks for the data layer utilities against a local DynamoDB
+
+Runs AnalysisUtil, ChatUtil, OnboardingRequestUtil, PromptUtil and BaseDataUtil
+against moto (or DynamoDB Local with DYNAMODB_ENDPOINT_URL set), so it
+needs no AWS account:
+
+    cd lib/src/layer
+    python benchmarks/data_layer_benchmark.py --pages 1,10,100,500 --iterations 50
+
+Analyses are synthetic, with the given page counts of extracted content.
+For every operation it reports median and p95 latency, DynamoDB calls,
+request and response bytes on the wire and estimated consumed capacity
+per call. Latency against a local stand-in only compares code paths;
+bytes and capacity carry over to DynamoDB.
+"""
+import argparse
+import json
+import random
+import uuid
+from typing import Any, Callable, Dict, List, Tuple
+
+from botocore.exceptions import ClientError
+
+from harness import Meter, measure, stand_in
+
+WORDS = (
+    'account balance statement opening closing transfer payment deposit '
+    'withdrawal interest fee total revenue income expense asset liability '
+    'equity dividend period quarter annual report director auditor note '
+    'cash flow operating investing financing customer reference date amount'
+).split()
+
+
+def synthetic_page(page: int, size: int = 3000) -> str:
+    """Deterministic extracted-text stand-in, compresses about as well as real pages"""
+    rng = random.Random(page)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS) if rng.random() < 0.8 else f'{rng.randint(0, 99999):,}.{rng.randint(0, 99):02d}'
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
+
+
+PAGE_CONTENT = synthetic_page(0)
+
+
+def synthetic_objects(pages: int) -> List[Dict[str, Any]]:
+    """One PDF object with extracted pages of about 3 KB of text each"""
+    return [{
+        'object': 'documents/benchmark.pdf',
+        'totalPages': pages,
+        'tokenInput': 1000 * pages,
+        'tokenOutput': 400 * pages,
+        'data': [
+            {'page': page, 'content': synthetic_page(page), 'tokenInput': 1000, 'tokenOutput': 400}
+            for page in range(1, pages + 1)
+        ]
+    }]
+
+
+def analysis_operations(table_name: str, engine: str, pages: int) -> List[Tuple[str, Callable[[], Any]]]:
+    from data.analysis import AnalysisUtil, DocumentType
+    from data.cache import ItemCache
+    from utilities.types import AnalysisStatus
+
+    util = AnalysisUtil(table_name, engine=engine)
+    cached = AnalysisUtil(table_name, cache=ItemCache(), engine=engine)
+
+    def create() -> str:
+        analysis_id = str(uuid.uuid4())
+        util.create_analysis(util.create_analysis_item(
+            analysis_id=analysis_id,
+            description='Benchmark analysis',
+            document_type=DocumentType.BANK_STATEMENT,
+            objects_data=synthetic_objects(pages),
+            status=AnalysisStatus.CREATED
+        ))
+        return analysis_id
+
+    analysis_id = create()
+    cached.get_analysis(analysis_id, ['analysisId', 'status'])
+    cached.get_analysis(analysis_id, ['analysisId', 'status'])
+    assert cached.cache.hits == 1, 'projected get_analysis missed the cache'
+    return [
+        ('create_analysis', create),
+        ('get_analysis', lambda: util.get_analysis(analysis_id)),
+        ('get_analysis (summary)', lambda: util.get_analysis(analysis_id, ['analysisId', 'status'])),
+        ('get_analysis (cached)', lambda: cached.get_analysis(analysis_id, ['analysisId', 'status'])),
+        ('update_page_content', lambda: util.update_page_content(
+            analysis_id, 'documents/benchmark.pdf', 1, PAGE_CONTENT, 1000, 400
+        )),
+        ('update_status', lambda: util.update_status(analysis_id, AnalysisStatus.STARTED)),
+        ('list_analyses', lambda: util.list_analyses(limit=20))
+    ]
+
+
+def chat_operations(table_name: str, engine: str) -> List[Tuple[str, Callable[[], Any]]]:
+    from data.chat import ChatUtil
+
+    util = ChatUtil(table_name, engine=engine)
+    analysis_id = str(uuid.uuid4())
+    for index in range(200):
+        util.append_message(analysis_id, 'human' if index % 2 == 0 else 'assistant', PAGE_CONTENT[:500])
+    return [
+        ('append_message', lambda: util.append_message(analysis_id, 'human', PAGE_CONTENT[:500])),
+        ('get_messages', lambda: util.get_messages(analysis_id, limit=20))
+    ]
+
+
+def onboarding_operations(table_name: str, engine: str) -> List[Tuple[str, Callable[[], Any]]]:
+    from data.cache import ItemCache
+    from data.onboarding_request import OnboardingRequestUtil, OnboardingStatus
+
+    util = OnboardingRequestUtil(table_name, engine=engine)
+    cached = OnboardingRequestUtil(table_name, cache=ItemCache(), engine=engine)
+
+    def create() -> str:
+        return util.create_request({
+            'email': 'jane.doe@example.com',
+            'firstName': 'Jane',
+            'middleName': None,
+            'lastName': 'Doe',
+            'dateOfBirth': '1990-01-01',
+            'phoneNumber': '+15555550100',
+            'address': '1 Example Street, Springfield',
+            'country': 'US',
+            'analysisId': str(uuid.uuid4()),
+            'documents': ['documents/benchmark.pdf']
+        })['uniqueId']
+
+    unique_id = create()
+    cached.get_request(unique_id, ['status', 'analysisId'])
+    cached.get_request(unique_id, ['status', 'analysisId'])
+    assert cached.cache.hits == 1, 'projected get_request missed the cache'
+    return [
+        ('create_request', create),
+        ('get_request', lambda: util.get_request(unique_id)),
+        ('get_request (cached)', lambda: cached.get_request(unique_id, ['status', 'analysisId'])),
+        ('update_request_status', lambda: util.update_request_status(unique_id, OnboardingStatus.CHECKING)),
+        ('list_requests', lambda: util.list_requests(limit=20))
+    ]
+
+
+def prompt_operations(table_name: str, engine: str) -> List[Tuple[str, Callable[[], Any]]]:
+    from data.cache import ItemCache
+    from data.prompt import PromptType, PromptUtil
+
+    util = PromptUtil(table_name, engine=engine)
+    cached = PromptUtil(table_name, cache=ItemCache(), engine=engine)
+    util.create_prompt('benchmark-system', PAGE_CONTENT * 4, PromptType.SYSTEM)
+    cached.get_prompt('benchmark-system')
+    return [
+        ('create_prompt', lambda: util.create_prompt(
+            f'benchmark-{uuid.uuid4()}', PAGE_CONTENT, PromptType.USER
+        )),
+        ('get_prompt', lambda: util.get_prompt('benchmark-system')),
+        ('get_prompt (cached)', lambda: cached.get_prompt('benchmark-system')),
+        ('list_prompts_by_type', lambda: util.list_prompts_by_type(PromptType.USER, limit=20))
+    ]
+
+
+def base_operations(table_name: str, engine: str) -> List[Tuple[str, Callable[[], Any]]]:
+    from data.base import BaseDataUtil
+
+    util = BaseDataUtil(table_name, engine=engine)
+    item = {'pk': 'ITEM#benchmark', 'sk': 'METADATA', 'content': PAGE_CONTENT, 'count': 0}
+    util.put_item(item)
+    return [
+        ('put_item', lambda: util.put_item(item)),
+        ('get_item', lambda: util.get_item('ITEM#benchmark', 'METADATA')),
+        ('update_item', lambda: util.update_item(
+            'ITEM#benchmark', 'METADATA', {'status': 'SEEN'}, increment={'count': 1}
+        ))
+    ]
+
+
+def format_row(suite: str, name: str, result: Dict[str, float]) -> str:
+    return (
+        f"{suite:<18} {name:<24} {result['medianMs']:8.3f} {result['p95Ms']:8.3f} "
+        f"{result['calls']:5.1f} {result['requestBytes']:10.0f} {result['responseBytes']:10.0f} "
+        f"{result['rcu']:7.1f} {result['wcu']:7.1f}"
+    )
+
+
+HEADER = (
+    f"{'suite':<18} {'operation':<24} {'med ms':>8} {'p95 ms':>8} "
+    f"{'calls':>5} {'req B':>10} {'resp B':>10} {'RCU':>7} {'WCU':>7}"
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', default='1,10,100,500',
+                        help='Comma-separated page counts of the synthetic analyses')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--engine', choices=('resource', 'client'), default='resource')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON lines')
+    args = parser.parse_args()
+
+    meter = Meter()
+    results = []
+
+    with stand_in() as tables:
+        # Installed after the stand-in starts, which resets the default session
+        meter.install()
+        suites = [
+            (f'analysis/{pages}p', lambda pages=int(pages): analysis_operations(tables['analysis'], args.engine, pages))
+            for pages in args.pages.split(',')
+        ]
+        suites += [
+            ('chat', lambda: chat_operations(tables['analysis'], args.engine)),
+            ('onboarding', lambda: onboarding_operations(tables['onboarding'], args.engine)),
+            ('prompt', lambda: prompt_operations(tables['prompts'], args.engine)),
+            ('base', lambda: base_operations(tables['aggregates'], args.engine))
+        ]
+
+        if not args.json:
+            print(f"engine={args.engine} iterations={args.iterations}")
+            print(HEADER)
+        for suite, build in suites:
+            try:
+                operations = build()
+            except ClientError as e:
+                # e.g. a synthetic analysis above the 400 KB item limit
+                error = e.response['Error']
+                results.append({'suite': suite, 'operation': 'setup', 'error': error['Code']})
+                print(json.dumps(results[-1]) if args.json else f"{suite:<18} setup failed: {error['Message']}")
+                continue
+            for name, operation in operations:
+                result = measure(meter, operation, args.iterations)
+                results.append({'suite': suite, 'operation': name, **result})
+                print(json.dumps(results[-1]) if args.json else format_row(suite, name, result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Compare the resource and client DynamoDB engines of the data layer
+
+Runs against moto, so it needs no AWS account:
+
+    cd lib/src/layer
+    python benchmarks/engine_benchmark.py --iterations 500
+
+Cold start is measured in a fresh interpreter per engine (import of the
+data layer, table handle creation and a first GetItem). Per-request latency
+is measured for get_item, update_item and query on a warm handle.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+LAYER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python')
+TABLE_NAME = 'benchmark-analysis'
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ.setdefault('POWERTOOLS_TRACE_DISABLED', 'true')
+sys.path.insert(0, LAYER_PATH)
+
+COLD_START_SCRIPT = """
+import time
+from moto import mock_dynamodb
+with mock_dynamodb():
+    import boto3
+    boto3.client('dynamodb').create_table(
+        TableName='{table}',
+        KeySchema=[{{'AttributeName': 'pk', 'KeyType': 'HASH'}}],
+        AttributeDefinitions=[{{'AttributeName': 'pk', 'AttributeType': 'S'}}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    start = time.perf_counter()
+    from data.engine import get_table
+    table = get_table('{table}', '{engine}')
+    table.get_item(Key={{'pk': 'missing'}})
+    print((time.perf_counter() - start) * 1000)
+"""
+
+
+def cold_start(engine: str, runs: int) -> list:
+    """Time import, handle creation and first call in fresh interpreters"""
+    timings = []
+    env = dict(os.environ, PYTHONPATH=LAYER_PATH)
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', COLD_START_SCRIPT.format(table=TABLE_NAME, engine=engine)],
+            capture_output=True, text=True, env=env, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def timed(operation, iterations: int) -> list:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def warm_requests(engine: str, iterations: int, pages: int) -> dict:
+    """Time typical data layer calls on a warm table handle"""
+    import boto3
+    from data.engine import get_table
+    from data.expressions import build_update
+
+    boto3.client('dynamodb').create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[
+            {'AttributeName': 'pk', 'KeyType': 'HASH'},
+            {'AttributeName': 'sk', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'pk', 'AttributeType': 'S'},
+            {'AttributeName': 'sk', 'AttributeType': 'S'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    table = get_table(TABLE_NAME, engine)
+    key = {'pk': 'ID#benchmark', 'sk': 'METADATA'}
+    table.put_item(Item={
+        **key,
+        'status': 'STARTED',
+        'objectsData': [{
+            'object': 'document.pdf',
+            'tokenInput': 0,
+            'data': [
+                {'page': page, 'content': 'x' * 1500, 'tokenInput': 1000, 'tokenOutput': 400}
+                for page in range(1, pages + 1)
+            ]
+        }]
+    })
+
+    results = {
+        'get_item': timed(lambda: table.get_item(Key=key), iterations),
+        'update_item': timed(lambda: table.update_item(
+            Key=key,
+            **build_update(set_values={'status': 'STARTED'}, increment={'objectsData[0].tokenInput': 1})
+        ), iterations),
+        'query': timed(lambda: table.query(
+            KeyConditionExpression='pk = :pk',
+            ExpressionAttributeValues={':pk': 'ID#benchmark'}
+        ), iterations)
+    }
+    boto3.client('dynamodb').delete_table(TableName=TABLE_NAME)
+    return results
+
+
+def summarize(name: str, timings: list) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"{name:<28} median {statistics.median(ordered):8.3f} ms   p95 {p95:8.3f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--cold-runs', type=int, default=5)
+    parser.add_argument('--pages', type=int, default=20)
+    args = parser.parse_args()
+
+    from moto import mock_dynamodb
+
+    for engine in ('resource', 'client'):
+        print(f"[{engine}]")
+        print(summarize('cold start', cold_start(engine, args.cold_runs)))
+        with mock_dynamodb():
+            for name, timings in warm_requests(engine, args.iterations, args.pages).items():
+                print(summarize(name, timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""Local DynamoDB stand-in and measurement helpers for data layer benchmarks
+
+Tables mirror the CDK constructs in lib/constructs/storage/tables. The
+stand-in is moto by default; set DYNAMODB_ENDPOINT_URL to point the
+clients at DynamoDB Local instead.
+"""
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+LAYER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python')
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ.setdefault('POWERTOOLS_TRACE_DISABLED', 'true')
+os.environ.setdefault('POWERTOOLS_LOG_LEVEL', 'ERROR')
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+if os.environ.get('DYNAMODB_ENDPOINT_URL'):
+    os.environ.setdefault('AWS_ENDPOINT_URL_DYNAMODB', os.environ['DYNAMODB_ENDPOINT_URL'])
+sys.path.insert(0, LAYER_PATH)
+
+import boto3
+
+TABLES: Dict[str, Dict[str, Any]] = {
+    'analysis': {
+        'KeySchema': [
+            {'AttributeName': 'pk', 'KeyType': 'HASH'},
+            {'AttributeName': 'sk', 'KeyType': 'RANGE'}
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': name, 'AttributeType': 'S'}
+            for name in ('pk', 'sk', 'yearMonth', 'yearMonthShard', 'createdAt')
+        ],
+        'GlobalSecondaryIndexes': [
+            {
+                'IndexName': index_name,
+                'KeySchema': [
+                    {'AttributeName': partition_key, 'KeyType': 'HASH'},
+                    {'AttributeName': 'createdAt', 'KeyType': 'RANGE'}
+                ],
+                'Projection': projection
+            }
+            for index_name, partition_key, projection in (
+                ('createdAtIndex', 'yearMonth', {'ProjectionType': 'ALL'}),
+                ('createdAtShardIndex', 'yearMonthShard', {
+                    'ProjectionType': 'INCLUDE',
+                    'NonKeyAttributes': ['analysisId', 'description', 'documentType', 'status', 'lastUpdatedAt']
+                })
+            )
+        ]
+    },
+    'onboarding': {
+        'KeySchema': [{'AttributeName': 'pk', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [{'AttributeName': 'pk', 'AttributeType': 'S'}]
+    },
+    'prompts': {
+        'KeySchema': [{'AttributeName': 'pk', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [
+            {'AttributeName': name, 'AttributeType': 'S'}
+            for name in ('pk', 'type')
+        ],
+        'GlobalSecondaryIndexes': [{
+            'IndexName': 'typeIndex',
+            'KeySchema': [{'AttributeName': 'type', 'KeyType': 'HASH'}],
+            'Projection': {'ProjectionType': 'ALL'}
+        }]
+    },
+    'aggregates': {
+        'KeySchema': [
+            {'AttributeName': 'pk', 'KeyType': 'HASH'},
+            {'AttributeName': 'sk', 'KeyType': 'RANGE'}
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': name, 'AttributeType': 'S'}
+            for name in ('pk', 'sk')
+        ]
+    }
+}
+
+
+@contextmanager
+def stand_in(prefix: str = 'benchmark'):
+    """Start the stand-in and create every table, yields table names by role"""
+    mock = None
+    if not os.environ.get('DYNAMODB_ENDPOINT_URL'):
+        from moto import mock_dynamodb, mock_s3
+        mock = [mock_dynamodb(), mock_s3()]
+        for m in mock:
+            m.start()
+    client = boto3.client('dynamodb')
+    names = {role: f'{prefix}-{role}' for role in TABLES}
+    try:
+        for role, definition in TABLES.items():
+            client.create_table(TableName=names[role], BillingMode='PAY_PER_REQUEST', **definition)
+        yield names
+    finally:
+        for name in names.values():
+            try:
+                client.delete_table(TableName=name)
+            except Exception:
+                pass
+        for m in mock or []:
+            m.stop()
+
+
+def attribute_size(value: Dict[str, Any]) -> int:
+    """Approximate stored size of an AttributeValue using DynamoDB's sizing rules"""
+    (kind, data), = value.items()
+    if kind == 'S':
+        return len(data.encode('utf-8'))
+    if kind == 'N':
+        return math.ceil(len(data.lstrip('-').replace('.', '').lstrip('0') or '0') / 2) + 1
+    if kind == 'B':
+        return len(data)
+    if kind in ('BOOL', 'NULL'):
+        return 1
+    if kind == 'M':
+        return 3 + sum(len(k.encode('utf-8')) + attribute_size(v) + 1 for k, v in data.items())
+    if kind == 'L':
+        return 3 + sum(attribute_size(v) + 1 for v in data)
+    if kind == 'SS':
+        return sum(len(v.encode('utf-8')) for v in data)
+    if kind == 'NS':
+        return sum(attribute_size({'N': v}) for v in data)
+    if kind == 'BS':
+        return sum(len(v) for v in data)
+    return 0
+
+
+def item_size(image: Optional[Dict[str, Any]]) -> int:
+    """Approximate stored size of a low-level item in bytes"""
+    if not image:
+        return 0
+    return sum(len(name.encode('utf-8')) + attribute_size(value) for name, value in image.items())
+
+
+class Meter:
+    """Counts DynamoDB wire bytes and estimates capacity for every call
+
+    Hooks the default boto3 session, so every client created by the data
+    layer after install() is measured, whichever engine it uses. Capacity
+    follows the on-demand rules: reads are charged on the full stored size
+    of the items touched, before projection, per 4 KB (half for eventually
+    consistent reads); writes are charged on the larger of the item before
+    and after the write, per 1 KB. Stored sizes are tracked from the
+    requests the meter sees, so estimates are exact for items written
+    through it. Projected Query results without key attributes fall back to
+    the returned size and under-count.
+    """
+
+    def __init__(self):
+        self.sizes: Dict[str, int] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear the counters, tracked item sizes are kept"""
+        self.calls = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.rcu = 0.0
+        self.wcu = 0.0
+
+    def install(self) -> None:
+        boto3.setup_default_session()
+        events = boto3.DEFAULT_SESSION.events
+        events.register('before-call.dynamodb', self._before_call)
+        events.register('after-call.dynamodb', self._after_call)
+
+    @staticmethod
+    def _key(table: str, key: Dict[str, Any]) -> str:
+        return json.dumps([table, {name: key[name] for name in ('pk', 'sk') if name in key}], sort_keys=True)
+
+    def _before_call(self, model, params, context, **kwargs) -> None:
+        body = params.get('body') or b''
+        self.calls += 1
+        self.request_bytes += len(body)
+        context['benchmark_request'] = json.loads(body) if body else {}
+
+    def _after_call(self, http_response, parsed, model, context, **kwargs) -> None:
+        self.response_bytes += len(http_response.content or b'')
+        request = context.get('benchmark_request', {})
+        table = request.get('TableName', '')
+        operation = model.name
+
+        if operation == 'PutItem':
+            key = self._key(table, request['Item'])
+            size = item_size(request['Item'])
+            self.wcu += math.ceil(max(size, self.sizes.get(key, 0)) / 1024) or 1
+            self.sizes[key] = size
+        elif operation == 'UpdateItem':
+            key = self._key(table, request['Key'])
+            before = self.sizes.get(key, 0)
+            # Full new item when the caller asked for it, otherwise assume the size held
+            after = item_size(parsed['Attributes']) if request.get('ReturnValues') == 'ALL_NEW' else before
+            self.wcu += math.ceil(max(before, after) / 1024) or 1
+            self.sizes[key] = after
+        elif operation == 'DeleteItem':
+            self.wcu += math.ceil(self.sizes.pop(self._key(table, request['Key']), 0) / 1024) or 1
+        elif operation == 'GetItem':
+            size = self.sizes.get(self._key(table, request['Key']), item_size(parsed.get('Item')))
+            self.rcu += self._read_units(size, request)
+        elif operation in ('Query', 'Scan'):
+            size = sum(
+                self.sizes.get(self._key(table, item), item_size(item))
+                for item in parsed.get('Items', [])
+            )
+            self.rcu += self._read_units(size, request)
+
+    @staticmethod
+    def _read_units(size: int, request: Dict[str, Any]) -> float:
+        units = math.ceil(size / 4096) or 1
+        return units if request.get('ConsistentRead') else units * 0.5
+
+
+def measure(meter: Meter, operation: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    """Run an operation repeatedly and return per-call latency, bytes and capacity"""
+    timings: List[float] = []
+    meter.reset()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    ordered = sorted(timings)
+    return {
+        'medianMs': statistics.median(ordered),
+        'p95Ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'calls': meter.calls / iterations,
+        'requestBytes': meter.request_bytes / iterations,
+        'responseBytes': meter.response_bytes / iterations,
+        'rcu': meter.rcu / iterations,
+        'wcu': meter.wcu / iterations
+    }
@@ -0,0 +1,99 @@
+"""Compare serial and batch page rendering of extract-pdf-content
+
+    cd lib/src/layer
+    python benchmarks/render_benchmark.py --pdf statement.pdf --workers 1,2,4,6
+
+Without --pdf a synthetic text-and-table document is generated. The serial
+path renders one page per invocation like a single-page task: open the
+page PDF, render, encode. Batch runs render the same pages through
+utilities.render.render_pages with the given worker counts. Image options
+and the text layer fast path come from the RENDER_* and TEXT_LAYER_MODE
+environment variables, as in the function; use TEXT_LAYER_MODE=off to time
+image rendering of born-digital pages.
+
+Cost per page is the Lambda GB-second price times the memory that gives
+that many vCPUs (1769 MB per vCPU), so it covers rendering only; Bedrock
+time is the same on both paths and overlaps rendering in batch mode.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+os.environ.setdefault('POWERTOOLS_LOG_LEVEL', 'ERROR')
+
+import fitz  # PyMuPDF
+from utilities.render import PageSource, RenderFailure, render_pages, render_source
+
+# x86 on-demand price per GB-second, us-west-2
+GB_SECOND_PRICE = 0.0000166667
+MB_PER_VCPU = 1769
+SERIAL_MEMORY_MB = 1024
+
+
+def synthetic_pdf(pages: int) -> bytes:
+    """A statement-like document: a header, paragraphs and a ruled table per page"""
+    with fitz.open() as document:
+        for number in range(1, pages + 1):
+            page = document.new_page()
+            page.insert_text((72, 72), f"Account statement - page {number}", fontsize=16)
+            for line in range(12):
+                page.insert_text((72, 110 + line * 14), f"Lorem ipsum dolor sit amet {number}-{line}, " * 3, fontsize=9)
+            for row in range(20):
+                y = 300 + row * 20
+                page.draw_line((72, y), (540, y))
+                page.insert_text((76, y + 14), f"2024-01-{row + 1:02d}   Transfer {row:04d}   {row * 17.5:10.2f}", fontsize=9)
+        return document.tobytes()
+
+
+def split(pdf_content: bytes) -> list:
+    """Split into single-page PDFs the way PageStoreUtil does"""
+    sources = []
+    with fitz.open(stream=pdf_content, filetype="pdf") as source:
+        for index in range(source.page_count):
+            with fitz.open() as page_document:
+                page_document.insert_pdf(source, from_page=index, to_page=index)
+                sources.append(PageSource(index + 1, page_document.tobytes(garbage=3, deflate=True), 1))
+    return sources
+
+
+def report(name: str, rendered: list, seconds: float, memory_mb: int) -> None:
+    pages = len(rendered)
+    cost = seconds * memory_mb / 1024 * GB_SECOND_PRICE / pages
+    image_kb = sum(len(page.image or page.text) for page in rendered) / pages / 1024
+    print(
+        f"{name:<18} {pages / seconds:8.2f} pages/s   {memory_mb:6d} MB   "
+        f"${cost * 1000:.5f} per 1000 pages   {image_kb:7.1f} KB per page"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pdf', help='PDF to render (optional, defaults to a synthetic document)')
+    parser.add_argument('--pages', type=int, default=24, help='Pages of the synthetic document')
+    parser.add_argument('--workers', default='1,2,4', help='Comma-separated batch worker counts')
+    args = parser.parse_args()
+
+    if args.pdf:
+        with open(args.pdf, 'rb') as f:
+            pdf_content = f.read()
+    else:
+        pdf_content = synthetic_pdf(args.pages)
+    sources = split(pdf_content)
+    print(f"{len(sources)} pages, {os.cpu_count()} CPUs available")
+
+    start = time.perf_counter()
+    rendered = [render_source(source) for source in sources]
+    report('serial', rendered, time.perf_counter() - start, SERIAL_MEMORY_MB)
+
+    for workers in (int(value) for value in args.workers.split(',')):
+        start = time.perf_counter()
+        rendered = list(render_pages(sources, workers=workers))
+        assert len(rendered) == len(sources)
+        assert not any(isinstance(page, RenderFailure) for page in rendered)
+        report(f'batch x{workers}', rendered, time.perf_counter() - start, max(SERIAL_MEMORY_MB, workers * MB_PER_VCPU))
+
+
+if __name__ == '__main__':
+    main()
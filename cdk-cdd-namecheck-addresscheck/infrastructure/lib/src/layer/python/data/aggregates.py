@@ -0,0 +1,172 @@
+from aws_lambda_powertools import Logger, Tracer
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from enum import Enum
+from boto3.dynamodb.conditions import Key
+from data.expressions import build_update
+from data.engine import Engine, get_table
+
+# Initialize powertools
+logger = Logger()
+tracer = Tracer()
+
+# Document type recorded when the analysis has none
+UNKNOWN_DOCUMENT_TYPE = "UNKNOWN"
+
+class Counter(str, Enum):
+    """Counter attributes kept on every aggregate item"""
+    PAGES_PROCESSED = "pagesProcessed"
+    TOKEN_INPUT = "tokenInput"
+    TOKEN_OUTPUT = "tokenOutput"
+    ANALYSES_COMPLETED = "analysesCompleted"
+    TEXT_LAYER_PAGES = "textLayerPages"
+    CACHED_PAGES = "cachedPages"
+
+class AggregatesUtil:
+    """Utility class for fleet-level usage counters in DynamoDB
+
+    One item per day and document type (pk ``DAY#yyyy-mm-dd``, sk
+    ``TYPE#documentType``) holds atomic counters updated with ADD, so a
+    dashboard reads a single partition per day instead of scanning analyses.
+    """
+
+    def __init__(self, table_name: str, engine: Optional[Engine] = None):
+        """Initialize AggregatesUtil with DynamoDB table name
+        
+        Args:
+            table_name: Name of the DynamoDB table
+            engine: Resource or low-level client engine (optional, defaults to DYNAMODB_ENGINE)
+        """
+        self.table = get_table(table_name, engine)
+
+    @staticmethod
+    def _day(day: Optional[str] = None) -> str:
+        return day or datetime.utcnow().strftime('%Y-%m-%d')
+
+    @tracer.capture_method
+    def record(
+        self,
+        document_type: Optional[str],
+        pages: int = 0,
+        token_input: int = 0,
+        token_output: int = 0,
+        analyses_completed: int = 0,
+        text_layer_pages: int = 0,
+        cached_pages: int = 0,
+        day: Optional[str] = None
+    ) -> None:
+        """Add to the counters of a day and document type
+
+        Counters are best effort: a failed write is logged and never fails
+        the workflow step that produced the usage.
+
+        Args:
+            document_type: Document type of the analysis
+            pages: Pages processed
+            token_input: Input tokens consumed
+            token_output: Output tokens produced
+            analyses_completed: Analyses completed
+            text_layer_pages: Pages extracted from their text layer instead of an image
+            cached_pages: Pages served from the extraction cache, their tokens are not counted
+            day: Day in yyyy-mm-dd (optional, defaults to today UTC)
+        """
+        counters = {
+            Counter.PAGES_PROCESSED.value: pages,
+            Counter.TOKEN_INPUT.value: token_input,
+            Counter.TOKEN_OUTPUT.value: token_output,
+            Counter.ANALYSES_COMPLETED.value: analyses_completed,
+            Counter.TEXT_LAYER_PAGES.value: text_layer_pages,
+            Counter.CACHED_PAGES.value: cached_pages
+        }
+        counters = {name: value for name, value in counters.items() if value}
+        if not counters:
+            return
+
+        day = self._day(day)
+        document_type = document_type or UNKNOWN_DOCUMENT_TYPE
+        try:
+            self.table.update_item(
+                Key={
+                    'pk': f'DAY#{day}',
+                    'sk': f'TYPE#{document_type}'
+                },
+                **build_update(
+                    set_values={
+                        'day': day,
+                        'documentType': document_type,
+                        'updatedAt': datetime.utcnow().isoformat() + 'Z'
+                    },
+                    add=counters
+                )
+            )
+        except Exception as e:
+            logger.exception("Failed to record aggregates", extra={
+                "day": day,
+                "documentType": document_type,
+                "counters": counters
+            })
+
+    @tracer.capture_method
+    def get_day(self, day: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the counters of every document type for a day
+
+        Args:
+            day: Day in yyyy-mm-dd (optional, defaults to today UTC)
+        """
+        try:
+            items = []
+            params = {
+                'KeyConditionExpression': Key('pk').eq(f'DAY#{self._day(day)}')
+            }
+            while True:
+                response = self.table.query(**params)
+                items.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    return items
+                params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+        except Exception as e:
+            logger.exception("Failed to get aggregates", extra={"day": day})
+            raise
+
+    @tracer.capture_method
+    def get_range(
+        self,
+        start_day: str,
+        end_day: Optional[str] = None,
+        document_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get counters per day between two days, inclusive
+
+        Args:
+            start_day: First day in yyyy-mm-dd
+            end_day: Last day in yyyy-mm-dd (optional, defaults to today UTC)
+            document_type: Only include this document type (optional)
+
+        Returns:
+            Dict with per day totals under ``days`` and the range total under ``total``
+        """
+        current = datetime.strptime(start_day, '%Y-%m-%d')
+        last = datetime.strptime(self._day(end_day), '%Y-%m-%d')
+
+        days = []
+        while current <= last:
+            day = current.strftime('%Y-%m-%d')
+            items = self.get_day(day)
+            if document_type:
+                items = [item for item in items if item.get('documentType') == document_type]
+            days.append({'day': day, **self.totals(items)})
+            current += timedelta(days=1)
+
+        return {
+            'days': days,
+            'total': self.totals(days)
+        }
+
+    @staticmethod
+    def totals(items: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Sum the counters of aggregate items"""
+        return {
+            counter.value: sum(int(item.get(counter.value, 0)) for item in items)
+            for counter in Counter
+        }
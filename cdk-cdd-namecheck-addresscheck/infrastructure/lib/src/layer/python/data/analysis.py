@@ -1,12 +1,26 @@
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.validation import validate
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+import base64
+import heapq
+import json
+import os
+import zlib
 import boto3
-from utilities.exceptions import AnalysisNotFoundException, ValidationError
+from utilities.exceptions import AnalysisNotFoundException, PreconditionFailedError, ValidationError
 from utilities.types import AnalysisItem, ObjectData, ChatMessage, AnalysisStatus
 from boto3.dynamodb.conditions import Key
+from data.base import build_projection, ReturnValues
+from data.codec import AttributeCodec
+from data.cache import ItemCache
+from data.expressions import build_update
+from data.transaction import TransactionWriter
+from data.engine import ClientTable, Engine, get_table, get_client
+from data.lifecycle import LifecyclePolicy
+from utilities.models import AnalysisRecord
 
 # Initialize powertools
 logger = Logger()
@@ -17,16 +31,85 @@ class DocumentType(str, Enum):
     BANK_STATEMENT = "BANK_STATEMENT"
     ANNUAL_REPORT = "ANNUAL_REPORT"
 
+# Attributes returned by list endpoints, the only non-key attributes
+# projected into createdAtShardIndex (see config/storage-config.ts).
+# Excludes objectsData/chatHistory/analysisResults which carry page content.
+ANALYSIS_SUMMARY_FIELDS = [
+    'analysisId',
+    'description',
+    'documentType',
+    'status',
+    'createdAt',
+    'lastUpdatedAt'
+]
+
+# Write shards of createdAtShardIndex, whose partition key is yearMonth#shard.
+# Writers and readers must agree, changing it requires re-deriving
+# yearMonthShard on existing items (see data.backfill).
+GSI_SHARDS = int(os.environ.get('ANALYSIS_GSI_SHARDS', '8'))
+SHARD_INDEX = 'createdAtShardIndex'
+# Base table and index keys, needed to resume a shard after a returned item
+SHARD_INDEX_KEYS = ('pk', 'sk', 'yearMonthShard', 'createdAt')
+# Cursor of a shard with no items left in the month
+SHARD_DONE = 'DONE'
+# Reads and conditional writes of a page before giving up on a busy analysis
+PAGE_WRITE_ATTEMPTS = 5
+
+def shard_key(analysis_id: str, year_month: str, shards: int = GSI_SHARDS) -> str:
+    """Return the createdAtShardIndex partition key of an analysis"""
+    return f"{year_month}#{zlib.crc32(analysis_id.encode('utf-8')) % shards}"
+
 class AnalysisUtil:
     """Utility class for handling Analysis operations in DynamoDB"""
 
-    def __init__(self, table_name: str):
+    def __init__(
+        self,
+        table_name: str,
+        codec: Optional[AttributeCodec] = None,
+        cache: Optional[ItemCache] = None,
+        engine: Optional[Engine] = None,
+        lifecycle: Optional[LifecyclePolicy] = None,
+        shards: Optional[int] = None
+    ):
         """Initialize AnalysisUtil with DynamoDB table name
         
         Args:
             table_name: Name of the DynamoDB table
+            codec: Codec for large text attributes (optional, defaults to env configuration)
+            cache: Read-through cache for get_analysis (optional, disabled by default)
+            engine: Resource or low-level client engine (optional, defaults to DYNAMODB_ENGINE)
+            lifecycle: TTL policy applied on status changes (optional, defaults to env configuration)
+            shards: Write shards of createdAtShardIndex (optional, defaults to ANALYSIS_GSI_SHARDS)
         """
-        self.table = boto3.resource('dynamodb').Table(table_name)
+        self.table = get_table(table_name, engine)
+        # Shards are queried from worker threads, which must not share a
+        # resource Table. The low-level client is thread-safe.
+        self.index_table = self.table if isinstance(self.table, ClientTable) else ClientTable(table_name)
+        self.shards = shards or GSI_SHARDS
+        self.codec = codec or AttributeCodec.from_env()
+        self.cache = cache
+        self.lifecycle = lifecycle or LifecyclePolicy.from_env()
+    
+    @property
+    def client(self):
+        """Shared low-level DynamoDB client"""
+        return get_client()
+    
+    def _stamp_ttl(
+        self,
+        set_values: Dict[str, Any],
+        remove: Optional[List[str]],
+        document_type: Optional[str] = None
+    ) -> Optional[List[str]]:
+        """Set or clear ttl for the status in set_values, returns the remove list"""
+        if 'status' not in set_values:
+            return remove
+        expires_at = self.lifecycle.expires_at(set_values['status'], document_type)
+        if expires_at is not None:
+            set_values['ttl'] = expires_at
+            return remove
+        # Statuses without retention, e.g. STARTED, must not inherit an earlier ttl
+        return [*(remove or []), 'ttl']
     
     @tracer.capture_method
     def create_analysis_item(
@@ -35,10 +118,14 @@ class AnalysisUtil:
         description: str,
         document_type: DocumentType,
         objects_data: List[ObjectData],
-        chat_history: List[ChatMessage],
-        status: AnalysisStatus
+        status: AnalysisStatus,
+        chat_history: Optional[List[ChatMessage]] = None
     ) -> AnalysisItem:
-        """Create a new analysis item with the correct structure"""
+        """Create a new analysis item with the correct structure
+        
+        Chat messages are stored as separate items, see data.chat.ChatUtil.
+        chat_history is only kept inline when given, for imported analyses.
+        """
         try:
             timestamp = datetime.utcnow()
             timestamp_str = timestamp.isoformat() + 'Z'
@@ -51,13 +138,16 @@ class AnalysisUtil:
                 'description': description,
                 'documentType': document_type,
                 'objectsData': objects_data,
-                'chatHistory': chat_history,
                 'status': status,
-                'yearMonth': year_month,
+                # yearMonth is no longer written, it keyed the single-partition createdAtIndex
+                'yearMonthShard': shard_key(analysis_id, year_month, self.shards),
                 'createdAt': timestamp_str,
                 'lastUpdatedAt': timestamp_str
             }
             
+            if chat_history:
+                analysis_item['chatHistory'] = chat_history
+            
             logger.info("Created analysis item", extra={"analysisId": analysis_id})
             return analysis_item
             
@@ -69,7 +159,13 @@ class AnalysisUtil:
     def create_analysis(self, analysis_item: AnalysisItem) -> AnalysisItem:
         """Create a new analysis record in DynamoDB"""
         try:
-            self.table.put_item(Item=analysis_item)
+            if self.cache:
+                self.cache.invalidate(analysis_item['analysisId'])
+            item = self.codec.encode_updates(analysis_item['analysisId'], analysis_item)
+            expires_at = self.lifecycle.expires_at(item.get('status'), item.get('documentType'))
+            if expires_at is not None:
+                item['ttl'] = expires_at
+            self.table.put_item(Item=item)
             logger.info("Analysis created", extra={"analysisId": analysis_item["analysisId"]})
             return analysis_item
         except Exception as e:
@@ -77,117 +173,286 @@ class AnalysisUtil:
             raise
     
     @tracer.capture_method
-    def get_analysis(self, analysis_id: str) -> Optional[Dict[str, Any]]:
-        """Get analysis by ID"""
+    def get_analysis(
+        self,
+        analysis_id: str,
+        fields: Optional[List[str]] = None,
+        validate: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Get analysis by ID
+        
+        Args:
+            analysis_id: Analysis ID
+            fields: Attribute paths to return (optional, defaults to the full item)
+            validate: When served from cache, confirm lastUpdatedAt with a
+                consistent read of that attribute only
+        """
         try:
-            response = self.table.get_item(
-                Key={
-                    "pk": f"ID#{analysis_id}",
-                    "sk": "METADATA"
-                }
-            )
-            return response.get("Item")
+            if self.cache:
+                # Cached projections carry the version used for validation,
+                # added before the lookup so reads and stores share one key
+                if fields and 'lastUpdatedAt' not in fields:
+                    fields = [*fields, 'lastUpdatedAt']
+                
+                cached = self.cache.get(analysis_id, fields)
+                if cached is not None:
+                    if not validate or self._is_current(analysis_id, cached):
+                        return cached
+                    self.cache.invalidate(analysis_id)
+            
+            item = self._fetch_analysis(analysis_id, fields, consistent=validate)
+            if self.cache and item:
+                self.cache.put(analysis_id, item, fields)
+            return item
         except Exception as e:
             logger.exception("Error getting analysis")
             raise
     
+    def _fetch_analysis(
+        self,
+        analysis_id: str,
+        fields: Optional[List[str]] = None,
+        consistent: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Read an analysis item from DynamoDB"""
+        params = {
+            'Key': {
+                "pk": f"ID#{analysis_id}",
+                "sk": "METADATA"
+            },
+            'ConsistentRead': consistent
+        }
+        if fields:
+            projection, expr_names = build_projection(fields)
+            params['ProjectionExpression'] = projection
+            params['ExpressionAttributeNames'] = expr_names
+        
+        response = self.table.get_item(**params)
+        return self.codec.wrap_item(response.get("Item"))
+    
+    @tracer.capture_method
+    def get_analysis_record(
+        self,
+        analysis_id: str,
+        fields: Optional[List[str]] = None,
+        lazy: Tuple[str, ...] = (),
+        consistent: bool = False
+    ) -> Optional[AnalysisRecord]:
+        """Get analysis by ID as a slotted record
+        
+        Reads through the low-level client, skipping the resource layer and
+        Decimal numbers. Text attributes are returned in their stored form,
+        decode them with ``self.codec.decode_text``.
+        
+        Args:
+            analysis_id: Analysis ID
+            fields: Attribute paths to return (optional, defaults to the full item)
+            lazy: Stored attribute names, e.g. ``objectsData``, converted on first access (optional)
+            consistent: Use a strongly consistent read
+        """
+        try:
+            params = {
+                'TableName': self.table.name,
+                'Key': {
+                    'pk': {'S': f'ID#{analysis_id}'},
+                    'sk': {'S': 'METADATA'}
+                },
+                'ConsistentRead': consistent
+            }
+            if fields:
+                projection, expr_names = build_projection(fields)
+                params['ProjectionExpression'] = projection
+                params['ExpressionAttributeNames'] = expr_names
+            
+            item = self.client.get_item(**params).get('Item')
+            return AnalysisRecord.from_image(item, lazy=lazy) if item else None
+        except Exception as e:
+            logger.exception("Error getting analysis record")
+            raise
+    
+    def _is_current(self, analysis_id: str, cached: Dict[str, Any]) -> bool:
+        """Check a cached item against the stored lastUpdatedAt"""
+        current = self._fetch_analysis(analysis_id, ['lastUpdatedAt'], consistent=True)
+        return bool(current) and current.get('lastUpdatedAt') == cached.get('lastUpdatedAt')
+    
     @tracer.capture_method
     def update_analysis(
         self, 
         analysis_id: str, 
-        updates: Dict[str, Any]
+        updates: Dict[str, Any],
+        returns: ReturnValues = ReturnValues.ALL_NEW,
+        remove: Optional[List[str]] = None,
+        append: Optional[Dict[str, List[Any]]] = None,
+        increment: Optional[Dict[str, Any]] = None,
+        expected: Optional[Dict[str, Any]] = None,
+        document_type: Optional[str] = None,
+        expected_sizes: Optional[Dict[str, int]] = None
     ) -> Dict[str, Any]:
-        """Update an analysis record"""
+        """Update an analysis record
+        
+        A status change also sets or clears ttl according to the lifecycle policy.
+        
+        Args:
+            analysis_id: Analysis ID
+            updates: Attribute paths to set, nested paths allowed
+            returns: Attributes to return (NONE, UPDATED_NEW or ALL_NEW)
+            remove: Attribute paths to remove (optional)
+            append: List attribute paths to append to (optional)
+            increment: Number attribute paths to increment (optional)
+            expected: Attribute paths that must hold the given values (optional)
+            document_type: Document type used for per-type retention (optional)
+            expected_sizes: List paths that must hold the given number of elements (optional)
+        
+        Raises:
+            PreconditionFailedError: If expected or expected_sizes do not hold
+        """
         try:
             # Validate status if included
             if 'status' in updates:
                 if not isinstance(updates['status'], AnalysisStatus):
                     raise ValidationError(f"Invalid status: {updates['status']}")
             
-            update_expr = 'SET ' + ', '.join(f'#{k} = :{k}' for k in updates.keys())
-            update_expr += ', lastUpdatedAt = :lastUpdatedAt'
+            if self.cache:
+                self.cache.invalidate(analysis_id)
             
-            expr_names = {f'#{k}': k for k in updates.keys()}
-            expr_values = {f':{k}': v for k, v in updates.items()}
-            expr_values[':lastUpdatedAt'] = datetime.utcnow().isoformat() + 'Z'
+            set_values = self.codec.encode_updates(analysis_id, updates)
+            set_values['lastUpdatedAt'] = datetime.utcnow().isoformat() + 'Z'
+            remove = self._stamp_ttl(set_values, remove, document_type)
             
             response = self.table.update_item(
                 Key={
                     'pk': f'ID#{analysis_id}',
                     'sk': 'METADATA'
                 },
-                UpdateExpression=update_expr,
-                ExpressionAttributeNames=expr_names,
-                ExpressionAttributeValues=expr_values,
-                ReturnValues='ALL_NEW',
-                ConditionExpression='attribute_exists(pk)'
+                ReturnValues=ReturnValues(returns).value,
+                **build_update(
+                    set_values=set_values,
+                    remove=remove,
+                    append=append,
+                    increment=increment,
+                    expected=expected,
+                    expected_sizes=expected_sizes,
+                    condition='attribute_exists(pk)'
+                )
             )
             
             logger.info("Analysis updated", extra={
                 "analysisId": analysis_id,
-                "updates": updates
+                "updatedFields": [*updates, *(remove or []), *(append or {}), *(increment or {})]
             })
             
-            return response['Attributes']
+            return self.codec.wrap_item(response.get('Attributes', {}))
             
         except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+            if expected or expected_sizes:
+                logger.warning("Analysis changed before update", extra={"analysisId": analysis_id})
+                raise PreconditionFailedError(f"Analysis precondition failed: {analysis_id}")
             logger.warning("Analysis not found for update", extra={"analysisId": analysis_id})
             raise AnalysisNotFoundException(f"Analysis not found: {analysis_id}")
         except Exception as e:
             logger.exception("Failed to update analysis")
             raise
 
+    def transact_update(
+        self,
+        transaction: TransactionWriter,
+        analysis_id: str,
+        updates: Dict[str, Any],
+        expected: Optional[Dict[str, Any]] = None,
+        document_type: Optional[str] = None
+    ) -> TransactionWriter:
+        """Add an analysis update to a transaction
+        
+        Args:
+            transaction: Transaction to add the update to
+            analysis_id: Analysis ID
+            updates: Attribute paths to set
+            expected: Attribute paths that must hold the given values (optional)
+            document_type: Document type used for per-type retention (optional)
+        """
+        if 'status' in updates and not isinstance(updates['status'], AnalysisStatus):
+            raise ValidationError(f"Invalid status: {updates['status']}")
+        
+        if self.cache:
+            self.cache.invalidate(analysis_id)
+        
+        set_values = self.codec.encode_updates(analysis_id, updates)
+        set_values['lastUpdatedAt'] = datetime.utcnow().isoformat() + 'Z'
+        remove = self._stamp_ttl(set_values, None, document_type)
+        
+        return transaction.update(
+            self.table.name,
+            {'pk': f'ID#{analysis_id}', 'sk': 'METADATA'},
+            set_values=set_values,
+            remove=remove,
+            expected=expected,
+            condition='attribute_exists(pk)'
+        )
+
     @tracer.capture_method
     def list_analyses(
         self, 
         limit: int = 50, 
-        next_token: Optional[str] = None
+        next_token: Optional[str] = None,
+        fields: Optional[List[str]] = ANALYSIS_SUMMARY_FIELDS
     ) -> Dict[str, Any]:
-        """List analyses with pagination using the createdAtIndex GSI"""
+        """List analyses newest first with pagination using the createdAtShardIndex GSI
+        
+        Every write shard of the month is queried in parallel and the
+        results are merged by createdAt. The current month is listed first,
+        then the previous month.
+        
+        Args:
+            limit: Maximum number of items to return
+            next_token: Pagination token from a previous call
+            fields: Attribute paths to return, defaults to summary fields.
+                The index projects only ANALYSIS_SUMMARY_FIELDS and keys, so
+                other attributes are never returned.
+        """
         try:
-            current_year_month = datetime.utcnow().strftime("%Y-%m")
+            if next_token:
+                try:
+                    state = json.loads(base64.b64decode(next_token.encode()).decode())
+                    months, cursors = state['months'], state['cursors']
+                except Exception:
+                    raise ValidationError("Invalid next token")
+            else:
+                current_year_month = datetime.utcnow().strftime("%Y-%m")
+                months = [current_year_month, self._get_previous_month(current_year_month)]
+                cursors = {}
             
             params = {
-                'IndexName': 'createdAtIndex',
-                'KeyConditionExpression': 'yearMonth = :ym',
-                'ExpressionAttributeValues': {
-                    ':ym': current_year_month
-                },
-                'Limit': limit,
+                'IndexName': SHARD_INDEX,
                 'ScanIndexForward': False  # Sort descending
             }
             
-            if next_token:
-                try:
-                    params['ExclusiveStartKey'] = json.loads(
-                        base64.b64decode(next_token.encode()).decode()
-                    )
-                except Exception:
-                    raise ValidationError("Invalid next token")
+            # Resuming a shard needs the index keys of its last returned item
+            extra_fields = []
+            if fields:
+                extra_fields = [key for key in SHARD_INDEX_KEYS if key not in fields]
+                projection, expr_names = build_projection([*fields, *extra_fields])
+                params['ProjectionExpression'] = projection
+                params['ExpressionAttributeNames'] = expr_names
             
-            # Query current month
-            response = self.table.query(**params)
-            items = response.get('Items', [])
+            items = []
+            while months and len(items) < limit:
+                page, cursors = self._merge_shards(months[0], cursors, limit - len(items), params)
+                items.extend(page)
+                if all(cursors.get(str(shard)) == SHARD_DONE for shard in range(self.shards)):
+                    months, cursors = months[1:], {}
             
-            # Query previous month if needed
-            if len(items) < limit and 'LastEvaluatedKey' not in response:
-                previous_month = self._get_previous_month(current_year_month)
-                params['ExpressionAttributeValues'] = {':ym': previous_month}
-                
-                prev_response = self.table.query(**params)
-                items.extend(prev_response.get('Items', [])[:limit - len(items)])
-                
-                if 'LastEvaluatedKey' in prev_response and len(items) == limit:
-                    response['LastEvaluatedKey'] = prev_response['LastEvaluatedKey']
+            for item in items:
+                for key in extra_fields:
+                    item.pop(key, None)
             
             result = {
-                'items': items[:limit],
+                'items': [self.codec.wrap_item(item) for item in items],
                 'fetchedAt': datetime.utcnow().isoformat() + 'Z'
             }
             
-            if 'LastEvaluatedKey' in response:
+            if months:
                 result['nextToken'] = base64.b64encode(
-                    json.dumps(response['LastEvaluatedKey']).encode()
+                    json.dumps({'months': months, 'cursors': cursors}).encode()
                 ).decode()
             
             logger.info("Listed analyses", extra={
@@ -201,6 +466,67 @@ class AnalysisUtil:
             logger.exception("Failed to list analyses")
             raise
 
+    def _merge_shards(
+        self,
+        year_month: str,
+        cursors: Dict[str, Any],
+        limit: int,
+        params: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Query the open shards of a month in parallel and k-way merge them by createdAt
+        
+        Items are only returned down to the oldest createdAt every shard
+        with more data has reached, so nothing newer is left unread.
+        
+        Returns:
+            Tuple of (items newest first, updated cursors per shard)
+        """
+        def query_shard(shard: int) -> Tuple[int, List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+            shard_params = dict(
+                params,
+                KeyConditionExpression=Key('yearMonthShard').eq(f'{year_month}#{shard}'),
+                Limit=limit
+            )
+            if cursors.get(str(shard)):
+                shard_params['ExclusiveStartKey'] = cursors[str(shard)]
+            response = self.index_table.query(**shard_params)
+            return shard, response.get('Items', []), response.get('LastEvaluatedKey')
+        
+        open_shards = [shard for shard in range(self.shards) if cursors.get(str(shard)) != SHARD_DONE]
+        with ThreadPoolExecutor(max_workers=len(open_shards) or 1) as executor:
+            results = list(executor.map(query_shard, open_shards))
+        
+        # A shard with more data bounds how far the merge can safely go
+        horizon = max(
+            (shard_items[-1]['createdAt'] for _, shard_items, has_more in results if has_more and shard_items),
+            default=''
+        )
+        merged = heapq.merge(
+            *[[(item['createdAt'], shard, item) for item in shard_items] for shard, shard_items, _ in results],
+            key=lambda entry: entry[0],
+            reverse=True
+        )
+        
+        items = []
+        consumed = {shard: 0 for shard in open_shards}
+        last_item = {}
+        for created_at, shard, item in merged:
+            if len(items) == limit or created_at < horizon:
+                break
+            items.append(item)
+            consumed[shard] += 1
+            last_item[shard] = item
+        
+        cursors = dict(cursors)
+        for shard, shard_items, last_key in results:
+            if not last_key and consumed[shard] == len(shard_items):
+                cursors[str(shard)] = SHARD_DONE
+            elif shard in last_item:
+                cursors[str(shard)] = {key: last_item[shard][key] for key in SHARD_INDEX_KEYS}
+            elif not shard_items:
+                cursors[str(shard)] = last_key
+        return items, cursors
+
     def _get_previous_month(self, year_month: str) -> str:
         """Helper to get the previous month in YYYY-MM format"""
         year, month = map(int, year_month.split('-'))
@@ -216,53 +542,92 @@ class AnalysisUtil:
         page_number: int,
         content: str,
         token_input: int,
-        token_output: int
+        token_output: int,
+        returns: ReturnValues = ReturnValues.ALL_NEW
     ) -> Dict[str, Any]:
-        """Updates a specific page's content in an analysis"""
+        """Updates a specific page's content in an analysis
+        
+        Only the page entry and the object's token counters are written, the
+        rest of objectsData is left untouched. The write is conditional on
+        what was read: an append on the number of pages, a replacement on
+        the page and token counts at that index. If another writer stored a
+        page in between, the analysis is read again and the write retried,
+        so a page is never added twice or written over another page.
+        """
         try:
-            # Get current analysis
-            analysis = self.get_analysis(analysis_id)
-            
-            # Find the object
-            for obj in analysis.get('objectsData', []):
-                if obj['object'] == object_key:
-                    # Initialize data array if not exists
-                    if 'data' not in obj:
-                        obj['data'] = []
-                    
-                    # Find or create page entry
-                    page_entry = None
-                    for page in obj['data']:
-                        if page.get('page') == page_number:
-                            page_entry = page
-                            break
-                    
-                    if not page_entry:
-                        page_entry = {'page': page_number}
-                        obj['data'].append(page_entry)
-                    
-                    # Update page content and tokens
-                    page_entry['content'] = content
-                    page_entry['tokenInput'] = token_input
-                    page_entry['tokenOutput'] = token_output
-                    
-                    # Update object level token counts
-                    obj['tokenInput'] = sum(
-                        p.get('tokenInput', 0) 
-                        for p in obj['data']
-                    )
-                    obj['tokenOutput'] = sum(
-                        p.get('tokenOutput', 0) 
-                        for p in obj['data']
-                    )
-                    
-                    # Update the analysis
+            for attempt in range(PAGE_WRITE_ATTEMPTS):
+                # Get current analysis, bypassing the cache for read-modify-write
+                analysis = self._fetch_analysis(analysis_id, ['objectsData'], consistent=True)
+                if not analysis:
+                    raise AnalysisNotFoundException(f"Analysis not found: {analysis_id}")
+                
+                obj_index = next(
+                    (i for i, obj in enumerate(analysis.get('objectsData', [])) if obj['object'] == object_key),
+                    None
+                )
+                if obj_index is None:
+                    raise ValidationError(f"Object {object_key} not found")
+                
+                obj = analysis['objectsData'][obj_index]
+                obj_path = f'objectsData[{obj_index}]'
+                page_entry = self.codec.encode_page(analysis_id, object_key, {
+                    'page': page_number,
+                    'content': content,
+                    'tokenInput': token_input,
+                    'tokenOutput': token_output
+                })
+                
+                # Find existing page entry
+                pages = obj.get('data', [])
+                page_index = next(
+                    (i for i, page in enumerate(pages) if page.get('page') == page_number),
+                    None
+                )
+                
+                updates = {}
+                append = {}
+                expected = {f'{obj_path}.object': object_key}
+                expected_sizes = {}
+                if page_index is None:
+                    append[f'{obj_path}.data'] = [page_entry]
+                    expected_sizes[f'{obj_path}.data'] = len(pages)
+                    previous_input = previous_output = 0
+                else:
+                    page_path = f'{obj_path}.data[{page_index}]'
+                    updates[page_path] = page_entry
+                    expected[f'{page_path}.page'] = page_number
+                    previous_input = pages[page_index].get('tokenInput', 0)
+                    previous_output = pages[page_index].get('tokenOutput', 0)
+                    # The counter delta is only right for the tokens that were read
+                    for field in ('tokenInput', 'tokenOutput'):
+                        if field in pages[page_index]:
+                            expected[f'{page_path}.{field}'] = pages[page_index][field]
+                
+                try:
+                    # Update object level token counts by the page delta
                     return self.update_analysis(
                         analysis_id=analysis_id,
-                        updates={'objectsData': analysis['objectsData']}
+                        updates=updates,
+                        append=append,
+                        increment={
+                            f'{obj_path}.tokenInput': token_input - previous_input,
+                            f'{obj_path}.tokenOutput': token_output - previous_output
+                        },
+                        expected=expected,
+                        expected_sizes=expected_sizes,
+                        returns=returns
                     )
+                except PreconditionFailedError:
+                    logger.info("Pages changed since read, retrying", extra={
+                        "analysisId": analysis_id,
+                        "objectKey": object_key,
+                        "page": page_number,
+                        "attempt": attempt + 1
+                    })
             
-            raise ValidationError(f"Object {object_key} not found")
+            raise PreconditionFailedError(
+                f"Page {page_number} of {object_key} kept changing, gave up after {PAGE_WRITE_ATTEMPTS} attempts"
+            )
             
         except Exception as e:
             logger.exception(
@@ -276,26 +641,31 @@ class AnalysisUtil:
             raise
 
     @tracer.capture_method
-    def update_status(self, unique_id: str, status: AnalysisStatus) -> AnalysisItem:
+    def update_status(
+        self,
+        unique_id: str,
+        status: AnalysisStatus,
+        returns: ReturnValues = ReturnValues.ALL_NEW,
+        document_type: Optional[str] = None
+    ) -> AnalysisItem:
         """
         Updates the status of an analysis
         """
         now = datetime.utcnow().isoformat() + 'Z'
         
+        if self.cache:
+            self.cache.invalidate(unique_id)
+        
+        set_values = {'status': status, 'lastUpdatedAt': now}
+        remove = self._stamp_ttl(set_values, None, document_type)
+        
         response = self.table.update_item(
             Key={
                 'pk': f'ID#{unique_id}',
                 'sk': 'METADATA'
             },
-            UpdateExpression='SET #status = :status, lastUpdatedAt = :lastUpdatedAt',
-            ExpressionAttributeNames={
-                '#status': 'status'
-            },
-            ExpressionAttributeValues={
-                ':status': status,
-                ':lastUpdatedAt': now
-            },
-            ReturnValues='ALL_NEW'
+            ReturnValues=ReturnValues(returns).value,
+            **build_update(set_values=set_values, remove=remove)
         )
         
-        return response['Attributes']
\ No newline at end of file
+        return self.codec.wrap_item(response.get('Attributes', {}))
\ No newline at end of file
@@ -0,0 +1,168 @@
+from aws_lambda_powertools import Logger, Tracer
+from typing import List, Dict, Any, Optional, Iterator, Callable
+from collections import defaultdict
+from datetime import datetime
+import base64
+import gzip
+import io
+import json
+import boto3
+from botocore.exceptions import ClientError
+
+# Initialize powertools
+logger = Logger()
+tracer = Tracer()
+
+UNKNOWN_PARTITION = "UNKNOWN"
+
+def year_month_of(item: Dict[str, Any]) -> str:
+    """Archive partition of an analysis item, its creation month"""
+    return item.get('yearMonth') or (item.get('createdAt') or '')[:7] or UNKNOWN_PARTITION
+
+def _json_default(value: Any) -> Any:
+    """Serialize values json does not handle natively"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode('ascii')
+    if hasattr(value, 'value') and isinstance(value.value, (bytes, bytearray)):
+        return base64.b64encode(value.value).decode('ascii')
+    return str(value)
+
+class ArchiveUtil:
+    """Utility class for the S3 archive of expired analyses
+
+    Items are written as gzip-compressed JSON Lines under Hive-style
+    partitions, ``<prefix>yearMonth=YYYY-MM/documentType=TYPE/<batch>.jsonl.gz``,
+    so the archive can be read here or queried with Athena.
+    """
+
+    def __init__(self, bucket_name: str, prefix: str = 'analyses/'):
+        """Initialize ArchiveUtil
+
+        Args:
+            bucket_name: Archive bucket name
+            prefix: Key prefix of the archive
+        """
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.s3_client = boto3.client('s3')
+
+    def partition_prefix(self, year_month: str, document_type: Optional[str] = None) -> str:
+        prefix = f'{self.prefix}yearMonth={year_month}/'
+        if document_type:
+            prefix += f'documentType={document_type}/'
+        return prefix
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    @tracer.capture_method
+    def archive(self, items: List[Dict[str, Any]], batch_id: str) -> List[str]:
+        """Write items to the archive, one object per partition
+
+        Objects are written once: a key that already exists was written by
+        an earlier attempt of the same batch and is kept as is, so retries
+        never replace archived items with a partial copy.
+
+        Args:
+            items: Decoded items to archive
+            batch_id: ID of the batch, the same on every retry, used as object name
+
+        Returns:
+            Keys of the written objects
+        """
+        partitions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for item in items:
+            prefix = self.partition_prefix(
+                year_month_of(item),
+                item.get('documentType') or UNKNOWN_PARTITION
+            )
+            partitions[prefix].append(item)
+
+        keys = []
+        try:
+            for prefix, records in partitions.items():
+                body = '\n'.join(
+                    json.dumps(record, default=_json_default, separators=(',', ':'))
+                    for record in records
+                ) + '\n'
+                key = f'{prefix}{batch_id}.jsonl.gz'
+                keys.append(key)
+                if self._exists(key):
+                    logger.info("Archive object exists, skipped", extra={"key": key})
+                    continue
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    Body=gzip.compress(body.encode('utf-8')),
+                    ContentType='application/x-ndjson',
+                    ContentEncoding='gzip'
+                )
+
+            logger.info("Archived items", extra={"itemCount": len(items), "objectCount": len(keys)})
+            return keys
+
+        except Exception as e:
+            logger.exception("Failed to archive items", extra={"batchId": batch_id})
+            raise
+
+    def _read_object(self, key: str) -> Iterator[Dict[str, Any]]:
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        with gzip.GzipFile(fileobj=io.BytesIO(response['Body'].read())) as stream:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _keys(self, prefix: str) -> Iterator[str]:
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield obj['Key']
+
+    @staticmethod
+    def _months(start_month: str, end_month: str) -> Iterator[str]:
+        year, month = map(int, start_month.split('-'))
+        last = tuple(map(int, end_month.split('-')))
+        while (year, month) <= last:
+            yield f'{year}-{month:02d}'
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    @tracer.capture_method
+    def query(
+        self,
+        start_month: str,
+        end_month: Optional[str] = None,
+        document_type: Optional[str] = None,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate archived items created between two months, inclusive
+
+        Only the partitions in range are listed and read.
+
+        Args:
+            start_month: First month in YYYY-MM
+            end_month: Last month in YYYY-MM (optional, defaults to the current month)
+            document_type: Only read this document type partition (optional)
+            predicate: Filter applied to every item (optional)
+        """
+        end_month = end_month or datetime.utcnow().strftime('%Y-%m')
+        for year_month in self._months(start_month, end_month):
+            for key in self._keys(self.partition_prefix(year_month, document_type)):
+                for item in self._read_object(key):
+                    if predicate is None or predicate(item):
+                        yield item
+
+    @tracer.capture_method
+    def get_analysis(self, analysis_id: str, year_month: str) -> Optional[Dict[str, Any]]:
+        """Find an archived analysis, year_month is its yearMonth (creation month)"""
+        for item in self.query(year_month, year_month, predicate=lambda i: i.get('analysisId') == analysis_id):
+            if item.get('sk') == 'METADATA':
+                return item
+        return None
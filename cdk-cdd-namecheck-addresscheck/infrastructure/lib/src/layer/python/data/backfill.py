@@ -0,0 +1,301 @@
+from aws_lambda_powertools import Logger
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable
+import json
+import os
+import threading
+import time
+import boto3
+from data.analysis import shard_key
+from data.base import build_projection
+from data.engine import ClientTable
+from data.expressions import build_update
+
+# Initialize powertools
+logger = Logger()
+
+# Returns the attributes to set on an item, or None to leave it unchanged
+Transform = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+class CapacityThrottle:
+    """Token bucket shared by all segments, in capacity units per second"""
+
+    def __init__(self, units_per_second: Optional[float]):
+        """Initialize CapacityThrottle
+
+        Args:
+            units_per_second: Target consumed capacity rate, None disables throttling
+        """
+        self.units_per_second = units_per_second
+        self._lock = threading.Lock()
+        self._available = units_per_second or 0.0
+        self._updated = time.monotonic()
+
+    def consume(self, units: float) -> None:
+        """Record consumed capacity, sleeping while the budget is overdrawn"""
+        if not self.units_per_second:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._available = min(
+                self.units_per_second,
+                self._available + (now - self._updated) * self.units_per_second
+            )
+            self._updated = now
+            self._available -= units
+            wait = -self._available / self.units_per_second if self._available < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+class FileCheckpoint:
+    """Stores per-segment progress in a local JSON file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def save(self, state: Dict[str, Any]) -> None:
+        with self._lock:
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+
+
+class S3Checkpoint:
+    """Stores per-segment progress in an S3 object"""
+
+    def __init__(self, bucket: str, key: str):
+        self.bucket = bucket
+        self.key = key
+        self.s3_client = boto3.client('s3')
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Any]:
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self.key)
+        except self.s3_client.exceptions.NoSuchKey:
+            return {}
+        return json.loads(response['Body'].read())
+
+    def save(self, state: Dict[str, Any]) -> None:
+        with self._lock:
+            self.s3_client.put_object(Bucket=self.bucket, Key=self.key, Body=json.dumps(state))
+
+
+class BackfillJob:
+    """Segmented parallel Scan over a table with throttling and checkpoints
+
+    Each of ``segments`` Scan segments runs on a worker thread through the
+    shared low-level client. Consumed read and write capacity is charged
+    to one throttle, and every finished page records its LastEvaluatedKey
+    in the checkpoint so an interrupted run resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        segments: int = 8,
+        workers: Optional[int] = None,
+        page_size: int = 200,
+        capacity_per_second: Optional[float] = None,
+        checkpoint=None,
+        fields: Optional[List[str]] = None,
+        filter_expression=None
+    ):
+        """Initialize BackfillJob
+
+        Args:
+            table_name: Name of the DynamoDB table
+            segments: Scan TotalSegments
+            workers: Worker threads (optional, defaults to segments)
+            page_size: Scan page Limit
+            capacity_per_second: Target consumed capacity across reads and writes (optional)
+            checkpoint: FileCheckpoint or S3Checkpoint for resumption (optional)
+            fields: Attribute paths to read (optional, defaults to full items)
+            filter_expression: Scan filter as an Attr condition (optional)
+        """
+        self.table = ClientTable(table_name)
+        self.segments = segments
+        self.workers = workers or segments
+        self.page_size = page_size
+        self.throttle = CapacityThrottle(capacity_per_second)
+        self.checkpoint = checkpoint
+        self.fields = fields
+        self.filter_expression = filter_expression
+        self._state: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.stats = {'scanned': 0, 'updated': 0, 'skipped': 0, 'failed': 0, 'consumedCapacity': 0.0}
+
+    def _count(self, **counts) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                self.stats[name] += value
+
+    def _save(self, segment: int, last_key: Optional[Dict[str, Any]], done: bool) -> None:
+        with self._lock:
+            self._state[str(segment)] = {'lastEvaluatedKey': last_key, 'done': done}
+            state = dict(self._state)
+        if self.checkpoint:
+            self.checkpoint.save(state)
+
+    def _scan_segment(self, segment: int, process: Callable[[List[Dict[str, Any]]], None]) -> None:
+        progress = self._state.get(str(segment), {})
+        if progress.get('done'):
+            return
+
+        params: Dict[str, Any] = {
+            'Segment': segment,
+            'TotalSegments': self.segments,
+            'Limit': self.page_size,
+            'ReturnConsumedCapacity': 'TOTAL'
+        }
+        if self.fields:
+            projection, expr_names = build_projection(self.fields)
+            params['ProjectionExpression'] = projection
+            params['ExpressionAttributeNames'] = expr_names
+        if self.filter_expression is not None:
+            params['FilterExpression'] = self.filter_expression
+        if progress.get('lastEvaluatedKey'):
+            params['ExclusiveStartKey'] = progress['lastEvaluatedKey']
+
+        while True:
+            response = self.table.scan(**params)
+            units = response.get('ConsumedCapacity', {}).get('CapacityUnits', 0.0)
+            self.throttle.consume(units)
+            items = response.get('Items', [])
+            self._count(scanned=len(items), consumedCapacity=units)
+
+            process(items)
+
+            last_key = response.get('LastEvaluatedKey')
+            self._save(segment, last_key, done=last_key is None)
+            if last_key is None:
+                return
+            params['ExclusiveStartKey'] = last_key
+
+    def run(self, process: Callable[[List[Dict[str, Any]]], None]) -> Dict[str, Any]:
+        """Scan every segment in parallel, calling process with each page of items
+
+        Returns:
+            Counters of scanned, updated, skipped and failed items and consumed capacity
+        """
+        self._state = self.checkpoint.load() if self.checkpoint else {}
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(self._scan_segment, segment, process)
+                for segment in range(self.segments)
+            ]
+            for future in futures:
+                future.result()
+
+        stats = dict(self.stats, seconds=round(time.monotonic() - started, 2))
+        logger.info("Backfill finished", extra={"table": self.table.name, **stats})
+        return stats
+
+    def run_update(
+        self,
+        transform: Transform,
+        key_fields: tuple = ('pk', 'sk'),
+        version_field: str = 'lastUpdatedAt'
+    ) -> Dict[str, Any]:
+        """Apply transform to every item and write back the attributes it returns
+
+        Writes are conditional on the item still existing with the
+        version_field value that was scanned, so an item changed since the
+        scan is skipped and counted instead of overwritten with stale values.
+        Writes are charged to the same capacity throttle. Failed writes are
+        logged and counted, they do not stop the job.
+
+        Args:
+            transform: Returns the attributes to set, or None to skip the item
+            key_fields: Key attribute names of the table
+            version_field: Attribute that changes on every write to an item
+        """
+        if self.fields and version_field not in self.fields:
+            self.fields = [*self.fields, version_field]
+
+        def process(items: List[Dict[str, Any]]) -> None:
+            for item in items:
+                updates = transform(item)
+                if not updates:
+                    continue
+                key = {name: item[name] for name in key_fields if name in item}
+                condition = f'attribute_exists({key_fields[0]})'
+                expected = {}
+                if version_field in item:
+                    expected[version_field] = item[version_field]
+                else:
+                    condition += f' AND attribute_not_exists({version_field})'
+                try:
+                    response = self.table.update_item(
+                        Key=key,
+                        ReturnConsumedCapacity='TOTAL',
+                        **build_update(set_values=updates, expected=expected, condition=condition)
+                    )
+                    units = response.get('ConsumedCapacity', {}).get('CapacityUnits', 0.0)
+                    self.throttle.consume(units)
+                    self._count(updated=1, consumedCapacity=units)
+                except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+                    logger.info("Item changed since the scan, skipped", extra={"key": key})
+                    self._count(skipped=1)
+                except Exception as e:
+                    logger.exception("Backfill update failed", extra={"key": key})
+                    self._count(failed=1)
+
+        return self.run(process)
+
+
+def derive_year_month(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Transform setting yearMonth from createdAt on analysis items that lack it
+
+    yearMonth only keys the legacy createdAtIndex, new items no longer write it.
+    """
+    created_at = item.get('createdAt')
+    if item.get('sk') != 'METADATA' or not created_at or item.get('yearMonth') == created_at[:7]:
+        return None
+    return {'yearMonth': created_at[:7]}
+
+def derive_year_month_shard(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Transform setting yearMonthShard on analysis items, for createdAtShardIndex
+
+    Uses ANALYSIS_GSI_SHARDS, so rerunning after changing the shard count
+    moves items to their new shard.
+    """
+    created_at = item.get('createdAt')
+    if item.get('sk') != 'METADATA' or not created_at or not item.get('analysisId'):
+        return None
+    shard = shard_key(item['analysisId'], item.get('yearMonth') or created_at[:7])
+    if item.get('yearMonthShard') == shard:
+        return None
+    return {'yearMonthShard': shard}
+
+def recompute_token_totals(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Transform recomputing object token totals from their pages"""
+    if item.get('sk') != 'METADATA':
+        return None
+    updates = {}
+    for index, obj in enumerate(item.get('objectsData') or []):
+        pages = obj.get('data') or []
+        token_input = sum(int(page.get('tokenInput', 0)) for page in pages)
+        token_output = sum(int(page.get('tokenOutput', 0)) for page in pages)
+        if obj.get('tokenInput') != token_input:
+            updates[f'objectsData[{index}].tokenInput'] = token_input
+        if obj.get('tokenOutput') != token_output:
+            updates[f'objectsData[{index}].tokenOutput'] = token_output
+    return updates or None
+
+TRANSFORMS: Dict[str, Transform] = {
+    'derive-year-month': derive_year_month,
+    'derive-year-month-shard': derive_year_month_shard,
+    'recompute-token-totals': recompute_token_totals
+}
@@ -1,33 +1,62 @@
-from typing import Dict, Any, Optional
+from enum import Enum
+from typing import Dict, Any, Optional, List, Tuple
 from aws_lambda_powertools import Logger, Tracer
+from data.expressions import alias_path, build_update
+from data.engine import Engine, get_table
 
 # Initialize powertools
 logger = Logger()
 tracer = Tracer()
 
+class ReturnValues(str, Enum):
+    """Attributes returned by update calls"""
+    NONE = "NONE"
+    UPDATED_NEW = "UPDATED_NEW"
+    ALL_NEW = "ALL_NEW"
+
+def build_projection(fields: List[str]) -> Tuple[str, Dict[str, str]]:
+    """Build a ProjectionExpression with aliased attribute names
+    
+    Every path segment is aliased so reserved words (status, data, ttl...)
+    can be projected. Nested paths use dots and list indexes, e.g.
+    ``analysisParameters.onboardingId`` or ``objectsData[0].object``.
+    
+    Args:
+        fields: Attribute paths to project
+        
+    Returns:
+        Tuple of (ProjectionExpression, ExpressionAttributeNames)
+    """
+    aliases: Dict[str, str] = {}
+    expressions = [alias_path(field, aliases, prefix='#p') for field in fields]
+    expr_names = {alias: name for name, alias in aliases.items()}
+    return ', '.join(expressions), expr_names
+
 class BaseDataUtil:
     """Base class for data utilities with common functionality"""
 
-    def __init__(self, table_name: str):
+    def __init__(self, table_name: str, engine: Optional[Engine] = None):
         """Initialize BaseDataUtil with DynamoDB table name
         
         Args:
             table_name: Name of the DynamoDB table
+            engine: Resource or low-level client engine (optional, defaults to DYNAMODB_ENGINE)
         """
-        import boto3
-        self.table = boto3.resource('dynamodb').Table(table_name)
+        self.table = get_table(table_name, engine)
     
     @tracer.capture_method
     def get_item(
         self, 
         pk: str, 
-        sk: Optional[str] = None
+        sk: Optional[str] = None,
+        fields: Optional[List[str]] = None
     ) -> Optional[Dict[str, Any]]:
         """Get an item from DynamoDB
         
         Args:
             pk: Partition key
             sk: Sort key (optional)
+            fields: Attribute paths to return (optional, defaults to all)
             
         Returns:
             Item if found, None otherwise
@@ -37,7 +66,13 @@ class BaseDataUtil:
             if sk:
                 key['sk'] = sk
                 
-            response = self.table.get_item(Key=key)
+            params = {'Key': key}
+            if fields:
+                projection, expr_names = build_projection(fields)
+                params['ProjectionExpression'] = projection
+                params['ExpressionAttributeNames'] = expr_names
+                
+            response = self.table.get_item(**params)
             return response.get('Item')
             
         except Exception as e:
@@ -68,18 +103,28 @@ class BaseDataUtil:
         pk: str,
         sk: Optional[str],
         updates: Dict[str, Any],
-        condition_expression: Optional[str] = None
+        condition_expression: Optional[str] = None,
+        returns: ReturnValues = ReturnValues.ALL_NEW,
+        remove: Optional[List[str]] = None,
+        add: Optional[Dict[str, Any]] = None,
+        append: Optional[Dict[str, List[Any]]] = None,
+        increment: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Update an item in DynamoDB
         
         Args:
             pk: Partition key
             sk: Sort key (optional)
-            updates: Dictionary of updates to apply
+            updates: Attribute paths to set, nested paths allowed
             condition_expression: Optional condition expression
+            returns: Attributes to return (NONE, UPDATED_NEW or ALL_NEW)
+            remove: Attribute paths to remove (optional)
+            add: Top-level number/set attributes to ADD to (optional)
+            append: List attribute paths to append to (optional)
+            increment: Number attribute paths to increment, nested allowed (optional)
             
         Returns:
-            Updated item
+            Attributes selected by returns, empty dict for NONE
         """
         try:
             # Build key
@@ -87,25 +132,22 @@ class BaseDataUtil:
             if sk:
                 key['sk'] = sk
             
-            # Build update expression
-            update_expr = 'SET ' + ', '.join(f'#{k} = :{k}' for k in updates.keys())
-            expr_names = {f'#{k}': k for k in updates.keys()}
-            expr_values = {f':{k}': v for k, v in updates.items()}
-            
             # Build update parameters
             update_params = {
                 'Key': key,
-                'UpdateExpression': update_expr,
-                'ExpressionAttributeNames': expr_names,
-                'ExpressionAttributeValues': expr_values,
-                'ReturnValues': 'ALL_NEW'
+                'ReturnValues': ReturnValues(returns).value,
+                **build_update(
+                    set_values=updates,
+                    remove=remove,
+                    add=add,
+                    append=append,
+                    increment=increment,
+                    condition=condition_expression
+                )
             }
             
-            if condition_expression:
-                update_params['ConditionExpression'] = condition_expression
-            
             response = self.table.update_item(**update_params)
-            return response['Attributes']
+            return response.get('Attributes', {})
             
         except Exception as e:
             logger.exception("Error updating item in DynamoDB")
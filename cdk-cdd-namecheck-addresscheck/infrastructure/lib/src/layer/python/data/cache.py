@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+import time
+
+FieldsKey = Optional[Tuple[str, ...]]
+
+class ItemCache:
+    """In-memory LRU cache of DynamoDB items with a TTL
+
+    Entries are grouped by item key so a write invalidates every cached
+    projection of that item. Instances are meant to live at module level so
+    warm Lambda containers reuse them across invocations. Returned items are
+    shared with the cache and must be treated as read-only.
+    """
+
+    def __init__(self, max_items: int = 256, ttl_seconds: float = 300.0):
+        """Initialize ItemCache
+
+        Args:
+            max_items: Maximum number of item keys kept before evicting the least recently used
+            ttl_seconds: Maximum age of a cached entry
+        """
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, Dict[FieldsKey, Tuple[float, Dict[str, Any]]]]' = OrderedDict()
+
+    @staticmethod
+    def fields_key(fields: Optional[List[str]]) -> FieldsKey:
+        return tuple(sorted(fields)) if fields else None
+
+    def get(self, key: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Return a cached item, preferring an exact projection over the full item
+
+        Args:
+            key: Item key
+            fields: Projection the caller asked for (optional)
+        """
+        views = self._entries.get(key)
+        if views:
+            now = time.monotonic()
+            for view_key in (self.fields_key(fields), None):
+                entry = views.get(view_key)
+                if entry and now - entry[0] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+        self.misses += 1
+        return None
+
+    def peek(self, key: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Return a cached item even if it has expired, for revalidation
+
+        Does not count as a hit or miss and does not refresh recency.
+        """
+        views = self._entries.get(key)
+        if not views:
+            return None
+        entry = views.get(self.fields_key(fields)) or views.get(None)
+        return entry[1] if entry else None
+
+    def put(self, key: str, item: Dict[str, Any], fields: Optional[List[str]] = None) -> None:
+        """Cache an item, or a projection of it when fields is given"""
+        views = self._entries.setdefault(key, {})
+        if fields is None:
+            # A full item supersedes any projection of it
+            views.clear()
+        views[self.fields_key(fields)] = (time.monotonic(), item)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        """Drop every cached view of an item"""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
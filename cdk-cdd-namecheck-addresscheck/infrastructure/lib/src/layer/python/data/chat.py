@@ -0,0 +1,253 @@
+from aws_lambda_powertools import Logger, Tracer
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+import base64
+import json
+import uuid
+from boto3.dynamodb.conditions import Key
+from utilities.exceptions import ValidationError
+from utilities.types import ChatMessageItem, ChatSummaryItem
+from data.codec import AttributeCodec
+from data.engine import Engine, get_table
+
+# Initialize powertools
+logger = Logger()
+tracer = Tracer()
+
+# Sort key prefix of message items, followed by timestamp and message ID
+MESSAGE_PREFIX = 'CHAT#'
+# Sort key of the conversation summary, outside the message range
+SUMMARY_SK = 'CHATSUMMARY'
+
+class ChatUtil:
+    """Utility class for analysis chat messages in DynamoDB
+
+    Messages are stored in the analysis table next to the METADATA item, one
+    item per message under ``CHAT#{timestamp}#{messageId}``, so appending
+    is a single constant-size put and status reads of the analysis never
+    carry the conversation. A separate ``CHATSUMMARY`` item holds an
+    optional running summary of older messages.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        codec: Optional[AttributeCodec] = None,
+        engine: Optional[Engine] = None
+    ):
+        """Initialize ChatUtil with DynamoDB table name
+
+        Args:
+            table_name: Name of the analysis table
+            codec: Codec for large message content (optional, defaults to env configuration)
+            engine: Resource or low-level client engine (optional, defaults to DYNAMODB_ENGINE)
+        """
+        self.table = get_table(table_name, engine)
+        self.codec = codec or AttributeCodec.from_env()
+
+    @tracer.capture_method
+    def append_message(
+        self,
+        analysis_id: str,
+        role: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> ChatMessageItem:
+        """Append a message to the conversation of an analysis
+
+        Messages are never updated in place, the write is conditional on the
+        key being new.
+
+        Args:
+            analysis_id: Analysis ID
+            role: Message author, human or assistant
+            content: Message text
+            metadata: Extra attributes stored with the message (optional)
+        """
+        if role not in ('human', 'assistant'):
+            raise ValidationError(f"Invalid chat role: {role}")
+
+        try:
+            message_id = str(uuid.uuid4())
+            timestamp = datetime.utcnow().isoformat() + 'Z'
+
+            message: ChatMessageItem = {
+                'pk': f'ID#{analysis_id}',
+                'sk': f'{MESSAGE_PREFIX}{timestamp}#{message_id}',
+                'analysisId': analysis_id,
+                'messageId': message_id,
+                'role': role,
+                'content': content,
+                'timestamp': timestamp
+            }
+            if metadata:
+                message['metadata'] = metadata
+
+            self.table.put_item(
+                Item={
+                    **message,
+                    'content': self.codec.encode_text(content, f'{analysis_id}/chat/{message_id}')
+                },
+                ConditionExpression='attribute_not_exists(pk)'
+            )
+
+            logger.info("Chat message appended", extra={
+                "analysisId": analysis_id,
+                "messageId": message_id
+            })
+            return message
+
+        except Exception as e:
+            logger.exception("Failed to append chat message", extra={"analysisId": analysis_id})
+            raise
+
+    @tracer.capture_method
+    def get_messages(
+        self,
+        analysis_id: str,
+        limit: int = 20,
+        next_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get the latest messages of a conversation, oldest first
+
+        Pages walk backwards in time: the returned nextToken fetches the
+        messages before the current page.
+
+        Args:
+            analysis_id: Analysis ID
+            limit: Maximum number of messages to return
+            next_token: Pagination token from a previous call
+        """
+        try:
+            params = {
+                'KeyConditionExpression': (
+                    Key('pk').eq(f'ID#{analysis_id}') & Key('sk').begins_with(MESSAGE_PREFIX)
+                ),
+                'Limit': limit,
+                'ScanIndexForward': False
+            }
+
+            if next_token:
+                try:
+                    params['ExclusiveStartKey'] = json.loads(
+                        base64.b64decode(next_token.encode()).decode()
+                    )
+                except Exception:
+                    raise ValidationError("Invalid next token")
+
+            response = self.table.query(**params)
+            items = [
+                {**item, 'content': self.codec.decode_text(item.get('content'))}
+                for item in reversed(response.get('Items', []))
+            ]
+
+            result = {'items': items}
+            if 'LastEvaluatedKey' in response:
+                result['nextToken'] = base64.b64encode(
+                    json.dumps(response['LastEvaluatedKey']).encode()
+                ).decode()
+
+            logger.info("Listed chat messages", extra={
+                "analysisId": analysis_id,
+                "itemCount": len(items),
+                "hasNextToken": 'nextToken' in result
+            })
+            return result
+
+        except Exception as e:
+            logger.exception("Failed to get chat messages", extra={"analysisId": analysis_id})
+            raise
+
+    @tracer.capture_method
+    def get_summary(self, analysis_id: str) -> Optional[ChatSummaryItem]:
+        """Get the conversation summary, None when there is none"""
+        try:
+            response = self.table.get_item(Key={'pk': f'ID#{analysis_id}', 'sk': SUMMARY_SK})
+            item = response.get('Item')
+            if item:
+                item['summary'] = self.codec.decode_text(item.get('summary'))
+            return item
+        except Exception as e:
+            logger.exception("Failed to get chat summary", extra={"analysisId": analysis_id})
+            raise
+
+    @tracer.capture_method
+    def put_summary(self, analysis_id: str, summary: str, summarized_through: str) -> bool:
+        """Store a summary of the conversation up to a message timestamp
+
+        The write only applies if it covers more of the conversation than
+        the stored summary, so concurrent summarizers cannot roll it back.
+
+        Args:
+            analysis_id: Analysis ID
+            summary: Summary text
+            summarized_through: Timestamp of the last message covered
+
+        Returns:
+            True if the summary was stored, False if a newer one exists
+        """
+        try:
+            self.table.put_item(
+                Item={
+                    'pk': f'ID#{analysis_id}',
+                    'sk': SUMMARY_SK,
+                    'analysisId': analysis_id,
+                    'summary': self.codec.encode_text(summary, f'{analysis_id}/chat/summary'),
+                    'summarizedThrough': summarized_through,
+                    'lastUpdatedAt': datetime.utcnow().isoformat() + 'Z'
+                },
+                ConditionExpression='attribute_not_exists(pk) OR summarizedThrough < :through',
+                ExpressionAttributeValues={':through': summarized_through}
+            )
+            return True
+        except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+            logger.info("Newer chat summary exists", extra={"analysisId": analysis_id})
+            return False
+        except Exception as e:
+            logger.exception("Failed to put chat summary", extra={"analysisId": analysis_id})
+            raise
+
+    @tracer.capture_method
+    def get_conversation(self, analysis_id: str) -> List[Dict[str, Any]]:
+        """Get every message and the summary of an analysis, as stored
+
+        Content is returned encoded, decode it with the codec before use.
+        """
+        try:
+            params = {
+                'KeyConditionExpression': (
+                    Key('pk').eq(f'ID#{analysis_id}') & Key('sk').begins_with('CHAT')
+                ),
+                'ConsistentRead': True
+            }
+            items = []
+            while True:
+                response = self.table.query(**params)
+                items.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    return items
+                params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+        except Exception as e:
+            logger.exception("Failed to get chat conversation", extra={"analysisId": analysis_id})
+            raise
+
+    @tracer.capture_method
+    def delete_conversation(self, analysis_id: str, items: List[Dict[str, Any]]) -> None:
+        """Delete the conversation items returned by get_conversation
+
+        Only the given items are deleted, so a caller that archives them
+        first never deletes a message it has not archived.
+        """
+        try:
+            for item in items:
+                self.table.delete_item(Key={'pk': item['pk'], 'sk': item['sk']})
+
+            logger.info("Chat conversation deleted", extra={
+                "analysisId": analysis_id,
+                "itemCount": len(items)
+            })
+
+        except Exception as e:
+            logger.exception("Failed to delete chat conversation", extra={"analysisId": analysis_id})
+            raise
@@ -0,0 +1,250 @@
+from aws_lambda_powertools import Logger
+from typing import Dict, Any, Optional, Iterable, List
+import hashlib
+import os
+import zlib
+import boto3
+from boto3.dynamodb.types import Binary
+
+# Initialize powertools
+logger = Logger()
+
+# Large text attributes per nested record type
+PAGE_TEXT_FIELDS = ('content',)
+RESULT_TEXT_FIELDS = ('result', 'thinking')
+
+class LazyAttributes(dict):
+    """Dict whose encoded text attributes are decoded on first access
+
+    The underlying dict keeps the stored (compressed or offloaded) value so
+    unchanged records can be written back without being re-encoded. Every
+    read decodes: indexing, get, values, items, pop, copy, dict(x), {**x}
+    and json.dumps(x) all see the text. Use raw() for the stored value.
+    """
+
+    def __init__(self, item: Dict[str, Any], codec: 'AttributeCodec', lazy_fields: Iterable[str]):
+        super().__init__(item)
+        self._codec = codec
+        self._lazy_fields = frozenset(lazy_fields)
+        self._decoded: Dict[str, Any] = {}
+
+    def raw(self, key: str, default: Any = None) -> Any:
+        """Return the stored value without decoding it"""
+        return dict.get(self, key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        value = dict.__getitem__(self, key)
+        if key not in self._lazy_fields:
+            return value
+        if key not in self._decoded:
+            self._decoded[key] = self._codec.decode_text(value)
+        return self._decoded[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._decoded.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __iter__(self):
+        # A dict subclass with its own __iter__ is copied through keys() and
+        # __getitem__ by dict(x) and {**x}, instead of its stored values
+        return iter(self.keys())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key not in self:
+            return dict.pop(self, key, *default)
+        value = self[key]
+        self._decoded.pop(key, None)
+        dict.__delitem__(self, key)
+        return value
+
+    def popitem(self):
+        key = next(reversed(self.keys()))
+        return key, self.pop(key)
+
+    def copy(self) -> Dict[str, Any]:
+        """Return a plain dict with every text attribute decoded"""
+        return dict(self.items())
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+
+class AttributeCodec:
+    """Compresses large text attributes and offloads oversized ones to S3
+
+    Text above ``compress_threshold`` bytes is stored as zlib-compressed
+    Binary. When an offload bucket is configured, compressed payloads above
+    ``offload_threshold`` bytes are written to S3 and replaced by a pointer
+    map. Plain strings are always readable, so existing items keep working.
+    """
+
+    def __init__(
+        self,
+        compress_threshold: int = 2048,
+        offload_threshold: int = 65536,
+        offload_bucket: Optional[str] = None,
+        offload_prefix: str = 'analysis-content/'
+    ):
+        """Initialize AttributeCodec
+
+        Args:
+            compress_threshold: Minimum UTF-8 size in bytes before compressing,
+                0 disables compression
+            offload_threshold: Minimum compressed size in bytes before spilling to S3
+            offload_bucket: S3 bucket for offloaded content (optional)
+            offload_prefix: Key prefix for offloaded content
+        """
+        self.compress_threshold = compress_threshold
+        self.offload_threshold = offload_threshold
+        self.offload_bucket = offload_bucket
+        self.offload_prefix = offload_prefix
+        self._s3_client = None
+
+    @classmethod
+    def from_env(cls) -> 'AttributeCodec':
+        """Build a codec from ANALYSIS_COMPRESSION_THRESHOLD, ANALYSIS_OFFLOAD_THRESHOLD
+        and ANALYSIS_OFFLOAD_BUCKET environment variables"""
+        return cls(
+            compress_threshold=int(os.environ.get('ANALYSIS_COMPRESSION_THRESHOLD', '2048')),
+            offload_threshold=int(os.environ.get('ANALYSIS_OFFLOAD_THRESHOLD', '65536')),
+            offload_bucket=os.environ.get('ANALYSIS_OFFLOAD_BUCKET')
+        )
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            self._s3_client = boto3.client('s3')
+        return self._s3_client
+
+    def encode_text(self, value: Any, s3_key: str) -> Any:
+        """Encode a text value for storage
+
+        Args:
+            value: Text to encode, already-encoded values are returned as-is
+            s3_key: Object key (below the offload prefix) used if the value is offloaded
+        """
+        if not isinstance(value, str) or self.compress_threshold <= 0:
+            return value
+
+        raw = value.encode('utf-8')
+        if len(raw) < self.compress_threshold:
+            return value
+
+        compressed = zlib.compress(raw)
+        if self.offload_bucket and len(compressed) >= self.offload_threshold:
+            key = f'{self.offload_prefix}{s3_key}.zlib'
+            self.s3_client.put_object(
+                Bucket=self.offload_bucket,
+                Key=key,
+                Body=compressed,
+                ContentEncoding='deflate'
+            )
+            logger.debug("Offloaded attribute to S3", extra={"key": key, "size": len(compressed)})
+            return {'s3Bucket': self.offload_bucket, 's3Key': key, 'encoding': 'zlib'}
+
+        return Binary(compressed)
+
+    def decode_text(self, value: Any) -> Any:
+        """Decode a stored text value, plain strings are returned unchanged"""
+        if isinstance(value, Binary):
+            return zlib.decompress(value.value).decode('utf-8')
+        if isinstance(value, (bytes, bytearray)):
+            return zlib.decompress(value).decode('utf-8')
+        if isinstance(value, dict) and 's3Key' in value:
+            response = self.s3_client.get_object(Bucket=value['s3Bucket'], Key=value['s3Key'])
+            return zlib.decompress(response['Body'].read()).decode('utf-8')
+        return value
+
+    def _encode_record(self, record: Dict[str, Any], fields: Iterable[str], s3_key: str) -> Dict[str, Any]:
+        """Encode the text fields of a page or result record"""
+        encoded = {}
+        for key in record.keys():
+            value = record.raw(key) if isinstance(record, LazyAttributes) else record[key]
+            if key in fields:
+                value = self.encode_text(value, f'{s3_key}/{key}')
+            encoded[key] = value
+        return encoded
+
+    def encode_page(self, analysis_id: str, object_key: str, page: Dict[str, Any]) -> Dict[str, Any]:
+        """Encode a single page record of an object"""
+        object_hash = hashlib.sha1(object_key.encode('utf-8')).hexdigest()
+        s3_key = f"{analysis_id}/objects/{object_hash}/pages/{page.get('page')}"
+        return self._encode_record(page, PAGE_TEXT_FIELDS, s3_key)
+
+    def encode_objects_data(self, analysis_id: str, objects_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Encode page content of every object"""
+        encoded = []
+        for obj in objects_data:
+            obj = dict(obj)
+            if 'data' in obj:
+                obj['data'] = [
+                    self.encode_page(analysis_id, obj.get('object', ''), page)
+                    for page in obj['data']
+                ]
+            encoded.append(obj)
+        return encoded
+
+    def encode_analysis_results(self, analysis_id: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Encode result and thinking text of every analysis result"""
+        return [
+            self._encode_record(result, RESULT_TEXT_FIELDS, f'{analysis_id}/results/{index}')
+            for index, result in enumerate(results)
+        ]
+
+    def encode_updates(self, analysis_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Encode the large attributes of an item or update map"""
+        encoded = dict(updates)
+        if isinstance(encoded.get('objectsData'), list):
+            encoded['objectsData'] = self.encode_objects_data(analysis_id, encoded['objectsData'])
+        if isinstance(encoded.get('analysisResults'), list):
+            encoded['analysisResults'] = self.encode_analysis_results(analysis_id, encoded['analysisResults'])
+        return encoded
+
+    def decode_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of an item with every encoded text attribute decoded"""
+        decoded = dict(item)
+        if isinstance(decoded.get('objectsData'), list):
+            decoded['objectsData'] = [
+                {
+                    **obj,
+                    'data': [
+                        {k: self.decode_text(v) if k in PAGE_TEXT_FIELDS else v for k, v in page.items()}
+                        for page in obj.get('data', [])
+                    ]
+                } if isinstance(obj, dict) and 'data' in obj else obj
+                for obj in decoded['objectsData']
+            ]
+        if isinstance(decoded.get('analysisResults'), list):
+            decoded['analysisResults'] = [
+                {k: self.decode_text(v) if k in RESULT_TEXT_FIELDS else v for k, v in result.items()}
+                for result in decoded['analysisResults']
+            ]
+        return decoded
+
+    def wrap_item(self, item: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Wrap page and result records so their text decodes on access"""
+        if not item:
+            return item
+
+        for obj in item.get('objectsData') or []:
+            if isinstance(obj, dict) and 'data' in obj:
+                obj['data'] = [
+                    LazyAttributes(page, self, PAGE_TEXT_FIELDS)
+                    for page in obj['data']
+                ]
+
+        if isinstance(item.get('analysisResults'), list):
+            item['analysisResults'] = [
+                LazyAttributes(result, self, RESULT_TEXT_FIELDS)
+                for result in item['analysisResults']
+            ]
+
+        return item
@@ -0,0 +1,146 @@
+from aws_lambda_powertools import Logger
+from typing import Dict, Any, Optional
+from enum import Enum
+import os
+import boto3
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from utilities.models import serialize, deserialize
+
+# Initialize powertools
+logger = Logger()
+
+class Engine(str, Enum):
+    """How data utils talk to DynamoDB"""
+    RESOURCE = "resource"
+    CLIENT = "client"
+
+_client = None
+_resource = None
+
+def get_client():
+    """Shared low-level DynamoDB client, created on first use"""
+    global _client
+    if _client is None:
+        _client = boto3.client('dynamodb')
+    return _client
+
+def get_resource():
+    """Shared DynamoDB resource, created on first use"""
+    global _resource
+    if _resource is None:
+        _resource = boto3.resource('dynamodb')
+    return _resource
+
+def default_engine() -> Engine:
+    """Engine selected by the DYNAMODB_ENGINE environment variable, resource if unset"""
+    return Engine(os.environ.get('DYNAMODB_ENGINE', Engine.RESOURCE.value))
+
+def get_table(table_name: str, engine: Optional[Engine] = None):
+    """Return a table handle for the given engine
+
+    Args:
+        table_name: Name of the DynamoDB table
+        engine: Engine to use (optional, defaults to DYNAMODB_ENGINE)
+
+    Returns:
+        A boto3 resource Table, or a ClientTable exposing the same calls
+    """
+    engine = Engine(engine or default_engine())
+    if engine == Engine.CLIENT:
+        return ClientTable(table_name)
+    return get_resource().Table(table_name)
+
+
+def _serialize_map(values: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if values is None:
+        return None
+    return {key: serialize(value) for key, value in values.items()}
+
+def _deserialize_map(values: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if values is None:
+        return None
+    return {key: deserialize(value) for key, value in values.items()}
+
+
+class _Meta:
+    __slots__ = ('client',)
+
+    def __init__(self, client):
+        self.client = client
+
+
+class ClientTable:
+    """Table handle built on the low-level DynamoDB client
+
+    Accepts and returns plain Python values like a resource Table, for the
+    calls the data utils make (get_item, put_item, update_item, delete_item,
+    query and scan), but serializes with the shared fast converters from
+    utilities.models instead of the resource's per-call transformation.
+    Numbers are returned as int or float rather than Decimal.
+    """
+
+    # Request parameters holding AttributeValue maps
+    _VALUE_MAPS = ('Key', 'Item', 'ExpressionAttributeValues', 'ExclusiveStartKey')
+    # Response members holding AttributeValue maps
+    _RESPONSE_MAPS = ('Item', 'Attributes', 'LastEvaluatedKey')
+
+    def __init__(self, table_name: str, client=None):
+        """Initialize ClientTable
+
+        Args:
+            table_name: Name of the DynamoDB table
+            client: Low-level DynamoDB client (optional, defaults to the shared client)
+        """
+        self.name = table_name
+        self.meta = _Meta(client or get_client())
+
+    def _request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        request = dict(params, TableName=self.name)
+        for key in self._VALUE_MAPS:
+            if key in request:
+                request[key] = _serialize_map(request[key])
+
+        builder = None
+        for key in ('KeyConditionExpression', 'ConditionExpression', 'FilterExpression'):
+            condition = request.get(key)
+            if not isinstance(condition, ConditionBase):
+                continue
+            builder = builder or ConditionExpressionBuilder()
+            built = builder.build_expression(
+                condition,
+                is_key_condition=(key == 'KeyConditionExpression')
+            )
+            request[key] = built.condition_expression
+            request.setdefault('ExpressionAttributeNames', {}).update(
+                built.attribute_name_placeholders
+            )
+            request.setdefault('ExpressionAttributeValues', {}).update(
+                _serialize_map(built.attribute_value_placeholders)
+            )
+        return request
+
+    def _response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        for key in self._RESPONSE_MAPS:
+            if key in response:
+                response[key] = _deserialize_map(response[key])
+        if 'Items' in response:
+            response['Items'] = [_deserialize_map(item) for item in response['Items']]
+        return response
+
+    def get_item(self, **params) -> Dict[str, Any]:
+        return self._response(self.meta.client.get_item(**self._request(params)))
+
+    def put_item(self, **params) -> Dict[str, Any]:
+        return self._response(self.meta.client.put_item(**self._request(params)))
+
+    def update_item(self, **params) -> Dict[str, Any]:
+        return self._response(self.meta.client.update_item(**self._request(params)))
+
+    def delete_item(self, **params) -> Dict[str, Any]:
+        return self._response(self.meta.client.delete_item(**self._request(params)))
+
+    def query(self, **params) -> Dict[str, Any]:
+        return self._response(self.meta.client.query(**self._request(params)))
+
+    def scan(self, **params) -> Dict[str, Any]:
+        return self._response(self.meta.client.scan(**self._request(params)))
@@ -0,0 +1,166 @@
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
+import re
+
+_PATH_SEGMENT = re.compile(r'([^.\[\]]+)((?:\[\d+\])*)')
+
+PathTuple = Tuple[str, ...]
+
+def alias_path(path: str, aliases: Dict[str, str], prefix: str = '#n') -> str:
+    """Alias every segment of an attribute path
+
+    Args:
+        path: Dotted attribute path with optional list indexes, e.g. ``objectsData[0].data``
+        aliases: Attribute name to alias map, extended in place
+        prefix: Alias prefix
+    """
+    parts = []
+    for name, indexes in _PATH_SEGMENT.findall(path):
+        alias = aliases.setdefault(name, f'{prefix}{len(aliases)}')
+        parts.append(f'{alias}{indexes}')
+    return '.'.join(parts)
+
+
+@lru_cache(maxsize=256)
+def _compile(
+    set_paths: PathTuple,
+    remove_paths: PathTuple,
+    add_paths: PathTuple,
+    append_paths: PathTuple,
+    increment_paths: PathTuple,
+    expected_paths: PathTuple,
+    sized_paths: PathTuple,
+    empty_paths: PathTuple,
+    condition: Optional[str]
+) -> Tuple[str, Optional[str], Dict[str, str], Tuple[str, ...], bool, bool]:
+    """Compile an update template for one combination of attribute paths
+
+    Returns:
+        Tuple of (UpdateExpression, ConditionExpression, ExpressionAttributeNames,
+        value placeholders in argument order, needs :zero, needs :empty)
+    """
+    aliases: Dict[str, str] = {}
+    placeholders: List[str] = []
+
+    def next_value() -> str:
+        placeholder = f':v{len(placeholders)}'
+        placeholders.append(placeholder)
+        return placeholder
+
+    set_clauses = []
+    for path in set_paths:
+        set_clauses.append(f'{alias_path(path, aliases)} = {next_value()}')
+    for path in append_paths:
+        alias = alias_path(path, aliases)
+        set_clauses.append(f'{alias} = list_append(if_not_exists({alias}, :empty), {next_value()})')
+    for path in increment_paths:
+        alias = alias_path(path, aliases)
+        set_clauses.append(f'{alias} = if_not_exists({alias}, :zero) + {next_value()}')
+
+    add_clauses = [f'{alias_path(path, aliases)} {next_value()}' for path in add_paths]
+    remove_clauses = [alias_path(path, aliases) for path in remove_paths]
+
+    sections = []
+    if set_clauses:
+        sections.append('SET ' + ', '.join(set_clauses))
+    if add_clauses:
+        sections.append('ADD ' + ', '.join(add_clauses))
+    if remove_clauses:
+        sections.append('REMOVE ' + ', '.join(remove_clauses))
+
+    conditions = [f'{alias_path(path, aliases)} = {next_value()}' for path in expected_paths]
+    conditions += [f'size({alias_path(path, aliases)}) = {next_value()}' for path in sized_paths]
+    for path in empty_paths:
+        alias = alias_path(path, aliases)
+        conditions.append(f'attribute_not_exists({alias}) OR size({alias}) = :zero')
+    if condition:
+        conditions.insert(0, condition)
+    condition_expr = ' AND '.join(f'({c})' if len(conditions) > 1 else c for c in conditions) or None
+
+    names = {alias: name for name, alias in aliases.items()}
+    return (
+        ' '.join(sections),
+        condition_expr,
+        names,
+        tuple(placeholders),
+        bool(increment_paths or empty_paths),
+        bool(append_paths)
+    )
+
+
+def build_update(
+    set_values: Optional[Dict[str, Any]] = None,
+    remove: Optional[List[str]] = None,
+    add: Optional[Dict[str, Any]] = None,
+    append: Optional[Dict[str, List[Any]]] = None,
+    increment: Optional[Dict[str, Any]] = None,
+    expected: Optional[Dict[str, Any]] = None,
+    expected_sizes: Optional[Dict[str, int]] = None,
+    condition: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build update_item parameters from attribute paths
+
+    Paths may be nested (``analysisParameters.onboardingId``) and index into
+    lists (``objectsData[0].data[2]``). Expression templates are compiled
+    once per combination of paths and reused.
+
+    Args:
+        set_values: Paths to set to a value
+        remove: Paths to remove
+        add: Top-level number or set attributes to ADD to
+        append: List paths to append items to, created if missing
+        increment: Number paths to increment, works on nested paths and
+            initialises missing attributes to 0
+        expected: Paths that must equal the given value for the write to succeed
+        expected_sizes: List paths that must hold the given number of
+            elements, a size of 0 also accepts a missing list
+        condition: Extra condition expression ANDed with expected, must not
+            use #n*/:v* placeholders
+
+    Returns:
+        Dict with UpdateExpression, ExpressionAttributeNames,
+        ExpressionAttributeValues and optional ConditionExpression
+    """
+    set_values = set_values or {}
+    add = add or {}
+    append = append or {}
+    increment = increment or {}
+    expected = expected or {}
+    sized = {path: size for path, size in (expected_sizes or {}).items() if size}
+    empty = tuple(path for path, size in (expected_sizes or {}).items() if not size)
+
+    update_expr, condition_expr, names, placeholders, needs_zero, needs_empty = _compile(
+        tuple(set_values),
+        tuple(remove or ()),
+        tuple(add),
+        tuple(append),
+        tuple(increment),
+        tuple(expected),
+        tuple(sized),
+        empty,
+        condition
+    )
+
+    values = [
+        *set_values.values(),
+        *append.values(),
+        *increment.values(),
+        *add.values(),
+        *expected.values(),
+        *sized.values()
+    ]
+    expr_values = dict(zip(placeholders, values))
+    if needs_zero:
+        expr_values[':zero'] = 0
+    if needs_empty:
+        expr_values[':empty'] = []
+
+    params: Dict[str, Any] = {
+        'UpdateExpression': update_expr,
+        'ExpressionAttributeNames': names
+    }
+    if expr_values:
+        params['ExpressionAttributeValues'] = expr_values
+    if condition_expr:
+        params['ConditionExpression'] = condition_expr
+    return params
@@ -0,0 +1,74 @@
+from aws_lambda_powertools import Logger, Tracer
+from typing import Dict, Any, Optional
+import hashlib
+import json
+import boto3
+
+# Initialize powertools
+logger = Logger()
+tracer = Tracer()
+
+class ExtractionCacheUtil:
+    """Utility class for page extraction results keyed by content
+
+    A result is stored at ``<prefix>{sha256}.json``, the hash covering
+    everything that determines the model output: model ID, prompt version
+    and text, and the rendered page. Identical pages uploaded again, in a
+    retry or another analysis, reuse the stored result instead of invoking
+    the model. The cache is best effort: read and write failures are logged
+    and treated as misses.
+    """
+
+    def __init__(self, bucket_name: str, prefix: str = 'extraction-cache/'):
+        """Initialize ExtractionCacheUtil
+
+        Args:
+            bucket_name: Bucket holding the cache objects
+            prefix: Key prefix of cache objects, expired by a bucket lifecycle rule
+        """
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.s3_client = boto3.client('s3')
+
+    @staticmethod
+    def content_key(*parts: str) -> str:
+        """Hash the inputs of an extraction into a cache key"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update((part or '').encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    @tracer.capture_method(capture_response=False)
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a stored result with content, tokenInput and tokenOutput, None on a miss"""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=f'{self.prefix}{key}.json')
+            return json.loads(response['Body'].read())
+        except self.s3_client.exceptions.NoSuchKey:
+            return None
+        except Exception as e:
+            logger.warning("Failed to read extraction cache", extra={"key": key}, exc_info=True)
+            return None
+
+    @tracer.capture_method(capture_response=False)
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store the result of an extraction
+
+        Args:
+            key: Key from content_key
+            result: Dict with content, tokenInput and tokenOutput
+        """
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=f'{self.prefix}{key}.json',
+                Body=json.dumps({
+                    'content': result['content'],
+                    'tokenInput': result['tokenInput'],
+                    'tokenOutput': result['tokenOutput']
+                }).encode('utf-8'),
+                ContentType='application/json'
+            )
+        except Exception as e:
+            logger.warning("Failed to write extraction cache", extra={"key": key}, exc_info=True)
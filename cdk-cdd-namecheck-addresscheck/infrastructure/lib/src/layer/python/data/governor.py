@@ -0,0 +1,220 @@
+from aws_lambda_powertools import Logger, Tracer
+from datetime import datetime
+from decimal import Decimal
+from typing import NamedTuple, Optional
+import random
+import time
+import uuid
+from utilities.exceptions import ConcurrencyLimitError
+from data.engine import Engine, get_table
+
+# Initialize powertools
+logger = Logger()
+tracer = Tracer()
+
+# Backoff between attempts to acquire a slot, seconds
+ACQUIRE_BACKOFF_BASE = 0.2
+ACQUIRE_BACKOFF_CAP = 5.0
+
+def _number(value: float) -> Decimal:
+    """Limits are fractional, the resource engine only accepts Decimal"""
+    return Decimal(str(round(value, 4)))
+
+class Lease(NamedTuple):
+    lease_id: str
+    limit: float  # Limit when the lease was granted
+
+class ConcurrencyGovernor:
+    """Distributed semaphore with an adaptive limit, stored in DynamoDB
+
+    One item per key (pk ``GOVERNOR#{key}``) holds the current ``limit`` and
+    a ``leases`` map of lease ID to expiry. A slot is taken with a single
+    conditional update that adds a lease while ``size(leases) < limit``;
+    leases of callers that died are reaped once expired.
+
+    The limit follows AIMD: every successful call adds increase / limit,
+    so the limit grows by about ``increase`` per round of calls, and a
+    throttled call multiplies it by ``decrease``, at most once per
+    cooldown so a burst of throttles halves it once.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        key: str,
+        initial_limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown_seconds: float = 5.0,
+        lease_seconds: int = 960,
+        max_wait_seconds: float = 60.0,
+        engine: Optional[Engine] = None
+    ):
+        """Initialize ConcurrencyGovernor
+
+        Args:
+            table_name: Name of the governor table
+            key: What the limit applies to, e.g. a model ID
+            initial_limit: Limit of a new key
+            min_limit: Floor of the limit
+            max_limit: Ceiling of the limit
+            increase: Additive increase per round of successful calls
+            decrease: Multiplicative decrease on throttling
+            cooldown_seconds: Minimum time between two decreases
+            lease_seconds: Lease lifetime, longer than the timeout of any governed
+                caller (streamed calls hold their lease until the stream ends),
+                so only leases of callers that died are reaped
+            max_wait_seconds: How long acquire waits for a slot
+            engine: Resource or low-level client engine (optional, defaults to DYNAMODB_ENGINE)
+        """
+        self.table = get_table(table_name, engine)
+        self.key = {'pk': f'GOVERNOR#{key}'}
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown_seconds = cooldown_seconds
+        self.lease_seconds = lease_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self._initialized = False
+
+    def _initialize(self) -> None:
+        """Create the item of the key if it does not exist yet"""
+        try:
+            self.table.put_item(
+                Item={
+                    **self.key,
+                    'limit': _number(self.initial_limit),
+                    'leases': {},
+                    'updatedAt': datetime.utcnow().isoformat() + 'Z'
+                },
+                ConditionExpression='attribute_not_exists(pk)'
+            )
+        except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
+        self._initialized = True
+
+    def _reap(self) -> bool:
+        """Remove expired leases, returns True if a slot was freed"""
+        item = self.table.get_item(Key=self.key, ConsistentRead=True).get('Item')
+        if item is None:
+            self._initialize()
+            return True
+
+        now = time.time()
+        reaped = False
+        for lease_id, expires in item.get('leases', {}).items():
+            if float(expires) >= now:
+                continue
+            try:
+                self.table.update_item(
+                    Key=self.key,
+                    UpdateExpression='REMOVE leases.#lease',
+                    ConditionExpression='leases.#lease = :expires',
+                    ExpressionAttributeNames={'#lease': lease_id},
+                    ExpressionAttributeValues={':expires': expires}
+                )
+                reaped = True
+            except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+                pass
+        if reaped:
+            logger.warning("Reaped expired concurrency leases", extra={"key": self.key['pk']})
+        return reaped
+
+    @tracer.capture_method
+    def acquire(self) -> Lease:
+        """Take a slot, waiting with jittered backoff while all are in use
+
+        Raises:
+            ConcurrencyLimitError: If no slot frees up within max_wait_seconds
+        """
+        if not self._initialized:
+            self._initialize()
+
+        lease_id = uuid.uuid4().hex
+        deadline = time.monotonic() + self.max_wait_seconds
+        attempt = 0
+        while True:
+            try:
+                response = self.table.update_item(
+                    Key=self.key,
+                    UpdateExpression='SET leases.#lease = :expires',
+                    ConditionExpression='size(leases) < #limit',
+                    ExpressionAttributeNames={'#lease': lease_id, '#limit': 'limit'},
+                    ExpressionAttributeValues={':expires': int(time.time()) + self.lease_seconds},
+                    ReturnValues='ALL_NEW'
+                )
+                return Lease(lease_id, float(response['Attributes']['limit']))
+            except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+                pass
+
+            if self._reap():
+                continue
+            if time.monotonic() >= deadline:
+                logger.warning("No concurrency slot available", extra={"key": self.key['pk']})
+                raise ConcurrencyLimitError(f"No concurrency slot for {self.key['pk']} within {self.max_wait_seconds}s")
+            time.sleep(random.uniform(0, min(ACQUIRE_BACKOFF_CAP, ACQUIRE_BACKOFF_BASE * 2 ** attempt)))
+            attempt += 1
+
+    @tracer.capture_method
+    def release(self, lease: Lease, succeeded: bool = True) -> None:
+        """Return a slot, raising the limit after a successful call
+
+        The increase is applied only while the stored limit leaves room for
+        it below max_limit, so concurrent releases cannot overshoot it.
+
+        Args:
+            lease: Lease from acquire
+            succeeded: Whether the governed call succeeded
+        """
+        step = self.increase / max(lease.limit, 1) if succeeded else 0
+        try:
+            if step > 0:
+                try:
+                    self.table.update_item(
+                        Key=self.key,
+                        UpdateExpression='REMOVE leases.#lease SET #limit = #limit + :step',
+                        ConditionExpression='#limit <= :ceiling',
+                        ExpressionAttributeNames={'#lease': lease.lease_id, '#limit': 'limit'},
+                        ExpressionAttributeValues={
+                            ':step': _number(step),
+                            ':ceiling': _number(self.max_limit - step)
+                        }
+                    )
+                    return
+                except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+                    pass  # At the ceiling, only return the slot
+            self.table.update_item(
+                Key=self.key,
+                UpdateExpression='REMOVE leases.#lease',
+                ExpressionAttributeNames={'#lease': lease.lease_id}
+            )
+        except Exception as e:
+            # The lease expires on its own
+            logger.warning("Failed to release concurrency lease", extra={"key": self.key['pk']}, exc_info=True)
+
+    @tracer.capture_method
+    def throttled(self, lease: Lease) -> None:
+        """Lower the limit after a throttled call, at most once per cooldown"""
+        limit = max(self.min_limit, lease.limit * self.decrease)
+        now = time.time()
+        try:
+            self.table.update_item(
+                Key=self.key,
+                UpdateExpression='SET #limit = :limit, decreasedAt = :now',
+                ConditionExpression='#limit > :limit AND (attribute_not_exists(decreasedAt) OR decreasedAt < :cutoff)',
+                ExpressionAttributeNames={'#limit': 'limit'},
+                ExpressionAttributeValues={
+                    ':limit': _number(limit),
+                    ':now': int(now),
+                    ':cutoff': int(now - self.cooldown_seconds)
+                }
+            )
+            logger.info("Concurrency limit decreased", extra={"key": self.key['pk'], "limit": limit})
+        except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
+        except Exception as e:
+            logger.warning("Failed to decrease concurrency limit", extra={"key": self.key['pk']}, exc_info=True)
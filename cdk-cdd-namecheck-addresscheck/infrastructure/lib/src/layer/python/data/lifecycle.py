@@ -0,0 +1,70 @@
+from aws_lambda_powertools import Logger
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import json
+import os
+
+# Initialize powertools
+logger = Logger()
+
+# Days an analysis is kept after reaching a status. Statuses not listed
+# (STARTED) never expire so running analyses are not deleted.
+DEFAULT_RETENTION_DAYS: Dict[str, int] = {
+    'CREATED': 14,
+    'COMPLETED': 90,
+    'FAILED': 30,
+    'ERROR': 30
+}
+
+class LifecyclePolicy:
+    """Maps analysis status and document type to a DynamoDB TTL
+
+    Retention is looked up as ``DOCUMENT_TYPE:STATUS`` first, then
+    ``STATUS``. Expired items are deleted by DynamoDB TTL and archived from
+    the table stream.
+    """
+
+    def __init__(self, retention_days: Optional[Dict[str, int]] = None):
+        """Initialize LifecyclePolicy
+
+        Args:
+            retention_days: Retention per ``STATUS`` or ``DOCUMENT_TYPE:STATUS``
+                key, merged over the defaults. 0 keeps items forever (optional)
+        """
+        self.retention_days = {**DEFAULT_RETENTION_DAYS, **(retention_days or {})}
+
+    @classmethod
+    def from_env(cls) -> 'LifecyclePolicy':
+        """Build a policy from the ANALYSIS_RETENTION_DAYS JSON environment variable,
+        e.g. ``{"COMPLETED": 90, "ANNUAL_REPORT:COMPLETED": 365}``"""
+        raw = os.environ.get('ANALYSIS_RETENTION_DAYS')
+        return cls(json.loads(raw) if raw else None)
+
+    def retention_for(self, status: str, document_type: Optional[str] = None) -> Optional[int]:
+        """Return the retention in days, None when the status never expires"""
+        status = getattr(status, 'value', status)
+        document_type = getattr(document_type, 'value', document_type)
+        if document_type:
+            days = self.retention_days.get(f'{document_type}:{status}')
+            if days is not None:
+                return days
+        return self.retention_days.get(status)
+
+    def expires_at(
+        self,
+        status: str,
+        document_type: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> Optional[int]:
+        """Return the TTL epoch seconds for an item entering a status
+
+        Args:
+            status: Status the item is moving to
+            document_type: Document type of the analysis (optional)
+            now: Reference time (optional, defaults to now UTC)
+        """
+        days = self.retention_for(status, document_type)
+        if days is None or days <= 0:
+            return None
+        now = now or datetime.utcnow()
+        return int((now + timedelta(days=days) - datetime(1970, 1, 1)).total_seconds())
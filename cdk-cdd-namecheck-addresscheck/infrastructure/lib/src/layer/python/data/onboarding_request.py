@@ -6,6 +6,11 @@ from enum import Enum
 import boto3
 import uuid
 from utilities.exceptions import OnboardingRequestNotFoundException, ValidationError
+from data.base import build_projection, ReturnValues
+from data.cache import ItemCache
+from data.expressions import build_update
+from data.transaction import TransactionWriter
+from data.engine import Engine, get_table
 import json
 
 # Initialize powertools
@@ -39,16 +44,36 @@ class OnboardingRequestItem(OnboardingRequestData):
     createdAt: str
     updatedAt: str
 
+# Attributes returned by list endpoints unless the caller asks for more
+REQUEST_SUMMARY_FIELDS = [
+    'uniqueId',
+    'email',
+    'firstName',
+    'country',
+    'status',
+    'createdAt',
+    'updatedAt',
+    'assignedTo'
+]
+
 class OnboardingRequestUtil:
     """Utility class for handling Onboarding Request operations in DynamoDB"""
 
-    def __init__(self, table_name: str):
+    def __init__(
+        self,
+        table_name: str,
+        cache: Optional[ItemCache] = None,
+        engine: Optional[Engine] = None
+    ):
         """Initialize OnboardingRequestUtil with DynamoDB table name
         
         Args:
             table_name: Name of the DynamoDB table
+            cache: Read-through cache for get_request (optional, disabled by default)
+            engine: Resource or low-level client engine (optional, defaults to DYNAMODB_ENGINE)
         """
-        self.table = boto3.resource('dynamodb').Table(table_name)
+        self.table = get_table(table_name, engine)
+        self.cache = cache
     
     @tracer.capture_method
     def create_request_item(self, request_data: OnboardingRequestData) -> OnboardingRequestItem:
@@ -88,6 +113,8 @@ class OnboardingRequestUtil:
         try:
             request_item = self.create_request_item(request_data)
             self.table.put_item(Item=request_item)
+            if self.cache:
+                self.cache.invalidate(request_item['uniqueId'])
             logger.info("Onboarding request created", extra={"uniqueId": request_item["uniqueId"]})
             return request_item
         except Exception as e:
@@ -95,52 +122,106 @@ class OnboardingRequestUtil:
             raise
     
     @tracer.capture_method
-    def get_request(self, unique_id: str) -> OnboardingRequestItem:
-        """Get an onboarding request by ID"""
+    def get_request(
+        self,
+        unique_id: str,
+        fields: Optional[List[str]] = None,
+        validate: bool = False
+    ) -> OnboardingRequestItem:
+        """Get an onboarding request by ID
+        
+        Args:
+            unique_id: Onboarding request ID
+            fields: Attribute paths to return (optional, defaults to the full item)
+            validate: When served from cache, confirm updatedAt with a
+                consistent read of that attribute only
+        """
         try:
-            response = self.table.get_item(
-                Key={
-                    'pk': f'REQUEST#{unique_id}'
-                }
-            )
+            if self.cache:
+                # Cached projections carry the version used for validation,
+                # added before the lookup so reads and stores share one key
+                if fields and 'updatedAt' not in fields:
+                    fields = [*fields, 'updatedAt']
+                
+                cached = self.cache.get(unique_id, fields)
+                if cached is not None:
+                    if not validate or self._is_current(unique_id, cached):
+                        return cached
+                    self.cache.invalidate(unique_id)
             
-            item = response.get('Item')
+            item = self._fetch_request(unique_id, fields, consistent=validate)
             if not item:
                 logger.warning("Onboarding request not found", extra={"uniqueId": unique_id})
                 raise OnboardingRequestNotFoundException(f"Onboarding request not found: {unique_id}")
-                
+            
+            if self.cache:
+                self.cache.put(unique_id, item, fields)
             return item
             
         except Exception as e:
             logger.exception("Failed to get onboarding request")
             raise
     
+    def _fetch_request(
+        self,
+        unique_id: str,
+        fields: Optional[List[str]] = None,
+        consistent: bool = False
+    ) -> Optional[OnboardingRequestItem]:
+        """Read an onboarding request item from DynamoDB"""
+        params = {
+            'Key': {
+                'pk': f'REQUEST#{unique_id}'
+            },
+            'ConsistentRead': consistent
+        }
+        if fields:
+            projection, expr_names = build_projection(fields)
+            params['ProjectionExpression'] = projection
+            params['ExpressionAttributeNames'] = expr_names
+        
+        response = self.table.get_item(**params)
+        return response.get('Item')
+    
+    def _is_current(self, unique_id: str, cached: Dict[str, Any]) -> bool:
+        """Check a cached item against the stored updatedAt"""
+        current = self._fetch_request(unique_id, ['updatedAt'], consistent=True)
+        return bool(current) and current.get('updatedAt') == cached.get('updatedAt')
+    
     @tracer.capture_method
     def update_request_status(
         self, 
         unique_id: str, 
-        status: OnboardingStatus
+        status: OnboardingStatus,
+        returns: ReturnValues = ReturnValues.ALL_NEW
     ) -> OnboardingRequestItem:
-        """Update an onboarding request status"""
+        """Update an onboarding request status
+        
+        Args:
+            unique_id: Onboarding request ID
+            status: New status
+            returns: Attributes to return (NONE, UPDATED_NEW or ALL_NEW)
+        """
         try:
             # Validate status
             if not isinstance(status, OnboardingStatus):
                 raise ValidationError(f"Invalid status: {status}")
             
+            if self.cache:
+                self.cache.invalidate(unique_id)
+            
             response = self.table.update_item(
                 Key={
                     'pk': f'REQUEST#{unique_id}'
                 },
-                UpdateExpression='SET #status = :status, updatedAt = :updatedAt',
-                ExpressionAttributeNames={
-                    '#status': 'status'
-                },
-                ExpressionAttributeValues={
-                    ':status': status,
-                    ':updatedAt': datetime.utcnow().isoformat() + 'Z'
-                },
-                ReturnValues='ALL_NEW',
-                ConditionExpression='attribute_exists(pk)'
+                ReturnValues=ReturnValues(returns).value,
+                **build_update(
+                    set_values={
+                        'status': status,
+                        'updatedAt': datetime.utcnow().isoformat() + 'Z'
+                    },
+                    condition='attribute_exists(pk)'
+                )
             )
             
             logger.info("Onboarding request status updated", extra={
@@ -148,7 +229,7 @@ class OnboardingRequestUtil:
                 "status": status
             })
             
-            return response['Attributes']
+            return response.get('Attributes', {})
             
         except self.table.meta.client.exceptions.ConditionalCheckFailedException:
             logger.warning("Onboarding request not found for update", extra={"uniqueId": unique_id})
@@ -157,35 +238,76 @@ class OnboardingRequestUtil:
             logger.exception("Failed to update onboarding request status")
             raise
 
+    def transact_update_status(
+        self,
+        transaction: TransactionWriter,
+        unique_id: str,
+        status: OnboardingStatus,
+        updates: Optional[Dict[str, Any]] = None
+    ) -> TransactionWriter:
+        """Add an onboarding request status update to a transaction
+        
+        Args:
+            transaction: Transaction to add the update to
+            unique_id: Onboarding request ID
+            status: New status
+            updates: Additional attribute paths to set (optional)
+        """
+        if not isinstance(status, OnboardingStatus):
+            raise ValidationError(f"Invalid status: {status}")
+        
+        if self.cache:
+            self.cache.invalidate(unique_id)
+        
+        return transaction.update(
+            self.table.name,
+            {'pk': f'REQUEST#{unique_id}'},
+            set_values={
+                **(updates or {}),
+                'status': status,
+                'updatedAt': datetime.utcnow().isoformat() + 'Z'
+            },
+            condition='attribute_exists(pk)'
+        )
+
     @tracer.capture_method
     def update_request(
         self, 
         unique_id: str, 
-        updates: dict
+        updates: dict,
+        returns: ReturnValues = ReturnValues.ALL_NEW,
+        remove: Optional[List[str]] = None,
+        append: Optional[Dict[str, List[Any]]] = None
     ) -> OnboardingRequestItem:
-        """Update onboarding request fields"""
+        """Update onboarding request fields
+        
+        Args:
+            unique_id: Onboarding request ID
+            updates: Attribute paths to set, nested paths allowed
+            returns: Attributes to return (NONE, UPDATED_NEW or ALL_NEW)
+            remove: Attribute paths to remove (optional)
+            append: List attribute paths to append to, e.g. documents (optional)
+        """
         try:
             # Validate status if included
             if 'status' in updates:
                 if not isinstance(updates['status'], OnboardingStatus):
                     raise ValidationError(f"Invalid status: {updates['status']}")
             
-            update_expr = 'SET ' + ', '.join(f'#{k} = :{k}' for k in updates.keys())
-            update_expr += ', updatedAt = :updatedAt'
-            
-            expr_names = {f'#{k}': k for k in updates.keys()}
-            expr_values = {f':{k}': v for k, v in updates.items()}
-            expr_values[':updatedAt'] = datetime.utcnow().isoformat() + 'Z'
+            if self.cache:
+                self.cache.invalidate(unique_id)
             
             response = self.table.update_item(
                 Key={
                     'pk': f'REQUEST#{unique_id}'
                 },
-                UpdateExpression=update_expr,
-                ExpressionAttributeNames=expr_names,
-                ExpressionAttributeValues=expr_values,
-                ReturnValues='ALL_NEW',
-                ConditionExpression='attribute_exists(pk)'
+                ReturnValues=ReturnValues(returns).value,
+                **build_update(
+                    set_values={**updates, 'updatedAt': datetime.utcnow().isoformat() + 'Z'},
+                    remove=remove,
+                    append=append,
+                    condition='attribute_exists(pk)'
+                )
             )
             
             logger.info("Onboarding request updated", extra={
@@ -193,7 +315,7 @@ class OnboardingRequestUtil:
                 "updates": updates
             })
             
-            return response['Attributes']
+            return response.get('Attributes', {})
             
         except self.table.meta.client.exceptions.ConditionalCheckFailedException:
             logger.warning("Onboarding request not found for update", extra={"uniqueId": unique_id})
@@ -206,16 +328,28 @@ class OnboardingRequestUtil:
     def list_requests(
         self,
         limit: int = 50,
-        next_token: Optional[str] = None
+        next_token: Optional[str] = None,
+        fields: Optional[List[str]] = REQUEST_SUMMARY_FIELDS
     ) -> Dict[str, Any]:
-        """List onboarding requests with pagination, sorted by creation date"""
+        """List onboarding requests with pagination, sorted by creation date
+        
+        Args:
+            limit: Maximum number of items to return
+            next_token: Pagination token from a previous call
+            fields: Attribute paths to return, defaults to summary fields.
+                Pass None to return full items.
+        """
         try:
             # Prepare scan parameters
             params = {
                 'TableName': self.table.name,
                 'Limit': limit,
-                # 'ProjectionExpression': "uniqueId, email, firstName, country, createdAt",
             }
+            
+            if fields:
+                projection, expr_names = build_projection(fields)
+                params['ProjectionExpression'] = projection
+                params['ExpressionAttributeNames'] = expr_names
 
             if next_token:
                 try:
@@ -0,0 +1,114 @@
+from aws_lambda_powertools import Logger, Tracer
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+import hashlib
+import boto3
+import fitz  # PyMuPDF
+
+# Initialize powertools
+logger = Logger()
+tracer = Tracer()
+
+# Concurrent uploads when writing split pages
+UPLOAD_WORKERS = 16
+
+class PageStoreUtil:
+    """Utility class for single-page PDFs split from analysis documents
+
+    A document is downloaded and split once per analysis, each page task
+    then reads only its own page object,
+    ``<prefix>{analysisId}/{sha1(objectKey)}/{page}.pdf``.
+    """
+
+    def __init__(self, bucket_name: str, prefix: str = 'pages/'):
+        """Initialize PageStoreUtil
+
+        Args:
+            bucket_name: Bucket holding the source documents and split pages
+            prefix: Key prefix of split pages, expired by a bucket lifecycle rule
+        """
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.s3_client = boto3.client('s3')
+
+    def page_key(self, analysis_id: str, object_key: str, page_number: int) -> str:
+        object_hash = hashlib.sha1(object_key.encode('utf-8')).hexdigest()
+        return f'{self.prefix}{analysis_id}/{object_hash}/{page_number}.pdf'
+
+    @tracer.capture_method
+    def split_object(self, analysis_id: str, object_key: str) -> List[Dict[str, Any]]:
+        """Download a PDF once and write every page as its own PDF
+
+        Single-page documents are not copied, their task points at the
+        source object.
+
+        Args:
+            analysis_id: Analysis ID
+            object_key: Key of the source PDF
+
+        Returns:
+            Page tasks with objectKey, pageNumber, totalPages, pageKey and
+            sourcePage (the page to read within pageKey)
+        """
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=object_key)
+            pdf_content = response['Body'].read()
+
+            with fitz.open(stream=pdf_content, filetype="pdf") as source:
+                total_pages = source.page_count
+                if total_pages <= 1:
+                    return [{
+                        'objectKey': object_key,
+                        'pageNumber': 1,
+                        'totalPages': total_pages,
+                        'pageKey': object_key,
+                        'sourcePage': 1
+                    }] if total_pages else []
+
+                pages = []
+                for index in range(total_pages):
+                    with fitz.open() as page_document:
+                        page_document.insert_pdf(source, from_page=index, to_page=index)
+                        # garbage collection drops resources only other pages use
+                        pages.append(page_document.tobytes(garbage=3, deflate=True))
+
+            tasks = [
+                {
+                    'objectKey': object_key,
+                    'pageNumber': page_number,
+                    'totalPages': total_pages,
+                    'pageKey': self.page_key(analysis_id, object_key, page_number),
+                    'sourcePage': 1
+                }
+                for page_number in range(1, total_pages + 1)
+            ]
+
+            with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+                list(executor.map(
+                    lambda task_body: self.s3_client.put_object(
+                        Bucket=self.bucket_name,
+                        Key=task_body[0]['pageKey'],
+                        Body=task_body[1],
+                        ContentType='application/pdf'
+                    ),
+                    zip(tasks, pages)
+                ))
+
+            logger.info("Split PDF into pages", extra={
+                "analysisId": analysis_id,
+                "objectKey": object_key,
+                "totalPages": total_pages,
+                "sourceBytes": len(pdf_content),
+                "pageBytes": sum(len(page) for page in pages)
+            })
+            return tasks
+
+        except Exception as e:
+            logger.exception("Failed to split PDF", extra={"objectKey": object_key})
+            raise
+
+    @tracer.capture_method
+    def get_page(self, page_key: str) -> bytes:
+        """Read a page object, or a whole source document for unsplit tasks"""
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=page_key)
+        return response['Body'].read()
@@ -1,10 +1,17 @@
 from aws_lambda_powertools import Logger, Tracer
 from datetime import datetime
 from typing import List, Dict, Any, Optional
+from collections import OrderedDict
 from enum import Enum
-import boto3
+import base64
+import json
 from utilities.exceptions import PromptNotFoundException, ValidationError
 from utilities.types import PromptItem
+from utilities.models import PromptRecord
+from data.base import build_projection, ReturnValues
+from data.cache import ItemCache
+from data.expressions import build_update
+from data.engine import Engine, get_table, get_client
 
 # Initialize powertools
 logger = Logger()
@@ -16,12 +23,40 @@ class PromptType(str, Enum):
     ASSISTANT = "ASSISTANT"
     FUNCTION = "FUNCTION"
 
+# Executions whose pinned prompt versions are kept per warm container
+MAX_PINNED_EXECUTIONS = 64
+
 class PromptUtil:
-    """Utility class for handling Prompt operations in DynamoDB"""
+    """Utility class for handling Prompt operations in DynamoDB
+    
+    With a cache, prompts are served from memory. Entries older than the
+    cache TTL are revalidated against ``lastUpdatedAt`` with a projected
+    read and only re-fetched when the prompt changed. Passing an execution
+    ID pins the first version read, so every step of one execution sees the
+    same prompt even if it is updated mid-run.
+    """
 
-    def __init__(self, table_name: str):
-        """Initialize PromptUtil with DynamoDB table name"""
-        self.table = boto3.resource('dynamodb').Table(table_name)
+    def __init__(
+        self,
+        table_name: str,
+        cache: Optional[ItemCache] = None,
+        engine: Optional[Engine] = None
+    ):
+        """Initialize PromptUtil with DynamoDB table name
+        
+        Args:
+            table_name: Name of the DynamoDB table
+            cache: Prompt cache, meant to live at module level (optional, disabled by default)
+            engine: Resource or low-level client engine (optional, defaults to DYNAMODB_ENGINE)
+        """
+        self.table = get_table(table_name, engine)
+        self.cache = cache
+        self._pins: 'OrderedDict[str, Dict[str, PromptItem]]' = OrderedDict()
+    
+    @property
+    def client(self):
+        """Shared low-level DynamoDB client"""
+        return get_client()
     
     @tracer.capture_method
     def create_prompt(
@@ -45,6 +80,8 @@ class PromptUtil:
             }
             
             self.table.put_item(Item=prompt_item)
+            if self.cache:
+                self.cache.put(prompt_id, prompt_item)
             logger.info("Created prompt", extra={"promptId": prompt_id})
             return prompt_item
             
@@ -53,11 +90,115 @@ class PromptUtil:
             raise
     
     @tracer.capture_method
-    def get_prompt(self, prompt_id: str) -> PromptItem:
-        """Get a prompt by ID"""
+    def get_prompt(self, prompt_id: str, execution_id: Optional[str] = None) -> PromptItem:
+        """Get a prompt by ID
+        
+        Args:
+            prompt_id: Prompt ID
+            execution_id: Workflow execution to pin the returned version to (optional)
+        """
         try:
-            response = self.table.get_item(
-                Key={'pk': prompt_id}
+            if execution_id:
+                pinned = self._pins.get(execution_id, {}).get(prompt_id)
+                if pinned is not None:
+                    return pinned
+            
+            item = self._get_cached(prompt_id) if self.cache else None
+            if item is None:
+                item = self._fetch_prompt(prompt_id)
+                if not item:
+                    logger.warning("Prompt not found", extra={"promptId": prompt_id})
+                    raise PromptNotFoundException(f"Prompt not found: {prompt_id}")
+                if self.cache:
+                    self.cache.put(prompt_id, item)
+            
+            if execution_id:
+                self._pin(execution_id, item)
+            return item
+            
+        except Exception as e:
+            logger.exception("Failed to get prompt")
+            raise
+    
+    def _fetch_prompt(
+        self,
+        prompt_id: str,
+        fields: Optional[List[str]] = None,
+        consistent: bool = False
+    ) -> Optional[PromptItem]:
+        """Read a prompt item from DynamoDB"""
+        params = {
+            'Key': {'pk': prompt_id},
+            'ConsistentRead': consistent
+        }
+        if fields:
+            projection, expr_names = build_projection(fields)
+            params['ProjectionExpression'] = projection
+            params['ExpressionAttributeNames'] = expr_names
+        
+        return self.table.get_item(**params).get('Item')
+    
+    def _get_cached(self, prompt_id: str) -> Optional[PromptItem]:
+        """Return a cached prompt, revalidating expired entries by lastUpdatedAt"""
+        item = self.cache.get(prompt_id)
+        if item is not None:
+            return item
+        
+        stale = self.cache.peek(prompt_id)
+        if stale is None:
+            return None
+        
+        current = self._fetch_prompt(prompt_id, ['lastUpdatedAt'], consistent=True)
+        if current and current.get('lastUpdatedAt') == stale.get('lastUpdatedAt'):
+            # Unchanged, extend the entry without re-reading the content
+            self.cache.put(prompt_id, stale)
+            return stale
+        
+        self.cache.invalidate(prompt_id)
+        return None
+    
+    def _pin(self, execution_id: str, item: PromptItem) -> None:
+        pins = self._pins.setdefault(execution_id, {})
+        pins.setdefault(item['pk'], item)
+        self._pins.move_to_end(execution_id)
+        while len(self._pins) > MAX_PINNED_EXECUTIONS:
+            self._pins.popitem(last=False)
+    
+    def release_execution(self, execution_id: str) -> None:
+        """Drop the prompt versions pinned to an execution"""
+        self._pins.pop(execution_id, None)
+    
+    @tracer.capture_method
+    def preload_prompts(self, prompt_type: PromptType) -> int:
+        """Load every prompt of a type into the cache
+        
+        Returns:
+            Number of prompts cached
+        """
+        if not self.cache:
+            return 0
+        
+        count = 0
+        next_token = None
+        while True:
+            page = self.list_prompts_by_type(prompt_type, next_token=next_token)
+            for item in page['items']:
+                self.cache.put(item['pk'], item)
+                count += 1
+            next_token = page.get('nextToken')
+            if not next_token:
+                break
+        
+        logger.info("Preloaded prompts", extra={"type": prompt_type, "count": count})
+        return count
+    
+    @tracer.capture_method
+    def get_prompt_record(self, prompt_id: str) -> PromptRecord:
+        """Get a prompt by ID as a slotted record, read through the low-level client"""
+        try:
+            response = self.client.get_item(
+                TableName=self.table.name,
+                Key={'pk': {'S': prompt_id}}
             )
             
             item = response.get('Item')
@@ -65,7 +206,7 @@ class PromptUtil:
                 logger.warning("Prompt not found", extra={"promptId": prompt_id})
                 raise PromptNotFoundException(f"Prompt not found: {prompt_id}")
                 
-            return item
+            return PromptRecord.from_image(item)
             
         except Exception as e:
             logger.exception("Failed to get prompt")
@@ -76,33 +217,33 @@ class PromptUtil:
         self, 
         prompt_id: str,
         content: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        returns: ReturnValues = ReturnValues.ALL_NEW
     ) -> PromptItem:
         """Update a prompt"""
         try:
-            update_expr = 'SET content = :content, lastUpdatedAt = :lastUpdatedAt'
-            expr_values = {
-                ':content': content,
-                ':lastUpdatedAt': datetime.utcnow().isoformat() + 'Z'
+            updates = {
+                'content': content,
+                'lastUpdatedAt': datetime.utcnow().isoformat() + 'Z'
             }
             
             if metadata is not None:
-                update_expr += ', metadata = :metadata'
-                expr_values[':metadata'] = metadata
+                updates['metadata'] = metadata
+            
+            if self.cache:
+                self.cache.invalidate(prompt_id)
             
             response = self.table.update_item(
                 Key={'pk': prompt_id},
-                UpdateExpression=update_expr,
-                ExpressionAttributeValues=expr_values,
-                ReturnValues='ALL_NEW',
-                ConditionExpression='attribute_exists(pk)'
+                ReturnValues=ReturnValues(returns).value,
+                **build_update(set_values=updates, condition='attribute_exists(pk)')
             )
             
             logger.info("Updated prompt", extra={
                 "promptId": prompt_id
             })
             
-            return response['Attributes']
+            return response.get('Attributes', {})
             
         except self.table.meta.client.exceptions.ConditionalCheckFailedException:
             logger.warning("Prompt not found for update", extra={"promptId": prompt_id})
@@ -118,7 +259,13 @@ class PromptUtil:
         limit: int = 50,
         next_token: Optional[str] = None
     ) -> Dict[str, Any]:
-        """List prompts by type using GSI"""
+        """List prompts by type using GSI
+        
+        Args:
+            prompt_type: Prompt type
+            limit: Maximum number of items to return
+            next_token: Pagination token from a previous call
+        """
         try:
             params = {
                 'IndexName': 'typeIndex',
@@ -133,9 +280,13 @@ class PromptUtil:
             }
             
             if next_token:
-                params['ExclusiveStartKey'] = {
-                    'pk': next_token
-                }
+                # The token carries the full key including the index keys
+                try:
+                    params['ExclusiveStartKey'] = json.loads(
+                        base64.b64decode(next_token.encode()).decode()
+                    )
+                except Exception:
+                    raise ValidationError("Invalid next token")
             
             response = self.table.query(**params)
             
@@ -145,7 +296,9 @@ class PromptUtil:
             }
             
             if 'LastEvaluatedKey' in response:
-                result['nextToken'] = response['LastEvaluatedKey']['pk']
+                result['nextToken'] = base64.b64encode(
+                    json.dumps(response['LastEvaluatedKey']).encode()
+                ).decode()
             
             logger.info("Listed prompts by type", extra={
                 "type": prompt_type,
@@ -0,0 +1,153 @@
+from aws_lambda_powertools import Logger, Tracer
+from typing import Dict, Any, Optional, List
+import hashlib
+from data.expressions import build_update
+from data.engine import get_client
+from utilities.exceptions import TransactionFailedError, TransactionTokenMismatchError
+from utilities.models import serialize
+
+# Initialize powertools
+logger = Logger()
+tracer = Tracer()
+
+# TransactWriteItems limit
+MAX_TRANSACTION_ITEMS = 100
+
+def idempotency_token(*parts: str) -> str:
+    """Derive a ClientRequestToken from stable request attributes
+
+    Step Functions retries carry the same task token, so hashing it gives a
+    token that stays the same across retries of one execution.
+    """
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:36]
+
+def _serialize(values: Dict[str, Any]) -> Dict[str, Any]:
+    # Same converter as ClientTable, so values read with either engine,
+    # including floats, can be written back in a transaction
+    return {k: serialize(v) for k, v in values.items()}
+
+class TransactionWriter:
+    """Collects writes across tables and applies them with one TransactWriteItems call
+
+    Data utils add their own operations through helpers such as
+    AnalysisUtil.transact_update so keys, codecs and timestamps stay
+    consistent with their non-transactional writes.
+    """
+
+    def __init__(self, client=None):
+        """Initialize TransactionWriter
+
+        Args:
+            client: Low-level DynamoDB client (optional, defaults to the shared
+                client). Must not be a resource's meta.client, which would
+                serialize the attribute values again
+        """
+        self.client = client or get_client()
+        self.items: List[Dict[str, Any]] = []
+
+    def update(
+        self,
+        table_name: str,
+        key: Dict[str, Any],
+        set_values: Optional[Dict[str, Any]] = None,
+        remove: Optional[List[str]] = None,
+        append: Optional[Dict[str, List[Any]]] = None,
+        increment: Optional[Dict[str, Any]] = None,
+        expected: Optional[Dict[str, Any]] = None,
+        condition: Optional[str] = None
+    ) -> 'TransactionWriter':
+        """Add an update operation, arguments match build_update"""
+        params = build_update(
+            set_values=set_values,
+            remove=remove,
+            append=append,
+            increment=increment,
+            expected=expected,
+            condition=condition
+        )
+        if 'ExpressionAttributeValues' in params:
+            params['ExpressionAttributeValues'] = _serialize(params['ExpressionAttributeValues'])
+
+        self.items.append({
+            'Update': {
+                'TableName': table_name,
+                'Key': _serialize(key),
+                **params
+            }
+        })
+        return self
+
+    def put(
+        self,
+        table_name: str,
+        item: Dict[str, Any],
+        condition: Optional[str] = None
+    ) -> 'TransactionWriter':
+        """Add a put operation"""
+        operation = {
+            'TableName': table_name,
+            'Item': _serialize(item)
+        }
+        if condition:
+            operation['ConditionExpression'] = condition
+
+        self.items.append({'Put': operation})
+        return self
+
+    def condition_check(
+        self,
+        table_name: str,
+        key: Dict[str, Any],
+        expected: Dict[str, Any]
+    ) -> 'TransactionWriter':
+        """Add a check that the given attribute paths hold the expected values"""
+        params = build_update(expected=expected)
+        self.items.append({
+            'ConditionCheck': {
+                'TableName': table_name,
+                'Key': _serialize(key),
+                'ConditionExpression': params['ConditionExpression'],
+                'ExpressionAttributeNames': params['ExpressionAttributeNames'],
+                'ExpressionAttributeValues': _serialize(params['ExpressionAttributeValues'])
+            }
+        })
+        return self
+
+    @tracer.capture_method
+    def commit(self, token: Optional[str] = None) -> None:
+        """Apply all collected operations atomically
+
+        Args:
+            token: ClientRequestToken making the call idempotent for 10 minutes (optional)
+
+        Raises:
+            TransactionTokenMismatchError: If the token was used within 10 minutes by
+                a transaction with other values, e.g. an earlier attempt with other
+                timestamps. The caller reads back the state to tell whether that
+                attempt was applied
+            TransactionFailedError: If any condition fails or the transaction is cancelled
+        """
+        if not self.items:
+            return
+        if len(self.items) > MAX_TRANSACTION_ITEMS:
+            raise TransactionFailedError(f"Transaction exceeds {MAX_TRANSACTION_ITEMS} operations")
+
+        params = {'TransactItems': self.items}
+        if token:
+            params['ClientRequestToken'] = token
+
+        try:
+            self.client.transact_write_items(**params)
+            logger.info("Transaction committed", extra={"operationCount": len(self.items)})
+        except self.client.exceptions.IdempotentParameterMismatchException as e:
+            logger.warning("Transaction token already used with other values", extra={"token": token})
+            raise TransactionTokenMismatchError(f"Transaction token {token} already used") from e
+        except self.client.exceptions.TransactionCanceledException as e:
+            reasons = [
+                reason.get('Code', 'None')
+                for reason in e.response.get('CancellationReasons', [])
+            ]
+            logger.warning("Transaction cancelled", extra={"reasons": reasons})
+            raise TransactionFailedError(f"Transaction cancelled: {reasons}") from e
+        finally:
+            self.items = []
@@ -0,0 +1,190 @@
+from aws_lambda_powertools import Logger, Tracer
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from typing import Callable, Dict, Any, Optional
+import json
+import os
+import random
+import threading
+import time
+import boto3
+from data.governor import ConcurrencyGovernor
+
+# Initialize powertools
+logger = Logger()
+tracer = Tracer()
+
+# Error codes that mean the account's model quota or capacity is exhausted.
+# Errors raised inside a response stream (EventStreamError) carry the same
+# codes in lower camel case, e.g. throttlingException, so codes are
+# compared without case.
+THROTTLE_CODES = (
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceQuotaExceededException',
+    'ServiceUnavailableException'
+)
+_THROTTLE_CODES = frozenset(code.lower() for code in THROTTLE_CODES)
+
+def is_throttle(error: ClientError) -> bool:
+    """Whether a call or stream error is a throttle"""
+    return error.response.get('Error', {}).get('Code', '').lower() in _THROTTLE_CODES
+
+class BedrockRuntime:
+    """Bedrock runtime client whose calls go through a ConcurrencyGovernor
+
+    Every invoke takes a slot of the governor of its model ID, so all
+    functions sharing GOVERNOR_TABLE_NAME stay within one adaptive limit
+    per model. Throttled calls lower that limit and are retried after a
+    jittered backoff; botocore's own retries are disabled so throttles
+    reach the governor instead of being retried blindly. Without a
+    governor table calls are made directly. invoke_model_stream holds its
+    slot until the stream is read to the end.
+    """
+
+    def __init__(self, governor_table_name: Optional[str] = None, max_attempts: Optional[int] = None):
+        """Initialize BedrockRuntime
+
+        Args:
+            governor_table_name: Governor table (optional, defaults to GOVERNOR_TABLE_NAME)
+            max_attempts: Attempts per call when throttled (optional, defaults to BEDROCK_MAX_ATTEMPTS or 4)
+        """
+        self.client = boto3.client(
+            'bedrock-runtime',
+            config=Config(retries={'max_attempts': 1, 'mode': 'standard'}, read_timeout=300)
+        )
+        self.governor_table_name = governor_table_name or os.environ.get('GOVERNOR_TABLE_NAME')
+        self.max_attempts = max_attempts or int(os.environ.get('BEDROCK_MAX_ATTEMPTS', '4'))
+        self._governors: Dict[str, ConcurrencyGovernor] = {}
+        self._lock = threading.Lock()
+
+    def governor(self, model_id: str) -> Optional[ConcurrencyGovernor]:
+        """Governor of a model, configured from the GOVERNOR_* environment variables"""
+        if not self.governor_table_name:
+            return None
+        with self._lock:
+            if model_id not in self._governors:
+                self._governors[model_id] = ConcurrencyGovernor(
+                    self.governor_table_name,
+                    model_id,
+                    initial_limit=float(os.environ.get('GOVERNOR_INITIAL_LIMIT', '4')),
+                    min_limit=float(os.environ.get('GOVERNOR_MIN_LIMIT', '1')),
+                    max_limit=float(os.environ.get('GOVERNOR_MAX_LIMIT', '32')),
+                    lease_seconds=int(os.environ.get('GOVERNOR_LEASE_SECONDS', '960')),
+                    max_wait_seconds=float(os.environ.get('GOVERNOR_MAX_WAIT', '60'))
+                )
+            return self._governors[model_id]
+
+    def _call(self, model_id: str, call: Callable[[], Dict[str, Any]], retryable: Callable[[], bool]) -> Dict[str, Any]:
+        """Make a call within the model's concurrency limit, retrying throttles while retryable()"""
+        governor = self.governor(model_id)
+        for attempt in range(1, self.max_attempts + 1):
+            lease = governor.acquire() if governor else None
+            try:
+                result = call()
+            except ClientError as e:
+                throttled = is_throttle(e)
+                if lease:
+                    if throttled:
+                        governor.throttled(lease)
+                    governor.release(lease, succeeded=False)
+                if not throttled or attempt == self.max_attempts or not retryable():
+                    raise
+                delay = random.uniform(0, min(30.0, 2.0 * 2 ** attempt))
+                logger.warning("Bedrock throttled, retrying", extra={
+                    "modelId": model_id,
+                    "attempt": attempt,
+                    "delay": round(delay, 2)
+                })
+                time.sleep(delay)
+                continue
+            except Exception:
+                if lease:
+                    governor.release(lease, succeeded=False)
+                raise
+
+            if lease:
+                governor.release(lease)
+            return result
+
+    @tracer.capture_method(capture_response=False)
+    def invoke_model(self, model_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Invoke a model within its concurrency limit
+
+        Args:
+            model_id: Bedrock model ID
+            request: Model request body
+
+        Returns:
+            The parsed response body
+
+        Raises:
+            ConcurrencyLimitError: If no slot frees up in time
+            ClientError: If the call fails, or is still throttled after max_attempts
+        """
+        body = json.dumps(request)
+
+        def call() -> Dict[str, Any]:
+            response = self.client.invoke_model(modelId=model_id, body=body)
+            return json.loads(response['body'].read())
+
+        return self._call(model_id, call, retryable=lambda: True)
+
+    @tracer.capture_method(capture_response=False)
+    def invoke_model_stream(
+        self,
+        model_id: str,
+        request: Dict[str, Any],
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """Invoke a model with a streamed response, within its concurrency limit
+
+        Text is passed to on_text as it arrives; an exception raised by
+        on_text stops reading the stream and is raised to the caller.
+        Throttles are retried only until the first text arrived, so on_text
+        never sees a response twice.
+
+        Args:
+            model_id: Bedrock model ID
+            request: Anthropic messages request body
+            on_text: Called with each text delta (optional)
+
+        Returns:
+            Response body in the shape invoke_model returns: content,
+            usage and stop_reason
+
+        Raises:
+            ConcurrencyLimitError: If no slot frees up in time
+            ClientError: If the call fails, or is still throttled after max_attempts
+        """
+        body = json.dumps(request)
+        received = []
+
+        def call() -> Dict[str, Any]:
+            response = self.client.invoke_model_with_response_stream(modelId=model_id, body=body)
+            stream = response['body']
+            usage = {'input_tokens': 0, 'output_tokens': 0}
+            stop_reason = None
+            try:
+                for event in stream:
+                    if 'chunk' not in event:
+                        continue
+                    chunk = json.loads(event['chunk']['bytes'])
+                    if chunk['type'] == 'message_start':
+                        usage.update(chunk['message'].get('usage', {}))
+                    elif chunk['type'] == 'content_block_delta' and chunk['delta'].get('type') == 'text_delta':
+                        received.append(chunk['delta']['text'])
+                        if on_text:
+                            on_text(chunk['delta']['text'])
+                    elif chunk['type'] == 'message_delta':
+                        stop_reason = chunk['delta'].get('stop_reason')
+                        usage['output_tokens'] = chunk.get('usage', {}).get('output_tokens', usage['output_tokens'])
+            finally:
+                stream.close()
+            return {
+                'content': [{'type': 'text', 'text': ''.join(received)}],
+                'usage': usage,
+                'stop_reason': stop_reason
+            }
+
+        return self._call(model_id, call, retryable=lambda: not received)
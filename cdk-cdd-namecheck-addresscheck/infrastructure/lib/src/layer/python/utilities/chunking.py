@@ -0,0 +1,67 @@
+from typing import Dict, Any, List, Tuple
+
+# Rough characters per Claude token of English text and markdown
+CHARS_PER_TOKEN = 4
+# Tokens of the <document-N> tags around a document's pages
+DOCUMENT_TAG_TOKENS = 10
+
+def estimate_text_tokens(text: str) -> int:
+    """Estimate the tokens of a text before sending it"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def format_document(number: int, contents: List[str]) -> str:
+    """Wrap the page contents of a document in numbered document tags"""
+    return "<document-{0}>\n{1}\n</document-{0}>".format(number, '\n'.join(contents))
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """Split a text into pieces of at most max_tokens, at line breaks where possible"""
+    size = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    while len(text) > size:
+        cut = text.rfind('\n', size // 2, size)
+        cut = cut if cut > 0 else size
+        pieces.append(text[:cut])
+        text = text[cut:].lstrip('\n')
+    pieces.append(text)
+    return pieces
+
+def chunk_documents(objects_data: List[Dict[str, Any]], max_tokens: int) -> List[str]:
+    """Split the pages of analysis objects into chunks of at most max_tokens
+
+    Pages stay whole and in order unless a single page exceeds the budget.
+    Each object keeps its document number, so a document spanning chunks
+    appears in each of them as <document-N> with the pages of that chunk.
+
+    Args:
+        objects_data: objectsData of an analysis
+        max_tokens: Estimated tokens per chunk
+
+    Returns:
+        Formatted document content of each chunk
+    """
+    if max_tokens <= DOCUMENT_TAG_TOKENS:
+        raise ValueError(f"Chunk budget of {max_tokens} tokens is too small")
+
+    chunks: List[str] = []
+    current: List[Tuple[int, List[str]]] = []
+    tokens = 0
+
+    def flush() -> None:
+        nonlocal current, tokens
+        if current:
+            chunks.append("\n\n".join(format_document(number, contents) for number, contents in current))
+        current, tokens = [], 0
+
+    for number, obj in enumerate(objects_data, 1):
+        for item in obj.get('data', []):
+            for piece in split_text(item['content'], max_tokens - DOCUMENT_TAG_TOKENS):
+                cost = estimate_text_tokens(piece)
+                if tokens + cost + DOCUMENT_TAG_TOKENS > max_tokens:
+                    flush()
+                if not current or current[-1][0] != number:
+                    current.append((number, []))
+                    tokens += DOCUMENT_TAG_TOKENS
+                current[-1][1].append(piece)
+                tokens += cost
+    flush()
+    return chunks
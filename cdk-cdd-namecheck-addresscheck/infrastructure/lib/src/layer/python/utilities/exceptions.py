@@ -6,6 +6,10 @@ class ValidationError(BaseError):
     """Raised when input validation fails."""
     pass
 
+class PreconditionFailedError(ValidationError):
+    """Raised when a conditional write finds the item changed since it was read."""
+    pass
+
 class AnalysisNotFoundException(BaseError):
     """Raised when an analysis is not found."""
     pass
@@ -19,4 +23,24 @@ class ResourceNotFoundError(BaseError):
     pass
 
 class OnboardingRequestNotFoundException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class PromptNotFoundException(BaseError):
+    """Raised when a prompt is not found."""
+    pass
+
+class TransactionFailedError(BaseError):
+    """Raised when a DynamoDB transaction is cancelled."""
+    pass
+
+class TransactionTokenMismatchError(TransactionFailedError):
+    """Raised when a transaction token was already used with other parameters."""
+    pass
+
+class ConcurrencyLimitError(BaseError):
+    """Raised when no concurrency slot frees up in time."""
+    pass
+
+class MalformedOutputError(BaseError):
+    """Raised when model output does not follow the expected format."""
+    pass
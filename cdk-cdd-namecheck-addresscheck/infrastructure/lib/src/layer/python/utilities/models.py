@@ -0,0 +1,317 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import ClassVar, Dict, Any, Optional, List, Tuple, Callable, Iterable
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer, Binary
+
+# Shared instances, building them per call is measurable at small Lambda sizes
+_deserializer = TypeDeserializer()
+_serializer = TypeSerializer()
+
+AttributeValue = Dict[str, Any]
+
+def _number(value: str) -> Any:
+    """Parse a DynamoDB number as int or float instead of Decimal"""
+    if '.' in value or 'e' in value or 'E' in value:
+        return float(value)
+    return int(value)
+
+def deserialize(value: AttributeValue) -> Any:
+    """Convert a low-level AttributeValue to a plain Python value
+
+    Numbers become int or float rather than Decimal. Strings, numbers,
+    booleans, lists and maps take a fast path, other types go through the
+    shared TypeDeserializer.
+    """
+    (kind, data), = value.items()
+    if kind == 'S':
+        return data
+    if kind == 'N':
+        return _number(data)
+    if kind == 'M':
+        return {key: deserialize(item) for key, item in data.items()}
+    if kind == 'L':
+        return [deserialize(item) for item in data]
+    if kind == 'BOOL':
+        return data
+    if kind == 'NULL':
+        return None
+    if kind == 'NS':
+        return {_number(item) for item in data}
+    return _deserializer.deserialize(value)
+
+def serialize(value: Any) -> AttributeValue:
+    """Convert a plain Python value to a low-level AttributeValue
+
+    Floats are accepted and written as numbers. Strings, numbers, booleans,
+    lists and maps take a fast path, other types go through the shared
+    TypeSerializer.
+    """
+    if value is None:
+        return {'NULL': True}
+    if isinstance(value, str):
+        return {'S': value}
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, int):
+        return {'N': str(value)}
+    if isinstance(value, float):
+        return {'N': str(Decimal(repr(value)))}
+    if isinstance(value, Model):
+        return {'M': value.to_image()}
+    if isinstance(value, dict):
+        return {'M': {key: serialize(item) for key, item in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {'L': [serialize(item) for item in value]}
+    return _serializer.serialize(value)
+
+
+class Lazy:
+    """Attribute kept in its low-level form until first accessed
+
+    Large nested attributes such as objectsData are only converted when a
+    caller actually reads them.
+    """
+    __slots__ = ('raw', '_convert', '_value', '_loaded')
+
+    def __init__(self, raw: AttributeValue, convert: Callable[[AttributeValue], Any]):
+        self.raw = raw
+        self._convert = convert
+        self._value = None
+        self._loaded = False
+
+    @property
+    def value(self) -> Any:
+        if not self._loaded:
+            self._value = self._convert(self.raw)
+            self._loaded = True
+            self.raw = None
+        return self._value
+
+def resolve(value: Any) -> Any:
+    """Return the converted value of a possibly lazy attribute"""
+    return value.value if isinstance(value, Lazy) else value
+
+
+class Model:
+    """Base class for slotted record types
+
+    Subclasses are ``@dataclass(slots=True)`` and declare ``ATTRIBUTES``, a
+    tuple of (stored attribute name, field name) pairs, and ``NESTED``, the
+    record type of list fields. Attributes not declared on a model are ignored.
+    """
+    __slots__ = ()
+
+    ATTRIBUTES: ClassVar[Tuple[Tuple[str, str], ...]] = ()
+    NESTED: ClassVar[Dict[str, type]] = {}
+
+    @classmethod
+    def _convert_list(cls, name: str, values: List[Any]) -> List[Any]:
+        nested = cls.NESTED.get(name)
+        if nested is None:
+            return values
+        return [nested.from_item(value) for value in values]
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> 'Model':
+        """Build a record from a deserialized item"""
+        kwargs = {}
+        for attribute, name in cls.ATTRIBUTES:
+            if attribute in item:
+                value = item[attribute]
+                if isinstance(value, list):
+                    value = cls._convert_list(name, value)
+                kwargs[name] = value
+        return cls(**kwargs)
+
+    @classmethod
+    def from_image(cls, image: Dict[str, AttributeValue], lazy: Iterable[str] = ()) -> 'Model':
+        """Build a record from a low-level item as returned by the DynamoDB client
+
+        Args:
+            image: Attribute name to AttributeValue map
+            lazy: Stored attribute names to convert on first access (optional)
+        """
+        lazy = frozenset(lazy)
+        kwargs = {}
+        for attribute, name in cls.ATTRIBUTES:
+            raw = image.get(attribute)
+            if raw is None:
+                continue
+            if attribute in lazy:
+                kwargs[name] = Lazy(raw, lambda value, name=name: cls._convert_value(name, value))
+            else:
+                kwargs[name] = cls._convert_value(name, raw)
+        return cls(**kwargs)
+
+    @classmethod
+    def _convert_value(cls, name: str, raw: AttributeValue) -> Any:
+        value = deserialize(raw)
+        if isinstance(value, list):
+            value = cls._convert_list(name, value)
+        return value
+
+    def to_item(self) -> Dict[str, Any]:
+        """Convert the record to a plain item, None fields are omitted"""
+        item = {}
+        for attribute, name in self.ATTRIBUTES:
+            value = resolve(getattr(self, name))
+            if value is None:
+                continue
+            if isinstance(value, list):
+                value = [entry.to_item() if isinstance(entry, Model) else entry for entry in value]
+            item[attribute] = value
+        return item
+
+    def to_image(self) -> Dict[str, AttributeValue]:
+        """Convert the record to a low-level item, None fields are omitted"""
+        image = {}
+        for attribute, name in self.ATTRIBUTES:
+            value = getattr(self, name)
+            if isinstance(value, Lazy) and value.raw is not None:
+                # Never converted, write the stored form back unchanged
+                image[attribute] = value.raw
+                continue
+            value = resolve(value)
+            if value is not None:
+                image[attribute] = serialize(value)
+        return image
+
+
+@dataclass(slots=True)
+class PageRecord(Model):
+    ATTRIBUTES: ClassVar = (
+        ('page', 'page'),
+        ('content', 'content'),
+        ('tokenInput', 'token_input'),
+        ('tokenOutput', 'token_output')
+    )
+
+    page: int = 0
+    content: Any = None  # Plain text, or compressed/offloaded value, see data.codec
+    token_input: int = 0
+    token_output: int = 0
+
+
+@dataclass(slots=True)
+class ObjectRecord(Model):
+    ATTRIBUTES: ClassVar = (
+        ('object', 'object'),
+        ('numberOfPages', 'number_of_pages'),
+        ('data', 'data'),
+        ('tokenInput', 'token_input'),
+        ('tokenOutput', 'token_output')
+    )
+    NESTED: ClassVar = {'data': PageRecord}
+
+    object: str = ''
+    number_of_pages: Optional[int] = None
+    data: List[PageRecord] = field(default_factory=list)
+    token_input: int = 0
+    token_output: int = 0
+
+
+@dataclass(slots=True)
+class ChatMessageRecord(Model):
+    ATTRIBUTES: ClassVar = (
+        ('role', 'role'),
+        ('content', 'content'),
+        ('timestamp', 'timestamp')
+    )
+
+    role: str = ''
+    content: str = ''
+    timestamp: str = ''
+
+
+@dataclass(slots=True)
+class AnalysisResultRecord(Model):
+    ATTRIBUTES: ClassVar = (
+        ('analysis', 'analysis'),
+        ('result', 'result'),
+        ('thinking', 'thinking'),
+        ('inputToken', 'input_token'),
+        ('outputToken', 'output_token'),
+        ('partial', 'partial')
+    )
+
+    analysis: str = ''
+    result: Any = None  # Plain text, or compressed/offloaded value, see data.codec
+    thinking: Any = None
+    input_token: int = 0
+    output_token: int = 0
+    partial: bool = False  # Written while the reply was still streaming
+
+
+@dataclass(slots=True)
+class AnalysisRecord(Model):
+    ATTRIBUTES: ClassVar = (
+        ('pk', 'pk'),
+        ('sk', 'sk'),
+        ('analysisId', 'analysis_id'),
+        ('description', 'description'),
+        ('documentType', 'document_type'),
+        ('status', 'status'),
+        ('objectsData', 'objects_data'),
+        ('chatHistory', 'chat_history'),
+        ('analysisParameters', 'analysis_parameters'),
+        ('analysisResults', 'analysis_results'),
+        ('taskToken', 'task_token'),
+        ('yearMonth', 'year_month'),
+        ('yearMonthShard', 'year_month_shard'),
+        ('createdAt', 'created_at'),
+        ('lastUpdatedAt', 'last_updated_at'),
+        ('ttl', 'ttl')
+    )
+    NESTED: ClassVar = {
+        'objects_data': ObjectRecord,
+        'chat_history': ChatMessageRecord,
+        'analysis_results': AnalysisResultRecord
+    }
+
+    pk: Optional[str] = None  # Format: ID#{analysisId}
+    sk: Optional[str] = None  # Format: METADATA
+    analysis_id: Optional[str] = None
+    description: Optional[str] = None
+    document_type: Optional[str] = None
+    status: Optional[str] = None
+    objects_data: Any = None  # List[ObjectRecord] or Lazy
+    chat_history: Any = None  # List[ChatMessageRecord] or Lazy
+    analysis_parameters: Optional[Dict[str, Any]] = None
+    analysis_results: Any = None  # List[AnalysisResultRecord] or Lazy
+    task_token: Optional[str] = None
+    year_month: Optional[str] = None
+    year_month_shard: Optional[str] = None
+    created_at: Optional[str] = None
+    last_updated_at: Optional[str] = None
+    ttl: Optional[int] = None
+
+    @property
+    def objects(self) -> List[ObjectRecord]:
+        """objectsData, converted on first access when read lazily"""
+        return resolve(self.objects_data) or []
+
+    @property
+    def results(self) -> List[AnalysisResultRecord]:
+        """analysisResults, converted on first access when read lazily"""
+        return resolve(self.analysis_results) or []
+
+
+@dataclass(slots=True)
+class PromptRecord(Model):
+    ATTRIBUTES: ClassVar = (
+        ('pk', 'pk'),
+        ('type', 'type'),
+        ('content', 'content'),
+        ('metadata', 'metadata'),
+        ('createdAt', 'created_at'),
+        ('lastUpdatedAt', 'last_updated_at'),
+        ('ttl', 'ttl')
+    )
+
+    pk: str = ''  # Prompt ID
+    type: str = ''  # SYSTEM | USER | ASSISTANT | FUNCTION
+    content: str = ''
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    created_at: Optional[str] = None
+    last_updated_at: Optional[str] = None
+    ttl: Optional[int] = None
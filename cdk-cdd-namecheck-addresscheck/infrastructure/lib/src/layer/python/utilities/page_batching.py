@@ -0,0 +1,182 @@
+from typing import Dict, Any, List, Optional, Tuple
+import re
+import threading
+from utilities.chunking import estimate_text_tokens
+from utilities.render import RenderedPage
+
+# Claude bills about one token per 750 image pixels
+IMAGE_TOKEN_PIXELS = 750
+# Images Bedrock accepts in one Claude request
+MAX_IMAGES_PER_REQUEST = 20
+# Share of max_tokens planned for, the rest absorbs pages longer than estimated
+OUTPUT_HEADROOM = 0.75
+
+_PAGE_TAG = re.compile(r'<page number="(\d+)">\s*(.*?)\s*</page>', re.DOTALL)
+
+def estimate_input_tokens(page: RenderedPage) -> int:
+    """Input tokens a page adds to a request, its image or its text"""
+    if page.image is not None:
+        return max(1, page.pixels // IMAGE_TOKEN_PIXELS)
+    return estimate_text_tokens(page.text)
+
+class OutputEstimator:
+    """Running average of output tokens per page
+
+    Starts from a configured estimate and follows what extractions actually
+    produce. Meant to live at module level so warm containers keep it.
+    """
+
+    def __init__(self, initial: float, weight: float = 0.2):
+        """Initialize OutputEstimator
+
+        Args:
+            initial: Estimate before any page was extracted
+            weight: Weight of each new observation
+        """
+        self.value = initial
+        self.weight = weight
+        self._lock = threading.Lock()
+
+    def observe(self, output_tokens: int, pages: int = 1) -> None:
+        with self._lock:
+            self.value += self.weight * (output_tokens / max(pages, 1) - self.value)
+
+class PageGrouper:
+    """Groups rendered pages into multi-page requests as they arrive
+
+    A group grows until another page would exceed max_pages, the planned
+    output (pages x estimated output per page) would exceed the usable part
+    of max_tokens, or the estimated input would exceed max_input_tokens.
+    """
+
+    def __init__(
+        self,
+        max_pages: int,
+        max_tokens: int,
+        max_input_tokens: int,
+        estimator: OutputEstimator
+    ):
+        """Initialize PageGrouper
+
+        Args:
+            max_pages: Pages per request ceiling
+            max_tokens: max_tokens of the request
+            max_input_tokens: Estimated page input tokens per request ceiling
+            estimator: Output tokens per page estimate
+        """
+        self.max_pages = min(max_pages, MAX_IMAGES_PER_REQUEST)
+        self.max_tokens = max_tokens
+        self.max_input_tokens = max_input_tokens
+        self.estimator = estimator
+        self._group: List[Any] = []
+        self._input_tokens = 0
+
+    def _fits(self, input_tokens: int) -> bool:
+        pages = len(self._group) + 1
+        return (
+            pages <= self.max_pages
+            and pages * self.estimator.value <= self.max_tokens * OUTPUT_HEADROOM
+            and self._input_tokens + input_tokens <= self.max_input_tokens
+        )
+
+    def add(self, page: RenderedPage, item: Any = None) -> Optional[List[Any]]:
+        """Add a page, returning the previous group when the page does not fit in it
+
+        Args:
+            page: Rendered page
+            item: What to collect for the page (optional, defaults to the page)
+        """
+        input_tokens = estimate_input_tokens(page)
+        full = None
+        if self._group and not self._fits(input_tokens):
+            full = self.flush()
+        self._group.append(page if item is None else item)
+        self._input_tokens += input_tokens
+        return full
+
+    def flush(self) -> Optional[List[Any]]:
+        """Return the current group, None if empty"""
+        group, self._group, self._input_tokens = self._group or None, [], 0
+        return group
+
+def page_blocks(pages: List[RenderedPage]) -> List[Dict[str, Any]]:
+    """Content blocks presenting each page between numbered page tags"""
+    blocks = []
+    for page in pages:
+        if page.image is None:
+            blocks.append({
+                "type": "text",
+                "text": (
+                    f'<page number="{page.page_number}">\n'
+                    f"The page is provided as its text layer converted to markdown:\n\n{page.text}\n</page>"
+                )
+            })
+            continue
+        blocks.extend([
+            {"type": "text", "text": f'<page number="{page.page_number}">'},
+            {
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": page.media_type or "image/jpeg",
+                    "data": page.image
+                }
+            },
+            {"type": "text", "text": "</page>"}
+        ])
+    blocks.append({
+        "type": "text",
+        "text": (
+            "Apply the instructions above to each page separately. Wrap the output of "
+            'each page in <page number="N"></page> tags with its page number, in page order, '
+            "and write nothing outside the tags."
+        )
+    })
+    return blocks
+
+def split_pages(text: str, page_numbers: List[int]) -> Dict[int, str]:
+    """Split tagged model output into the content of each expected page
+
+    Pages without a complete tag, e.g. after the output was cut off at
+    max_tokens, are left out so the caller can extract them again.
+    """
+    expected = set(page_numbers)
+    contents = {}
+    for number, content in _PAGE_TAG.findall(text):
+        if int(number) in expected and int(number) not in contents:
+            contents[int(number)] = content
+    return contents
+
+def attribute_tokens(
+    pages: List[RenderedPage],
+    contents: Dict[int, str],
+    input_tokens: int,
+    output_tokens: int
+) -> Dict[int, Tuple[int, int]]:
+    """Attribute the tokens of a multi-page request to its pages
+
+    Input tokens are split by each page's estimated input, so the shared
+    prompt is divided in the same proportion; output tokens by the length
+    of each page's content. Rounding leftovers go to the first page.
+
+    Returns:
+        Page number to (input tokens, output tokens)
+    """
+    estimates = {page.page_number: estimate_input_tokens(page) for page in pages}
+    lengths = {number: len(contents.get(number, '')) for number in estimates}
+    total_estimate = sum(estimates.values()) or 1
+    total_length = sum(lengths.values()) or 1
+
+    tokens = {
+        number: (
+            input_tokens * estimates[number] // total_estimate,
+            output_tokens * lengths[number] // total_length
+        )
+        for number in estimates
+    }
+    first = pages[0].page_number
+    tokens[first] = (
+        tokens[first][0] + input_tokens - sum(value[0] for value in tokens.values()),
+        tokens[first][1] + output_tokens - sum(value[1] for value in tokens.values())
+    )
+    return tokens
@@ -0,0 +1,140 @@
+from aws_lambda_powertools import Logger, Tracer
+from typing import Dict, Any, Optional, Tuple
+import os
+import threading
+import time
+import boto3
+
+# Initialize powertools
+logger = Logger()
+tracer = Tracer()
+
+PromptKey = Tuple[str, Optional[str]]
+
+class PromptCache:
+    """In-memory cache of Bedrock prompt management templates
+
+    Templates are keyed by prompt ARN and version and kept for ttl_seconds.
+    For a further stale_seconds an expired template is still returned while
+    one background thread refreshes it, so requests never wait on
+    bedrock-agent once a container is warm; a failed refresh keeps serving
+    the last template. Versions other than DRAFT are immutable and never
+    expire. Instances are meant to live at module level so warm Lambda
+    containers reuse them across invocations.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        stale_seconds: Optional[float] = None,
+        pinned_version: Optional[str] = None
+    ):
+        """Initialize PromptCache
+
+        Args:
+            ttl_seconds: Age after which a template is refreshed (optional, defaults to PROMPT_CACHE_TTL or 300)
+            stale_seconds: How long past the TTL a template is served while refreshing
+                (optional, defaults to PROMPT_CACHE_STALE or 3600)
+            pinned_version: Prompt version used when a call names none (optional, defaults to PROMPT_VERSION)
+        """
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.environ.get('PROMPT_CACHE_TTL', '300'))
+        self.stale_seconds = stale_seconds if stale_seconds is not None else float(os.environ.get('PROMPT_CACHE_STALE', '3600'))
+        self.pinned_version = pinned_version or os.environ.get('PROMPT_VERSION') or None
+        self.hits = 0
+        self.misses = 0
+        self._client = None
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._entries: Dict[PromptKey, Tuple[float, Dict[str, Any]]] = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = boto3.client('bedrock-agent')
+        return self._client
+
+    @staticmethod
+    def _immutable(version: Optional[str]) -> bool:
+        return bool(version) and version != 'DRAFT'
+
+    @tracer.capture_method
+    def _fetch(self, prompt_id: str, version: Optional[str]) -> Dict[str, Any]:
+        """Get a prompt from Bedrock and keep the first variant's text template"""
+        params = {'promptIdentifier': prompt_id}
+        if version:
+            params['promptVersion'] = version
+        response = self.client.get_prompt(**params)
+
+        variants = response.get('variants', [])
+        if variants and 'templateConfiguration' in variants[0]:
+            template_config = variants[0]['templateConfiguration']
+            if 'text' in template_config:
+                prompt = {
+                    'name': response.get('name', 'Unknown Prompt'),
+                    'version': response.get('version', version or 'DRAFT'),
+                    'promptText': template_config['text'].get('text', '')
+                }
+                with self._lock:
+                    self._entries[(prompt_id, version)] = (time.monotonic(), prompt)
+                return prompt
+        raise ValueError("No valid prompt template found in response")
+
+    def _refresh(self, key: PromptKey) -> None:
+        try:
+            self._fetch(*key)
+        except Exception:
+            logger.warning("Prompt refresh failed, serving cached template", extra={
+                "promptId": key[0],
+                "version": key[1]
+            }, exc_info=True)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, prompt_id: str, version: Optional[str] = None) -> Dict[str, Any]:
+        """Get a prompt template, from the cache when possible
+
+        Args:
+            prompt_id: Prompt ARN or ID
+            version: Prompt version (optional, defaults to the pinned version, else DRAFT)
+
+        Returns:
+            Dict with name, version and promptText
+        """
+        version = version or self.pinned_version
+        key = (prompt_id, version)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.monotonic() - entry[0] if entry else None
+            if entry and (age <= self.ttl_seconds or self._immutable(version)):
+                self.hits += 1
+                return entry[1]
+
+            if entry and age <= self.ttl_seconds + self.stale_seconds:
+                self.hits += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+                return entry[1]
+            self.misses += 1
+
+        try:
+            return self._fetch(prompt_id, version)
+        except Exception as e:
+            if entry:
+                logger.warning("Prompt fetch failed, serving expired template", extra={
+                    "promptId": prompt_id,
+                    "version": version
+                }, exc_info=True)
+                return entry[1]
+            logger.exception(f"Error retrieving prompt {prompt_id}")
+            raise
+
+    def get_text(self, prompt_id: str, version: Optional[str] = None) -> str:
+        """Get only the template text of a prompt"""
+        return self.get(prompt_id, version)['promptText']
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
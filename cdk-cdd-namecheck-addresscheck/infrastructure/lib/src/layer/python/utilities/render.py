@@ -0,0 +1,220 @@
+from aws_lambda_powertools import Logger
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+import base64
+import os
+import fitz  # PyMuPDF
+from utilities.text_layer import TEXT_LAYER_MODE, PageKind, TextLayerMode, classify_page, page_to_markdown
+
+# Initialize powertools
+logger = Logger()
+
+# Longest image edge the model uses without downscaling it first
+MODEL_MAX_EDGE = 1568
+
+class ImageOptions(NamedTuple):
+    """How pages are rendered for the model
+
+    Attributes:
+        dpi: Render resolution, 144 matches the former 72 DPI render upscaled 2x
+        grayscale: Render a single gray channel instead of RGB
+        image_format: jpeg, png, or auto to use PNG for pages without
+            embedded images (text and line art) and JPEG for scans and photos
+        jpeg_quality: JPEG quality, 1-100
+        max_edge: Cap on the longer image edge in pixels
+    """
+    dpi: int = 144
+    grayscale: bool = False
+    image_format: str = 'auto'
+    jpeg_quality: int = 85
+    max_edge: int = MODEL_MAX_EDGE
+
+    @classmethod
+    def from_env(cls) -> 'ImageOptions':
+        """Options from RENDER_DPI, RENDER_GRAYSCALE, RENDER_FORMAT,
+        RENDER_JPEG_QUALITY and RENDER_MAX_EDGE, defaults for unset values"""
+        defaults = cls()
+        return cls(
+            dpi=int(os.environ.get('RENDER_DPI') or defaults.dpi),
+            grayscale=os.environ.get('RENDER_GRAYSCALE', '').lower() in ('1', 'true', 'yes'),
+            image_format=(os.environ.get('RENDER_FORMAT') or defaults.image_format).lower(),
+            jpeg_quality=int(os.environ.get('RENDER_JPEG_QUALITY') or defaults.jpeg_quality),
+            max_edge=int(os.environ.get('RENDER_MAX_EDGE') or defaults.max_edge)
+        )
+
+IMAGE_OPTIONS = ImageOptions.from_env()
+
+class PageSource(NamedTuple):
+    """A page to render: its page number in the document, the PDF holding it
+    and the 1-based page within that PDF"""
+    page_number: int
+    pdf_content: bytes
+    source_page: int
+
+class RenderedPage(NamedTuple):
+    """A page ready for extraction, born-digital pages carry no image"""
+    page_number: int
+    text: str  # Markdown of the text layer for PageKind.TEXT pages
+    image: Optional[str]  # Base64 encoded
+    media_type: Optional[str]
+    kind: PageKind = PageKind.SCANNED
+    pixels: int = 0  # Image width x height
+
+class RenderFailure(NamedTuple):
+    """A page that could not be rendered"""
+    page_number: int
+    error: str
+
+def render_page(
+    pdf_document: fitz.Document,
+    page_num: int,
+    options: Optional[ImageOptions] = None
+) -> Tuple[str, str, str, int]:
+    """Extract the text and an image of a page
+
+    The page is rasterized once at the target resolution, scaled down so
+    the longer edge fits options.max_edge, and encoded by PyMuPDF directly.
+
+    Args:
+        pdf_document: Open document
+        page_num: 1-based page number within the document
+        options: Image pipeline options (optional, defaults to env configuration)
+
+    Returns:
+        Tuple of (text content, base64 image, image media type, image pixels)
+    """
+    options = options or IMAGE_OPTIONS
+    page = pdf_document.load_page(page_num - 1)  # PyMuPDF uses 0-based indexing
+    text_content = page.get_text()
+
+    zoom = options.dpi / 72
+    long_edge = max(page.rect.width, page.rect.height)
+    if long_edge * zoom > options.max_edge:
+        zoom = options.max_edge / long_edge
+
+    pix = page.get_pixmap(
+        matrix=fitz.Matrix(zoom, zoom),
+        colorspace=fitz.csGRAY if options.grayscale else fitz.csRGB,
+        alpha=False
+    )
+
+    image_format = options.image_format
+    if image_format == 'auto':
+        image_format = 'jpeg' if page.get_images() else 'png'
+
+    if image_format == 'png':
+        image, media_type = pix.tobytes('png'), 'image/png'
+    else:
+        image, media_type = pix.tobytes('jpg', jpg_quality=options.jpeg_quality), 'image/jpeg'
+    return text_content, base64.b64encode(image).decode('utf-8'), media_type, pix.width * pix.height
+
+def render_source(source: PageSource, text_layer: Optional[bool] = None) -> RenderedPage:
+    """Render one page source in the current process
+
+    Args:
+        source: Page to render
+        text_layer: Convert pages with a usable text layer to markdown instead
+            of rendering an image (optional, defaults to TEXT_LAYER_MODE not off)
+    """
+    if text_layer is None:
+        text_layer = TEXT_LAYER_MODE != TextLayerMode.OFF
+
+    with fitz.open(stream=source.pdf_content, filetype="pdf") as pdf_document:
+        if text_layer:
+            page = pdf_document.load_page(source.source_page - 1)
+            classification = classify_page(page)
+            if classification.kind == PageKind.TEXT:
+                markdown = page_to_markdown(page, classification.tables)
+                return RenderedPage(source.page_number, markdown, None, None, PageKind.TEXT)
+            logger.debug("Page needs vision", extra={
+                "page": source.page_number,
+                "reason": classification.reason
+            })
+
+        text, image, media_type, pixels = render_page(pdf_document, source.source_page)
+    return RenderedPage(source.page_number, text, image, media_type, PageKind.SCANNED, pixels)
+
+def _render_worker(sources: List[PageSource], connection) -> None:
+    """Render pages in a child process, sending each result as it completes"""
+    try:
+        for source in sources:
+            try:
+                connection.send(render_source(source))
+            except Exception as e:
+                connection.send(('error', source.page_number, repr(e)))
+        connection.send(None)
+    finally:
+        connection.close()
+
+def default_workers() -> int:
+    """Render processes to use, RENDER_WORKERS or the vCPUs of the function"""
+    return int(os.environ.get('RENDER_WORKERS') or 0) or os.cpu_count() or 1
+
+def render_pages(
+    sources: List[PageSource],
+    workers: Optional[int] = None
+) -> Iterator[Union[RenderedPage, RenderFailure]]:
+    """Render pages across child processes, yielding each page as it finishes
+
+    Lambda has no /dev/shm, so multiprocessing.Pool and ProcessPoolExecutor
+    cannot create their semaphores there. Each worker is a plain Process
+    with its own pipe instead, and gets an interleaved share of the pages so
+    early pages arrive first. With one worker or one page, pages are
+    rendered in this process.
+
+    A page that fails to render, or whose worker died, is yielded as a
+    RenderFailure so the caller can keep the pages that did render.
+
+    Args:
+        sources: Pages to render
+        workers: Worker processes (optional, defaults to default_workers())
+    """
+    workers = min(workers or default_workers(), len(sources))
+    if workers <= 1:
+        for source in sources:
+            try:
+                yield render_source(source)
+            except Exception as e:
+                logger.exception("Page render failed", extra={"page": source.page_number})
+                yield RenderFailure(source.page_number, repr(e))
+        return
+
+    processes = []
+    readers = []
+    for index in range(workers):
+        reader, writer = Pipe(duplex=False)
+        process = Process(target=_render_worker, args=(sources[index::workers], writer), daemon=True)
+        process.start()
+        writer.close()
+        processes.append(process)
+        readers.append(reader)
+
+    pending = {source.page_number for source in sources}
+    try:
+        while readers:
+            for reader in wait(readers):
+                try:
+                    message = reader.recv()
+                except EOFError:
+                    message = None
+                if message is None:
+                    readers.remove(reader)
+                elif isinstance(message, RenderedPage):
+                    pending.discard(message.page_number)
+                    yield message
+                else:
+                    _, page_number, error = message
+                    pending.discard(page_number)
+                    logger.error("Page render failed", extra={"page": page_number, "error": error})
+                    yield RenderFailure(page_number, error)
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    # Pages of a worker that died
+    for page_number in sorted(pending):
+        logger.error("Page render worker exited", extra={"page": page_number})
+        yield RenderFailure(page_number, "Render worker exited")
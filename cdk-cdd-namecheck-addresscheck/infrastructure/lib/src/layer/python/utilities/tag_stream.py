@@ -0,0 +1,137 @@
+from typing import Dict, List, Optional, Sequence
+from utilities.exceptions import MalformedOutputError
+
+class TagStreamParser:
+    """Incremental parser of tagged model output, e.g. <thinking> and <response>
+
+    Text is fed as it streams in and the content of each tag is available
+    while the tag is still open. Output that breaks the format raises
+    MalformedOutputError as soon as it is seen, so a bad generation is
+    abandoned instead of read to the end:
+
+    - a closing tag that was not opened, or a tag opened twice
+    - more than max_preamble characters outside tags before the required
+      tag opens
+    - on close, a required tag that is missing or was cut off
+
+    Text inside a tag is kept as is, including tag-like text.
+    """
+
+    def __init__(self, tags: Sequence[str], required: str, max_preamble: int = 2000):
+        """Initialize TagStreamParser
+
+        Args:
+            tags: Tag names to capture
+            required: Tag that must be present and complete
+            max_preamble: Characters allowed outside tags before the required tag opens
+        """
+        self.tags = tuple(tags)
+        self.required = required
+        self.max_preamble = max_preamble
+        self.sections: Dict[str, str] = {}
+        self.closed: set = set()
+        self.current: Optional[str] = None
+        self._buffer = ''
+        self._preamble = 0
+        self._markers = {f'<{tag}>': (tag, True) for tag in self.tags}
+        self._markers.update({f'</{tag}>': (tag, False) for tag in self.tags})
+
+    def content(self, tag: str) -> Optional[str]:
+        """Content of a tag so far, stripped, None if not opened"""
+        section = self.sections.get(tag)
+        return section.strip() if section is not None else None
+
+    def feed(self, text: str) -> List[str]:
+        """Consume streamed text
+
+        Returns:
+            Tags whose content changed
+        """
+        self._buffer += text
+        changed = []
+        while self._buffer:
+            if self.current:
+                tag, length = self.current, len(self.sections[self.current])
+                consumed = self._consume_inside()
+                if len(self.sections[tag]) > length and tag not in changed:
+                    changed.append(tag)
+            else:
+                consumed = self._consume_outside()
+            if not consumed:
+                break
+        return changed
+
+    def _hold_back(self, marker: str) -> int:
+        """Length of a buffer suffix that may be the start of marker"""
+        for length in range(min(len(marker) - 1, len(self._buffer)), 0, -1):
+            if marker.startswith(self._buffer[-length:]):
+                return length
+        return 0
+
+    def _consume_inside(self) -> bool:
+        marker = f'</{self.current}>'
+        index = self._buffer.find(marker)
+        if index >= 0:
+            self.sections[self.current] += self._buffer[:index]
+            self.closed.add(self.current)
+            self._buffer = self._buffer[index + len(marker):]
+            self.current = None
+            return True
+
+        keep = self._hold_back(marker)
+        text = self._buffer[:len(self._buffer) - keep]
+        if not text:
+            return False
+        self.sections[self.current] += text
+        self._buffer = self._buffer[len(text):]
+        return True
+
+    def _consume_outside(self) -> bool:
+        index = self._buffer.find('<')
+        if index < 0:
+            self._outside(self._buffer)
+            self._buffer = ''
+            return True
+        if index > 0:
+            self._outside(self._buffer[:index])
+            self._buffer = self._buffer[index:]
+            return True
+
+        for marker, (tag, opening) in self._markers.items():
+            if self._buffer.startswith(marker):
+                self._buffer = self._buffer[len(marker):]
+                self._tag(tag, opening)
+                return True
+            if marker.startswith(self._buffer):
+                # Wait for the rest of a possible tag
+                return False
+
+        self._outside('<')
+        self._buffer = self._buffer[1:]
+        return True
+
+    def _tag(self, tag: str, opening: bool) -> None:
+        if not opening:
+            raise MalformedOutputError(f"Closing </{tag}> without an opening tag")
+        if tag in self.sections:
+            raise MalformedOutputError(f"<{tag}> opened twice")
+        self.sections[tag] = ''
+        self.current = tag
+
+    def _outside(self, text: str) -> None:
+        if self.required in self.sections:
+            return
+        self._preamble += len(text.strip())
+        if self._preamble > self.max_preamble:
+            raise MalformedOutputError(f"No <{self.required}> within {self.max_preamble} characters")
+
+    def close(self) -> None:
+        """Check the complete output
+
+        Raises:
+            MalformedOutputError: If the required tag is missing or incomplete
+        """
+        if self.required not in self.sections:
+            raise MalformedOutputError(f"No <{self.required}> in the output")
+        if self.required not in self.closed:
+            raise MalformedOutputError(f"<{self.required}> was not closed, the output may have been cut off")
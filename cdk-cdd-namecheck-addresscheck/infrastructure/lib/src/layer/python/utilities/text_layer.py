@@ -0,0 +1,130 @@
+from typing import List, NamedTuple, Optional
+from enum import Enum
+import os
+import statistics
+import fitz  # PyMuPDF
+
+# Pages with less extractable text are treated as scans
+MIN_TEXT_CHARS = 200
+# Share of the page covered by images above which it is treated as a scan
+MAX_IMAGE_COVERAGE = 0.5
+# Share of unmapped glyphs (U+FFFD) above which the text layer is unusable
+MAX_INVALID_CHARS = 0.02
+# Share of non-empty cells below which a detected table is unusable
+MIN_TABLE_FILL = 0.5
+# Invisible font OCR tools add over scanned images
+OCR_FONTS = ('GlyphLessFont',)
+
+class TextLayerMode(str, Enum):
+    """How pages with a usable text layer are extracted
+
+    OFF sends every page to the vision model, TEXT sends the text layer as
+    markdown to the model without an image, MARKDOWN stores the markdown
+    conversion without calling the model.
+    """
+    OFF = "off"
+    TEXT = "text"
+    MARKDOWN = "markdown"
+
+TEXT_LAYER_MODE = TextLayerMode(os.environ.get('TEXT_LAYER_MODE', TextLayerMode.TEXT.value))
+
+class PageKind(str, Enum):
+    TEXT = "text"        # Born-digital page with a usable text layer
+    SCANNED = "scanned"  # Needs the vision model
+
+class PageClassification(NamedTuple):
+    kind: PageKind
+    reason: str
+    tables: List[fitz.table.Table]
+
+def classify_page(page: fitz.Page) -> PageClassification:
+    """Decide whether a page's text layer can replace its image
+
+    A page qualifies when it has enough text drawn with real fonts, is not
+    mostly covered by images, has no broken glyph mappings, and every table
+    PyMuPDF detects has its cells filled.
+
+    Args:
+        page: Loaded page
+
+    Returns:
+        The classification, with the detected tables for page_to_markdown
+    """
+    text = page.get_text()
+    chars = sum(1 for char in text if not char.isspace())
+    if chars < MIN_TEXT_CHARS:
+        return PageClassification(PageKind.SCANNED, f"{chars} characters", [])
+
+    fonts = [font[3] for font in page.get_fonts()]
+    if not fonts or all(any(ocr in font for ocr in OCR_FONTS) for font in fonts):
+        return PageClassification(PageKind.SCANNED, "no fonts", [])
+
+    if text.count('\ufffd') / chars > MAX_INVALID_CHARS:
+        return PageClassification(PageKind.SCANNED, "unmapped glyphs", [])
+
+    page_area = abs(page.rect)
+    image_area = sum(abs(fitz.Rect(image['bbox']) & page.rect) for image in page.get_image_info())
+    if page_area and image_area / page_area > MAX_IMAGE_COVERAGE:
+        return PageClassification(PageKind.SCANNED, "image coverage", [])
+
+    tables = page.find_tables().tables
+    for table in tables:
+        cells = [cell for row in table.extract() for cell in row]
+        filled = sum(1 for cell in cells if cell and cell.strip())
+        if cells and filled / len(cells) < MIN_TABLE_FILL:
+            return PageClassification(PageKind.SCANNED, "sparse table", [])
+
+    return PageClassification(PageKind.TEXT, f"{chars} characters", tables)
+
+def _table_markdown(table: fitz.table.Table) -> str:
+    rows = [
+        [(cell or '').replace('\n', ' ').replace('|', '\\|').strip() for cell in row]
+        for row in table.extract()
+    ]
+    if not rows:
+        return ''
+    lines = [
+        '| ' + ' | '.join(rows[0]) + ' |',
+        '|' + '---|' * len(rows[0])
+    ]
+    lines.extend('| ' + ' | '.join(row) + ' |' for row in rows[1:])
+    return '\n'.join(lines)
+
+def page_to_markdown(page: fitz.Page, tables: Optional[List[fitz.table.Table]] = None) -> str:
+    """Convert the text layer of a page to markdown
+
+    Text blocks are emitted in reading order, lines set noticeably larger
+    than the body text become headings, and tables become markdown tables
+    in place of the text they cover.
+
+    Args:
+        page: Loaded page
+        tables: Tables found by classify_page (optional, detected again if None)
+    """
+    if tables is None:
+        tables = page.find_tables().tables
+    table_rects = [fitz.Rect(table.bbox) for table in tables]
+
+    blocks = [
+        block for block in page.get_text('dict', sort=True)['blocks']
+        if block.get('type') == 0 and not any(
+            fitz.Rect(block['bbox']).intersects(rect) for rect in table_rects
+        )
+    ]
+    sizes = [span['size'] for block in blocks for line in block['lines'] for span in line['spans'] if span['text'].strip()]
+    body_size = statistics.median(sizes) if sizes else 0
+
+    parts = []
+    for block in blocks:
+        lines = []
+        for line in block['lines']:
+            text = ''.join(span['text'] for span in line['spans']).strip()
+            if not text:
+                continue
+            size = max(span['size'] for span in line['spans'])
+            lines.append(f'## {text}' if body_size and size >= body_size * 1.3 else text)
+        if lines:
+            parts.append((block['bbox'][1], '\n'.join(lines)))
+    parts.extend((table.bbox[1], _table_markdown(table)) for table in tables)
+
+    return '\n\n'.join(text for _, text in sorted(parts, key=lambda part: part[0]) if text)
@@ -32,6 +32,21 @@ class ChatMessage(TypedDict):
     content: str
     timestamp: str  # ISO 8601 UTC timestamp
 
+class ChatMessageItem(ChatMessage):
+    pk: str  # Format: ID#{analysisId}
+    sk: str  # Format: CHAT#{timestamp}#{messageId}
+    analysisId: str
+    messageId: str
+    metadata: Optional[Dict[str, Any]]
+
+class ChatSummaryItem(TypedDict):
+    pk: str  # Format: ID#{analysisId}
+    sk: str  # Format: CHATSUMMARY
+    analysisId: str
+    summary: str
+    summarizedThrough: str  # Timestamp of the last summarized message
+    lastUpdatedAt: str  # ISO 8601 UTC timestamp
+
 class AnalysisResult(TypedDict):
     analysis: str
     result: str
@@ -45,9 +60,10 @@ class AnalysisItem(TypedDict):
     description: str
     documentType: str
     objectsData: List[ObjectData]
-    chatHistory: List[ChatMessage]
+    chatHistory: Optional[List[ChatMessage]]  # Legacy inline history, new messages are ChatMessageItems
     status: AnalysisStatus  # Updated to use enum
-    yearMonth: str
+    yearMonth: Optional[str]  # Legacy createdAtIndex key, not written on new items
+    yearMonthShard: str  # Format: {yearMonth}#{shard}
     createdAt: str  # ISO 8601 UTC timestamp
     lastUpdatedAt: str  # ISO 8601 UTC timestamp
     ttl: Optional[int] 
@@ -0,0 +1,51 @@
+"""Run a backfill transform over a DynamoDB table
+
+    cd lib/src/layer
+    python tools/backfill.py --table <analysis-table> --transform recompute-token-totals \
+        --segments 16 --capacity 200 --checkpoint /tmp/backfill.json
+
+Re-running with the same checkpoint resumes unfinished segments.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+
+from data.backfill import BackfillJob, FileCheckpoint, S3Checkpoint, TRANSFORMS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--table', required=True)
+    parser.add_argument('--transform', required=True, choices=sorted(TRANSFORMS))
+    parser.add_argument('--segments', type=int, default=8)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--page-size', type=int, default=200)
+    parser.add_argument('--capacity', type=float, help='Target consumed capacity units per second')
+    parser.add_argument('--checkpoint', help='Local path or s3://bucket/key')
+    parser.add_argument('--key-fields', default='pk,sk')
+    args = parser.parse_args()
+
+    checkpoint = None
+    if args.checkpoint and args.checkpoint.startswith('s3://'):
+        bucket, _, key = args.checkpoint[len('s3://'):].partition('/')
+        checkpoint = S3Checkpoint(bucket, key)
+    elif args.checkpoint:
+        checkpoint = FileCheckpoint(args.checkpoint)
+
+    job = BackfillJob(
+        args.table,
+        segments=args.segments,
+        workers=args.workers,
+        page_size=args.page_size,
+        capacity_per_second=args.capacity,
+        checkpoint=checkpoint
+    )
+    stats = job.run_update(TRANSFORMS[args.transform], key_fields=tuple(args.key_fields.split(',')))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,49 @@
 import os
-import boto3
-import json
 import re
-from typing import Dict, Any, List, Optional, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from data.analysis import AnalysisUtil
+from data.base import ReturnValues
+from data.cache import ItemCache
+from data.aggregates import AggregatesUtil
+from utilities.bedrock import BedrockRuntime
+from utilities.chunking import chunk_documents, estimate_text_tokens, format_document
+from utilities.prompt_cache import PromptCache
+from utilities.tag_stream import TagStreamParser
 
 logger = Logger()
 tracer = Tracer()
 
-bedrock_runtime = boto3.client('bedrock-runtime')
-bedrock_agent = boto3.client('bedrock-agent')
-analysis_util = AnalysisUtil(os.environ['ANALYSIS_TABLE_NAME'])
+bedrock = BedrockRuntime()
+prompt_cache = PromptCache()
+analysis_util = AnalysisUtil(os.environ['ANALYSIS_TABLE_NAME'], cache=ItemCache(ttl_seconds=300))
+aggregates_util = AggregatesUtil(os.environ['AGGREGATES_TABLE_NAME'])
 PROMPT_ID = os.environ['PROMPT_ID']
 MODEL_ID = "anthropic.claude-3-5-sonnet-20240620-v1:0"
+# Stream the reply, parsing tags as they arrive
+BEDROCK_STREAMING = os.environ.get('BEDROCK_STREAMING', 'true').lower() == 'true'
+# Write the result while it streams, at most every STREAM_FLUSH_SECONDS
+STREAM_PARTIAL_RESULTS = os.environ.get('STREAM_PARTIAL_RESULTS', 'true').lower() == 'true'
+STREAM_FLUSH_SECONDS = float(os.environ.get('STREAM_FLUSH_SECONDS', '2'))
+# Estimated prompt tokens above which documents are analysed in chunks
+MAX_PROMPT_TOKENS = int(os.environ.get('ANALYSIS_MAX_PROMPT_TOKENS', '150000'))
+# Estimated prompt tokens of each chunk and reduce step, and their concurrency
+CHUNK_PROMPT_TOKENS = int(os.environ.get('ANALYSIS_CHUNK_TOKENS', '50000'))
+CHUNK_CONCURRENCY = int(os.environ.get('ANALYSIS_CONCURRENCY', '4'))
+
+CHUNK_NOTE = (
+    "The documents below are part {part} of {parts} of this case. Check them on their own and "
+    "report every finding, matching or conflicting, citing the document numbers; the findings "
+    "of all parts are merged afterwards."
+)
+REDUCE_NOTE = (
+    "Instead of the documents, below are the findings of {parts} separate checks, each covering "
+    "part of the documents of this case. Merge them into a single answer for the whole case: "
+    "keep the document numbers they cite, and where parts disagree weigh all of their evidence."
+)
 
 @tracer.capture_method
 def extract_content_from_tags(text: str) -> Tuple[Optional[str], Optional[str]]:
@@ -35,26 +64,9 @@ def extract_content_from_tags(text: str) -> Tuple[Optional[str], Optional[str]]:
         logger.exception("Error extracting tagged content")
         raise
 
-@tracer.capture_method
 def retrieve_prompt(prompt_id: str) -> Dict[str, Any]:
-    """Retrieve prompt from Bedrock"""
-    try:
-        response = bedrock_agent.get_prompt(
-            promptIdentifier=prompt_id
-        )
-        variants = response.get('variants', [])
-        if variants and 'templateConfiguration' in variants[0]:
-            template_config = variants[0]['templateConfiguration']
-            if 'text' in template_config:
-                prompt_text = template_config['text'].get('text', '')
-                return {
-                    'name': response.get('name', 'Unknown Prompt'),
-                    'promptText': prompt_text
-                }
-        raise ValueError("No valid prompt template found in response")
-    except Exception as e:
-        logger.exception(f"Error retrieving prompt {prompt_id}")
-        raise
+    """Retrieve prompt from Bedrock, cached across invocations"""
+    return prompt_cache.get(prompt_id)
 
 @tracer.capture_method
 def prepare_document_content(objects_data: List[Dict[str, Any]]) -> str:
@@ -63,16 +75,78 @@ def prepare_document_content(objects_data: List[Dict[str, Any]]) -> str:
     for i, obj in enumerate(objects_data, 1):
         contents = [item['content'] for item in obj.get('data', [])]
         if contents:
-            document_content = "<document-{0}>\n{1}\n</document-{0}>".format(
-                i, 
-                '\n'.join(contents)
-            )
-            documents.append(document_content)
+            documents.append(format_document(i, contents))
     return "\n\n".join(documents)
 
+def stream_bedrock(
+    request: Dict[str, Any],
+    on_progress: Optional[Callable[[Optional[str], Optional[str]], None]] = None
+) -> Tuple[Dict[str, Any], Optional[str], Optional[str]]:
+    """Invoke Bedrock with a streamed reply, parsing the tags as they arrive
+    
+    Malformed output raises MalformedOutputError while streaming, without
+    waiting for the rest of the reply.
+    
+    Args:
+        request: Model request body
+        on_progress: Called with the response and thinking so far whenever they grow (optional)
+    
+    Returns:
+        Tuple of (response body, response content, thinking content)
+    """
+    parser = TagStreamParser(('thinking', 'response'), required='response')
+    
+    def on_text(text: str) -> None:
+        if parser.feed(text) and on_progress:
+            on_progress(parser.content('response'), parser.content('thinking'))
+    
+    response_body = bedrock.invoke_model_stream(MODEL_ID, request, on_text)
+    parser.close()
+    return response_body, parser.content('response'), parser.content('thinking')
+
+def partial_result_writer(analysis_id: str, prompt_name: str) -> Callable[[Optional[str], Optional[str]], None]:
+    """Progress callback writing the streaming result to the analysis
+    
+    Writes are spaced by STREAM_FLUSH_SECONDS and marked partial; a failed
+    write is logged and does not fail the analysis.
+    """
+    last_write = time.monotonic()
+    
+    def write(response_content: Optional[str], thinking_content: Optional[str]) -> None:
+        nonlocal last_write
+        if time.monotonic() - last_write < STREAM_FLUSH_SECONDS:
+            return
+        last_write = time.monotonic()
+        try:
+            analysis_util.update_analysis(
+                analysis_id=analysis_id,
+                updates={'analysisResults': [{
+                    'analysis': prompt_name,
+                    'result': response_content or '',
+                    'thinking': thinking_content,
+                    'inputToken': 0,
+                    'outputToken': 0,
+                    'partial': True
+                }]},
+                returns=ReturnValues.NONE
+            )
+        except Exception as e:
+            logger.warning("Failed to write partial analysis result", extra={"analysisId": analysis_id}, exc_info=True)
+    
+    return write
+
 @tracer.capture_method
-def invoke_bedrock(prompt_content: str) -> Dict[str, Any]:
-    """Invoke Bedrock with prepared content"""
+def invoke_bedrock(
+    prompt_content: str,
+    on_progress: Optional[Callable[[Optional[str], Optional[str]], None]] = None
+) -> Dict[str, Any]:
+    """Invoke Bedrock with prepared content
+    
+    Args:
+        prompt_content: Prompt with the documents and parameters filled in
+        on_progress: Called with the response and thinking so far while
+            streaming (optional)
+    """
     try:
         request = {
             "anthropic_version": "bedrock-2023-05-31",
@@ -85,16 +159,14 @@ def invoke_bedrock(prompt_content: str) -> Dict[str, Any]:
             ]
         }
 
-        response = bedrock_runtime.invoke_model(
-            modelId=MODEL_ID,
-            body=json.dumps(request)
-        )
-        
-        response_body = json.loads(response['body'].read())
-        raw_content = response_body['content'][0]['text']
-        
-        # Extract both response and thinking content
-        response_content, thinking_content = extract_content_from_tags(raw_content)
+        if BEDROCK_STREAMING:
+            response_body, response_content, thinking_content = stream_bedrock(request, on_progress)
+        else:
+            response_body = bedrock.invoke_model(MODEL_ID, request)
+            raw_content = response_body['content'][0]['text']
+            
+            # Extract both response and thinking content
+            response_content, thinking_content = extract_content_from_tags(raw_content)
         
         if not response_content:
             raise ValueError("No response content found in Bedrock response")
@@ -121,6 +193,101 @@ Last Name: {parameters.get('lastName', '')}
 Address: {parameters.get('address', '')}"""
     }
 
+def fill_prompt(prompt_template: str, document_content: str, input_content: str) -> str:
+    """Replace the variables of the prompt template"""
+    clean_prompt = prompt_template.replace("{{document}}", document_content)
+    return clean_prompt.replace("{{input}}", input_content)
+
+def group_by_budget(texts: List[str], max_tokens: int) -> List[List[str]]:
+    """Group texts in order so each group's estimated tokens stay within max_tokens"""
+    groups: List[List[str]] = []
+    tokens = 0
+    for text in texts:
+        cost = estimate_text_tokens(text)
+        if not groups or tokens + cost > max_tokens:
+            groups.append([])
+            tokens = 0
+        groups[-1].append(text)
+        tokens += cost
+    return groups
+
+@tracer.capture_method
+def analyze_in_chunks(
+    objects_data: List[Dict[str, Any]],
+    prompt_template: str,
+    input_content: str,
+    on_progress: Optional[Callable[[Optional[str], Optional[str]], None]] = None
+) -> Dict[str, Any]:
+    """Analyse documents too large for one prompt with map-reduce
+    
+    Pages are chunked by estimated tokens and each chunk is checked with
+    the analysis prompt concurrently. The findings are then merged with the
+    same prompt, in rounds when they do not fit in one prompt; only the
+    final merge reports progress.
+    
+    Args:
+        objects_data: objectsData of the analysis
+        prompt_template: Analysis prompt template
+        input_content: Parameters to check, filled in as {{input}}
+        on_progress: Called with the final response and thinking so far while streaming (optional)
+    
+    Returns:
+        Result of the final merge, with the tokens of every call
+    """
+    # Budget left for the documents once the template and note are filled in
+    overhead = estimate_text_tokens(fill_prompt(prompt_template, CHUNK_NOTE, input_content))
+    budget = CHUNK_PROMPT_TOKENS - overhead
+    chunks = chunk_documents(objects_data, budget)
+    prompts = [
+        fill_prompt(
+            prompt_template,
+            CHUNK_NOTE.format(part=part, parts=len(chunks)) + "\n\n" + chunk,
+            input_content
+        )
+        for part, chunk in enumerate(chunks, 1)
+    ]
+    logger.info("Analysing documents in chunks", extra={
+        "chunks": len(chunks),
+        "estimatedTokens": [estimate_text_tokens(prompt) for prompt in prompts]
+    })
+    
+    usage = {'inputTokens': 0, 'outputTokens': 0}
+    
+    def run(prompts: List[str]) -> List[str]:
+        with ThreadPoolExecutor(max_workers=CHUNK_CONCURRENCY) as executor:
+            results = list(executor.map(invoke_bedrock, prompts))
+        for result in results:
+            usage['inputTokens'] += result['inputTokens']
+            usage['outputTokens'] += result['outputTokens']
+        return [result['content'] for result in results]
+    
+    def reduce_prompt(findings: List[str]) -> str:
+        content = "\n\n".join(
+            "<findings-{0}>\n{1}\n</findings-{0}>".format(number, finding)
+            for number, finding in enumerate(findings, 1)
+        )
+        return fill_prompt(
+            prompt_template,
+            REDUCE_NOTE.format(parts=len(findings)) + "\n\n" + content,
+            input_content
+        )
+    
+    findings = run(prompts)
+    while len(findings) > 1 and estimate_text_tokens(reduce_prompt(findings)) > MAX_PROMPT_TOKENS:
+        groups = group_by_budget(findings, budget)
+        if len(groups) == len(findings):
+            # Every finding fills a prompt on its own, merging further cannot shrink them
+            break
+        logger.info("Merging findings in rounds", extra={"findings": len(findings), "groups": len(groups)})
+        findings = run([reduce_prompt(group) for group in groups])
+    
+    result = invoke_bedrock(reduce_prompt(findings), on_progress)
+    return {
+        **result,
+        'inputTokens': usage['inputTokens'] + result['inputTokens'],
+        'outputTokens': usage['outputTokens'] + result['outputTokens']
+    }
+
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
 def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
@@ -129,7 +296,11 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         analysis_id = event['analysisId']
         
         # Get analysis record
-        analysis = analysis_util.get_analysis(analysis_id)
+        analysis = analysis_util.get_analysis(
+            analysis_id,
+            fields=['objectsData', 'analysisParameters', 'documentType'],
+            validate=True
+        )
         objects_data = analysis.get('objectsData', [])
         
         # Get prompt from Bedrock
@@ -149,16 +320,22 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         variables = prepare_prompt_variables(analysis)
         
         # Replace all variables in the prompt template
-        clean_prompt = prompt_template.replace("{{document}}", document_content)
-        clean_prompt = clean_prompt.replace("{{input}}", variables['input'])
+        clean_prompt = fill_prompt(prompt_template, document_content, variables['input'])
+        estimated_tokens = estimate_text_tokens(clean_prompt)
         
         logger.info("Prepared clean prompt", extra={
             "cleanPrompt": clean_prompt,
+            "estimatedTokens": estimated_tokens,
             "variables": variables
         })
-                
-        # Invoke Bedrock
-        result = invoke_bedrock(clean_prompt)
+        
+        on_progress = partial_result_writer(analysis_id, prompt_name) if STREAM_PARTIAL_RESULTS else None
+        
+        # Invoke Bedrock, in chunks when the documents do not fit in one prompt
+        if estimated_tokens > MAX_PROMPT_TOKENS:
+            result = analyze_in_chunks(objects_data, prompt_template, variables['input'], on_progress)
+        else:
+            result = invoke_bedrock(clean_prompt, on_progress)
         
         # Prepare analysis results
         analysis_result = {
@@ -172,7 +349,14 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         # Update analysis record
         analysis_util.update_analysis(
             analysis_id=analysis_id,
-            updates={'analysisResults': [analysis_result]}
+            updates={'analysisResults': [analysis_result]},
+            returns=ReturnValues.NONE
+        )
+        
+        aggregates_util.record(
+            analysis.get('documentType'),
+            token_input=result['inputTokens'],
+            token_output=result['outputTokens']
         )
         
         logger.info("Analysis completed", extra={
@@ -184,6 +368,7 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         
         return {
             'analysisId': analysis_id,
+            'documentType': analysis.get('documentType'),
             'analysisResults': [analysis_result]
         }
         
@@ -4,12 +4,13 @@ import os
 import json
 import boto3
 from data.analysis import AnalysisUtil
+from data.cache import ItemCache
 
 logger = Logger()
 tracer = Tracer()
 
 sfn_client = boto3.client('stepfunctions')
-analysis_util = AnalysisUtil(os.environ['ANALYSIS_TABLE_NAME'])
+analysis_util = AnalysisUtil(os.environ['ANALYSIS_TABLE_NAME'], cache=ItemCache(ttl_seconds=300))
 
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
@@ -24,7 +25,11 @@ def lambda_handler(event: dict, context: LambdaContext) -> dict:
         status = event['status']
         
         # Get the analysis to retrieve the task token and onboardingId
-        analysis = analysis_util.get_analysis(analysis_id)
+        analysis = analysis_util.get_analysis(
+            analysis_id,
+            fields=['taskToken', 'analysisParameters.onboardingId'],
+            validate=True
+        )
         if not analysis:
             raise ValueError(f"Analysis not found: {analysis_id}")
             
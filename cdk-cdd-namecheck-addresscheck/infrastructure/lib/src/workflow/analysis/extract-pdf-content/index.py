@@ -1,93 +1,118 @@
 import os
-import boto3
-import json
-import fitz  # PyMuPDF
-import io
-import base64
-from PIL import Image
-from typing import Dict, Any, Tuple
-from aws_lambda_powertools import Logger, Tracer
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Tuple
+from aws_lambda_powertools import Logger, Metrics, Tracer
+from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from data.analysis import AnalysisUtil
+from data.base import ReturnValues
+from data.aggregates import AggregatesUtil
+from data.extraction_cache import ExtractionCacheUtil
+from data.pages import PageStoreUtil
+from utilities.bedrock import BedrockRuntime
+from utilities.page_batching import OutputEstimator, PageGrouper, attribute_tokens, page_blocks, split_pages
+from utilities.prompt_cache import PromptCache
+from utilities.render import PageSource, RenderFailure, RenderedPage, render_pages, render_source
+from utilities.text_layer import TEXT_LAYER_MODE, PageKind, TextLayerMode
 
 logger = Logger()
 tracer = Tracer()
+metrics = Metrics(namespace="DigDoc", service="analysis")
 
-s3_client = boto3.client('s3')
-bedrock_client = boto3.client('bedrock-runtime')
-bedrock_agent = boto3.client('bedrock-agent')
+bedrock = BedrockRuntime()
+prompt_cache = PromptCache()
 analysis_util = AnalysisUtil(os.environ['ANALYSIS_TABLE_NAME'])
+aggregates_util = AggregatesUtil(os.environ['AGGREGATES_TABLE_NAME'])
 
 BUCKET_NAME = os.environ['BUCKET_NAME']
+page_store = PageStoreUtil(BUCKET_NAME)
+# Reuse results of identical pages across analyses
+extraction_cache = (
+    ExtractionCacheUtil(BUCKET_NAME)
+    if os.environ.get('EXTRACTION_CACHE_ENABLED', 'true').lower() == 'true' else None
+)
 MODEL_ID = "anthropic.claude-3-5-sonnet-20240620-v1:0"
+MAX_TOKENS = 4096
+# Concurrent Bedrock requests for a page batch
+BEDROCK_CONCURRENCY = int(os.environ.get('BEDROCK_CONCURRENCY', '4'))
+# Pages of a batch task sent in one Bedrock request, at most
+PAGES_PER_REQUEST = int(os.environ.get('PAGES_PER_REQUEST', '1'))
+# Estimated page input tokens (images or text layers) per request, at most
+MAX_REQUEST_INPUT_TOKENS = int(os.environ.get('MAX_REQUEST_INPUT_TOKENS', '16000'))
+# Output tokens per page, learned from extractions, sizes page groups
+output_estimator = OutputEstimator(float(os.environ.get('PAGE_OUTPUT_TOKENS', '1000')))
 PROMPT_ID = "arn:aws:bedrock:us-west-2:694900249028:prompt/BRWZQENLG9"
+# Stream replies so long generations are read as they are produced
+BEDROCK_STREAMING = os.environ.get('BEDROCK_STREAMING', 'true').lower() == 'true'
 
-@tracer.capture_method
 def retrieve_prompt() -> str:
-    """Retrieve prompt from Bedrock"""
-    try:
-        response = bedrock_agent.get_prompt(
-            promptIdentifier=PROMPT_ID
-        )
-        # Get the prompt text from the first variant's template configuration
-        variants = response.get('variants', [])
-        if variants and 'templateConfiguration' in variants[0]:
-            template_config = variants[0]['templateConfiguration']
-            if 'text' in template_config:
-                return template_config['text'].get('text', '')
-        raise ValueError("No valid prompt template found in response")
-    except Exception as e:
-        logger.exception(f"Error retrieving prompt {PROMPT_ID}")
-        raise
+    """Retrieve the prompt template, cached across pages and invocations"""
+    return prompt_cache.get_text(PROMPT_ID)
 
-@tracer.capture_method
-def process_pdf_page(pdf_document: fitz.Document, page_num: int) -> Tuple[str, str]:
-    """Process a PDF page to extract text and enhanced image"""
-    try:
-        # Get text content
-        page = pdf_document.load_page(page_num - 1)  # PyMuPDF uses 0-based indexing
-        text_content = page.get_text()
-        
-        # Get enhanced image
-        pix = page.get_pixmap()
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        img = img.resize((img.width * 2, img.height * 2), Image.LANCZOS)  # 2x enlargement
-        
-        buffered = io.BytesIO()
-        img.save(buffered, format="JPEG", quality=100)
-        img_str = base64.b64encode(buffered.getvalue()).decode('utf-8')
-        
-        return text_content, img_str
-        
-    except Exception as e:
-        logger.exception(f"Error processing page {page_num}")
-        raise
+def invoke_model(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Invoke the model, streamed unless BEDROCK_STREAMING is off"""
+    if BEDROCK_STREAMING:
+        return bedrock.invoke_model_stream(MODEL_ID, request)
+    return bedrock.invoke_model(MODEL_ID, request)
 
 @tracer.capture_method
-def get_page_content(bucket: str, key: str, page_number: int) -> Tuple[str, str]:
-    """Get content from a specific page of a PDF"""
+def get_page_content(page_key: str, source_page: int, page_number: int) -> RenderedPage:
+    """Get content from a page of a split page PDF or source document
+    
+    Args:
+        page_key: Key of the page object written by extract-pdf-metadata
+        source_page: Page to read within that object
+        page_number: Page number within the analysed document
+    """
     try:
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        pdf_content = response['Body'].read()
+        pdf_content = page_store.get_page(page_key)
         
         # Use memory buffer to avoid disk I/O
-        with fitz.open(stream=pdf_content, filetype="pdf") as pdf_document:
-            return process_pdf_page(pdf_document, page_number)
+        return render_source(PageSource(page_number, pdf_content, source_page))
             
     except Exception as e:
-        logger.exception(f"Error extracting content from page {page_number} of {key}")
+        logger.exception(f"Error extracting content from page {source_page} of {page_key}")
         raise
 
 @tracer.capture_method(capture_response=False)
-def extract_page_content(text_content: str, image_content: str, page_num: int, total_pages: int) -> Dict[str, Any]:
-    """Extract structured content from a page using Bedrock"""
+def extract_page_content(
+    text_content: str,
+    image_content: Optional[str],
+    page_num: int,
+    total_pages: int,
+    prompt_text: Optional[str] = None,
+    media_type: str = "image/jpeg"
+) -> Dict[str, Any]:
+    """Extract structured content from a page using Bedrock
+    
+    Without an image the page's text layer, converted to markdown, is sent
+    in its place.
+    """
     try:
         # Retrieve prompt from Bedrock Agent
-        prompt_text = retrieve_prompt()
+        prompt_text = prompt_text or retrieve_prompt()
+        
+        if image_content is None:
+            page_content = {
+                "type": "text",
+                "text": (
+                    "The page is provided as its text layer converted to markdown "
+                    f"instead of an image:\n\n<page>\n{text_content}\n</page>"
+                )
+            }
+        else:
+            page_content = {
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": media_type,
+                    "data": image_content
+                }
+            }
         
         request = {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 4096,
+            "max_tokens": MAX_TOKENS,
             "messages": [
                 {
                     "role": "user",
@@ -96,25 +121,13 @@ def extract_page_content(text_content: str, image_content: str, page_num: int, t
                             "type": "text",
                             "text": prompt_text
                         },
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/jpeg",
-                                "data": image_content
-                            }
-                        }
+                        page_content
                     ]
                 }
             ]
         }
 
-        response = bedrock_client.invoke_model(
-            modelId=MODEL_ID,
-            body=json.dumps(request)
-        )
-
-        response_body = json.loads(response['body'].read())
+        response_body = invoke_model(request)
         extracted_content = response_body['content'][0]['text']
         
         # Get token counts from Bedrock response
@@ -131,26 +144,315 @@ def extract_page_content(text_content: str, image_content: str, page_num: int, t
         logger.exception(f"Error extracting content for page {page_num} using Bedrock")
         raise
 
+def prepare_page(rendered: RenderedPage) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Resolve a page without the model when possible
+    
+    Born-digital pages in markdown mode use their conversion, other pages
+    are looked up in the extraction cache, keyed by the model, the prompt
+    and the rendered page; ``cached`` in the result tells whether it was
+    reused.
+    
+    Returns:
+        Tuple of (result or None, extraction cache key for the model result)
+    """
+    if rendered.kind == PageKind.TEXT and TEXT_LAYER_MODE == TextLayerMode.MARKDOWN:
+        return {
+            'content': rendered.text,
+            'tokenInput': 0,
+            'tokenOutput': 0
+        }, None
+    
+    if not extraction_cache:
+        return None, None
+    
+    prompt = prompt_cache.get(PROMPT_ID)
+    cache_key = ExtractionCacheUtil.content_key(
+        MODEL_ID,
+        prompt['version'],
+        prompt['promptText'],
+        rendered.kind.value,
+        rendered.media_type,
+        rendered.image or rendered.text
+    )
+    cached = extraction_cache.get(cache_key)
+    if cached:
+        return {**cached, 'cached': True}, cache_key
+    return None, cache_key
+
+def store_result(cache_key: Optional[str], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Cache a model result and mark it as not reused"""
+    if cache_key:
+        extraction_cache.put(cache_key, result)
+    return {**result, 'cached': False}
+
+def extract_single_page(rendered: RenderedPage, cache_key: Optional[str], total_pages: int) -> Dict[str, Any]:
+    """Extract a page with its own Bedrock request"""
+    result = extract_page_content(
+        rendered.text,
+        rendered.image,
+        rendered.page_number,
+        total_pages,
+        retrieve_prompt(),
+        rendered.media_type or "image/jpeg"
+    )
+    output_estimator.observe(result['tokenOutput'])
+    return store_result(cache_key, result)
+
+@tracer.capture_method(capture_response=False)
+def extract_page(rendered: RenderedPage, total_pages: int) -> Dict[str, Any]:
+    """Extract a rendered page, without the model when prepare_page can"""
+    result, cache_key = prepare_page(rendered)
+    if result is not None:
+        return result
+    return extract_single_page(rendered, cache_key, total_pages)
+
+@tracer.capture_method(capture_response=False)
+def extract_page_group(
+    group: List[Tuple[RenderedPage, Optional[str]]],
+    total_pages: int
+) -> Dict[int, Dict[str, Any]]:
+    """Extract several pages with one Bedrock request
+    
+    The prompt is sent once followed by every page between numbered page
+    tags, and the tagged output is split back into per-page results with
+    the request's tokens attributed to the pages. Pages missing from the
+    output are extracted on their own.
+    
+    Args:
+        group: Pages with their extraction cache keys
+        total_pages: Pages in the document
+    
+    Returns:
+        Page number to result
+    """
+    if len(group) == 1:
+        rendered, cache_key = group[0]
+        return {rendered.page_number: extract_single_page(rendered, cache_key, total_pages)}
+    
+    pages = [rendered for rendered, _ in group]
+    page_numbers = [rendered.page_number for rendered in pages]
+    try:
+        request = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": MAX_TOKENS,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": retrieve_prompt()
+                        },
+                        *page_blocks(pages)
+                    ]
+                }
+            ]
+        }
+        
+        response_body = invoke_model(request)
+        contents = split_pages(response_body['content'][0]['text'], page_numbers)
+        input_tokens = response_body.get('usage', {}).get('input_tokens', 0)
+        output_tokens = response_body.get('usage', {}).get('output_tokens', 0)
+        output_estimator.observe(output_tokens, len(pages))
+        tokens = attribute_tokens(pages, contents, input_tokens, output_tokens)
+        
+    except Exception as e:
+        logger.exception(f"Error extracting content for pages {page_numbers} using Bedrock")
+        raise
+    
+    results = {}
+    for rendered, cache_key in group:
+        number = rendered.page_number
+        if number in contents:
+            results[number] = store_result(cache_key, {
+                'content': contents[number],
+                'tokenInput': tokens[number][0],
+                'tokenOutput': tokens[number][1]
+            })
+        else:
+            # The page's share of the group request was billed too
+            result = extract_single_page(rendered, cache_key, total_pages)
+            results[number] = {
+                **result,
+                'tokenInput': result['tokenInput'] + tokens[number][0],
+                'tokenOutput': result['tokenOutput'] + tokens[number][1]
+            }
+    
+    logger.info("Extracted page group", extra={
+        "pages": page_numbers,
+        "missingPages": [number for number in page_numbers if number not in contents],
+        "stopReason": response_body.get('stop_reason'),
+        "tokenInput": input_tokens,
+        "tokenOutput": output_tokens
+    })
+    return results
+
+def record_cache_metrics(results: List[Dict[str, Any]]) -> None:
+    """Count extraction cache hits and misses, hit rate is hits / (hits + misses)"""
+    lookups = [result['cached'] for result in results if 'cached' in result]
+    if lookups:
+        metrics.add_metric(name="ExtractionCacheHits", unit=MetricUnit.Count, value=sum(lookups))
+        metrics.add_metric(name="ExtractionCacheMisses", unit=MetricUnit.Count, value=len(lookups) - sum(lookups))
+
+@tracer.capture_method(capture_response=False)
+def process_page_batch(analysis_id: str, document_type: Optional[str], task: Dict[str, Any]) -> Dict[str, Any]:
+    """Render the pages of a batch task in parallel and stream them into Bedrock
+    
+    Pages are rendered across worker processes; rendered pages are grouped
+    into multi-page requests (up to PAGES_PER_REQUEST, sized by
+    PageGrouper) and each group is sent to Bedrock as soon as it is full.
+    Results are written to the analysis as they complete. A page that
+    fails to render or extract fails the task after every other page is
+    stored, so a retry re-processes the whole batch.
+    """
+    object_key = task['objectKey']
+    total_pages = task['totalPages']
+    
+    # Split page objects are small, fetch them concurrently
+    with ThreadPoolExecutor(max_workers=len(task['pages'])) as executor:
+        contents = list(executor.map(
+            lambda page: page_store.get_page(page.get('pageKey') or object_key),
+            task['pages']
+        ))
+    sources = [
+        PageSource(page['pageNumber'], content, page.get('sourcePage') or page['pageNumber'])
+        for page, content in zip(task['pages'], contents)
+    ]
+    
+    processed: List[Dict[str, Any]] = []
+    failed: List[int] = []
+    
+    def store_page(rendered: RenderedPage, result: Dict[str, Any]) -> None:
+        analysis_util.update_page_content(
+            analysis_id=analysis_id,
+            object_key=object_key,
+            page_number=rendered.page_number,
+            content=result['content'],
+            token_input=result['tokenInput'],
+            token_output=result['tokenOutput'],
+            returns=ReturnValues.NONE
+        )
+        processed.append({
+            'pageNumber': rendered.page_number,
+            'pageKind': rendered.kind.value,
+            'cached': result.get('cached', False),
+            'tokenInput': result['tokenInput'],
+            'tokenOutput': result['tokenOutput']
+        })
+    
+    grouper = PageGrouper(PAGES_PER_REQUEST, MAX_TOKENS, MAX_REQUEST_INPUT_TOKENS, output_estimator)
+    with ThreadPoolExecutor(max_workers=BEDROCK_CONCURRENCY) as executor:
+        futures = {}
+        resolved = []
+        
+        def submit(group: Optional[List[Tuple[RenderedPage, Optional[str]]]]) -> None:
+            if group:
+                futures[executor.submit(extract_page_group, group, total_pages)] = group
+        
+        for rendered in render_pages(sources):
+            if isinstance(rendered, RenderFailure):
+                failed.append(rendered.page_number)
+                continue
+            try:
+                result, cache_key = prepare_page(rendered)
+            except Exception:
+                logger.exception("Error preparing page", extra={"page": rendered.page_number})
+                failed.append(rendered.page_number)
+                continue
+            if result is not None:
+                resolved.append((rendered, result))
+                continue
+            # Send the previous group once this page no longer fits in it
+            submit(grouper.add(rendered, (rendered, cache_key)))
+        submit(grouper.flush())
+        
+        for rendered, result in resolved:
+            store_page(rendered, result)
+        
+        for future in as_completed(futures):
+            group = futures[future]
+            try:
+                results = future.result()
+            except Exception:
+                failed.extend(rendered.page_number for rendered, _ in group)
+                continue
+            for rendered, _ in group:
+                store_page(rendered, results[rendered.page_number])
+    
+    # Cached pages report their original token counts but were not billed again
+    billed = [page for page in processed if not page['cached']]
+    token_input = sum(page['tokenInput'] for page in billed)
+    token_output = sum(page['tokenOutput'] for page in billed)
+    text_layer_pages = sum(1 for page in processed if page['pageKind'] == PageKind.TEXT.value)
+    record_cache_metrics(processed)
+    
+    logger.info("Processed page batch", extra={
+        "analysisId": analysis_id,
+        "objectKey": object_key,
+        "pageCount": len(processed),
+        "textLayerPages": text_layer_pages,
+        "cachedPages": len(processed) - len(billed),
+        "failedPages": failed,
+        "tokenInput": token_input,
+        "tokenOutput": token_output
+    })
+    
+    if failed:
+        raise RuntimeError(f"Failed to extract pages {sorted(failed)} of {object_key}")
+    
+    # Only a successful task counts, the state machine retries failed ones
+    # with the whole batch and would count its stored pages again
+    aggregates_util.record(
+        document_type,
+        pages=len(processed),
+        token_input=token_input,
+        token_output=token_output,
+        text_layer_pages=text_layer_pages,
+        cached_pages=len(processed) - len(billed)
+    )
+    
+    return {
+        'analysisId': analysis_id,
+        'objectKey': object_key,
+        'pages': sorted(processed, key=lambda page: page['pageNumber'])
+    }
+
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
+@metrics.log_metrics
 def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
-    """Lambda handler for extracting content from a single page"""
+    """Lambda handler for extracting content from a page or a batch of pages
+    
+    The page task from extract-pdf-metadata is passed as ``task``; batch
+    tasks list their pages under ``pages``.
+    """
     try:
         analysis_id = event['analysisId']
-        object_key = event['objectKey']
-        page_number = event['pageNumber']
-        total_pages = event['totalPages']
+        task = event.get('task', event)
+        
+        if 'pages' in task:
+            return process_page_batch(analysis_id, event.get('documentType'), task)
         
-        # Get page content from PDF
-        text_content, image_content = get_page_content(BUCKET_NAME, object_key, page_number)
+        object_key = task['objectKey']
+        page_number = task['pageNumber']
+        total_pages = task['totalPages']
         
-        # Extract content using Bedrock
-        result = extract_page_content(text_content, image_content, page_number, total_pages)
+        # Get page content from the split page, tasks from before splitting read the source
+        rendered = get_page_content(
+            task.get('pageKey') or object_key,
+            task.get('sourcePage') or page_number,
+            page_number
+        )
+        
+        # Extract content using Bedrock, or the text layer alone
+        result = extract_page(rendered, total_pages)
         
         logger.info(f"Processed page {page_number}", extra={
             "analysisId": analysis_id,
             "objectKey": object_key,
             "page": page_number,
+            "pageKind": rendered.kind.value,
+            "cached": result.get('cached', False),
             "tokenInput": result['tokenInput'],
             "tokenOutput": result['tokenOutput']
         })
@@ -162,8 +464,21 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
             page_number=page_number,
             content=result['content'],
             token_input=result['tokenInput'],
-            token_output=result['tokenOutput']
+            token_output=result['tokenOutput'],
+            returns=ReturnValues.NONE
+        )
+        
+        # Cached pages report their original token counts but were not billed again
+        cached = result.get('cached', False)
+        aggregates_util.record(
+            event.get('documentType'),
+            pages=1,
+            token_input=0 if cached else result['tokenInput'],
+            token_output=0 if cached else result['tokenOutput'],
+            text_layer_pages=int(rendered.kind == PageKind.TEXT),
+            cached_pages=int(cached)
         )
+        record_cache_metrics([result])
         
         return {
             'analysisId': analysis_id,
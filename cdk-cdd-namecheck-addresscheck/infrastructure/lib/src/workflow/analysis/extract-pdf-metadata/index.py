@@ -1,47 +1,38 @@
 import os
-import boto3
-import PyPDF2
-from io import BytesIO
 from typing import Dict, Any, List
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from data.analysis import AnalysisUtil
+from data.base import ReturnValues
+from data.pages import PageStoreUtil
 
 logger = Logger()
 tracer = Tracer()
 
-s3_client = boto3.client('s3')
 analysis_util = AnalysisUtil(os.environ['ANALYSIS_TABLE_NAME'])
 BUCKET_NAME = os.environ['BUCKET_NAME']
+page_store = PageStoreUtil(BUCKET_NAME)
+# Pages per Map task, above 1 extract-pdf-content renders each batch in parallel
+PAGE_BATCH_SIZE = int(os.environ.get('PAGE_BATCH_SIZE', '1'))
 
-@tracer.capture_method
-def extract_pdf_metadata(bucket: str, key: str) -> Dict[str, Any]:
-    """Extract metadata from PDF file in S3"""
-    try:
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        pdf_content = response['Body'].read()
-        
-        pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_content))
-        num_pages = len(pdf_reader.pages)
-        
-        # Create page tasks for this object
-        page_tasks = []
-        for page_num in range(1, num_pages + 1):
-            page_tasks.append({
-                'objectKey': key,
-                'pageNumber': page_num,
-                'totalPages': num_pages
-            })
-        
-        return {
-            'object': key,
-            'numberOfPages': num_pages,
-            'pageTasks': page_tasks  # Tasks for this object's pages
+def batch_page_tasks(object_tasks: List[Dict[str, Any]], batch_size: int) -> List[Dict[str, Any]]:
+    """Group the page tasks of one object into batch tasks"""
+    if batch_size <= 1:
+        return object_tasks
+    return [
+        {
+            'objectKey': batch[0]['objectKey'],
+            'totalPages': batch[0]['totalPages'],
+            'pages': [
+                {key: task[key] for key in ('pageNumber', 'pageKey', 'sourcePage')}
+                for task in batch
+            ]
         }
-        
-    except Exception as e:
-        logger.exception(f"Error extracting PDF metadata from {key}")
-        raise
+        for batch in (
+            object_tasks[start:start + batch_size]
+            for start in range(0, len(object_tasks), batch_size)
+        )
+    ]
 
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
@@ -57,25 +48,22 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         
         for obj_data in objects_data:
             key = obj_data['object']
-            metadata = extract_pdf_metadata(BUCKET_NAME, key)
+            # Download once and split, page tasks then read only their own page
+            object_tasks = page_store.split_object(analysis_id, key)
             processed_objects.append({
-                'object': metadata['object'],
-                'numberOfPages': metadata['numberOfPages'],
+                'object': key,
+                'numberOfPages': len(object_tasks),
                 'data': []  # Initialize empty data array for pages
             })
             
             # Add this object's page tasks to the overall list
-            for page_num in range(1, metadata['numberOfPages'] + 1):
-                page_tasks.append({
-                    'objectKey': key,
-                    'pageNumber': page_num,
-                    'totalPages': metadata['numberOfPages']
-                })
+            page_tasks.extend(batch_page_tasks(object_tasks, PAGE_BATCH_SIZE))
         
         # Update analysis with metadata
         analysis_util.update_analysis(
             analysis_id=analysis_id,
-            updates={'objectsData': processed_objects}
+            updates={'objectsData': processed_objects},
+            returns=ReturnValues.NONE
         )
         
         logger.info("PDF metadata extracted", extra={
@@ -86,6 +74,7 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         
         return {
             'analysisId': analysis_id,
+            'documentType': event.get('documentType'),
             'objectsData': processed_objects,
             'pageTasks': page_tasks  # All tasks for Map state
         }
@@ -3,11 +3,14 @@ from typing import Dict, Any
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from data.analysis import AnalysisUtil, AnalysisStatus
+from data.base import ReturnValues
+from data.aggregates import AggregatesUtil
 
 logger = Logger()
 tracer = Tracer()
 
 analysis_util = AnalysisUtil(os.environ['ANALYSIS_TABLE_NAME'])
+aggregates_util = AggregatesUtil(os.environ['AGGREGATES_TABLE_NAME'])
 
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
@@ -23,7 +26,18 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         if 'objectsData' in event:
             updates['objectsData'] = event['objectsData']
         
-        result = analysis_util.update_analysis(analysis_id, updates)
+        # Only fetch the item back when the next state needs objectsData
+        returns = ReturnValues.ALL_NEW if event.get('includeObjectsData') else ReturnValues.NONE
+        result = analysis_util.update_analysis(
+            analysis_id,
+            updates,
+            returns=returns,
+            document_type=event.get('documentType')
+        )
+        document_type = result.get('documentType', event.get('documentType'))
+        
+        if status == AnalysisStatus.COMPLETED:
+            aggregates_util.record(document_type, analyses_completed=1)
         
         logger.info("Analysis status updated", extra={
             "analysisId": analysis_id,
@@ -33,7 +47,8 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         return {
             'analysisId': analysis_id,
             'status': status,
-            'objectsData': result.get('objectsData', [])
+            'documentType': document_type,
+            'objectsData': result.get('objectsData', updates.get('objectsData', []))
         }
         
     except Exception as e:
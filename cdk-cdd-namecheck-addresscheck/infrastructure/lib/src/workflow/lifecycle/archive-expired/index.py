@@ -0,0 +1,77 @@
+import os
+from typing import Dict, Any
+from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from data.archive import ArchiveUtil, year_month_of
+from data.chat import ChatUtil
+from data.codec import AttributeCodec
+from utilities.models import deserialize
+
+logger = Logger()
+tracer = Tracer()
+
+archive_util = ArchiveUtil(os.environ['ARCHIVE_BUCKET_NAME'])
+chat_util = ChatUtil(os.environ['ANALYSIS_TABLE_NAME'])
+codec = AttributeCodec.from_env()
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """Archives analysis items deleted by DynamoDB TTL
+    
+    The event source mapping only forwards REMOVE records made by the
+    DynamoDB service principal, i.e. TTL expirations. Chat messages of an
+    expired analysis are archived with it and deleted only once the
+    archive is written. Object names come from the first record of the
+    batch, so a retried batch finds its objects and does not archive
+    again the messages an earlier attempt already deleted.
+    """
+    try:
+        records = event.get('Records', [])
+        items = []
+        conversations = []
+        for record in records:
+            old_image = record.get('dynamodb', {}).get('OldImage')
+            if not old_image:
+                continue
+            item = {key: deserialize(value) for key, value in old_image.items()}
+            archived_at = record['dynamodb'].get('ApproximateCreationDateTime')
+            item['archivedAt'] = archived_at
+            items.append(codec.decode_item(item))
+            
+            if item.get('sk') == 'METADATA':
+                conversation = chat_util.get_conversation(item['analysisId'])
+                conversations.append((item['analysisId'], conversation))
+                # Messages are partitioned with their analysis in the archive
+                for stored in conversation:
+                    message = dict(stored)
+                    for field in ('content', 'summary'):
+                        if field in message:
+                            message[field] = codec.decode_text(message[field])
+                    message.update(
+                        yearMonth=year_month_of(item),
+                        documentType=item.get('documentType'),
+                        archivedAt=archived_at
+                    )
+                    items.append(message)
+        
+        batch_id = records[0]['eventID'] if records else context.aws_request_id
+        keys = archive_util.archive(items, batch_id) if items else []
+        
+        for analysis_id, conversation in conversations:
+            chat_util.delete_conversation(analysis_id, conversation)
+        
+        logger.info("Archived expired analyses", extra={
+            "recordCount": len(records),
+            "itemCount": len(items),
+            "keys": keys
+        })
+        
+        return {
+            'archived': len(items),
+            'keys': keys
+        }
+        
+    except Exception as e:
+        logger.exception("Error archiving expired analyses")
+        raise
@@ -1,44 +1,56 @@
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 import os
-from data.onboarding_request import OnboardingRequestUtil
+from typing import Any, Dict
+from data.onboarding_request import OnboardingRequestUtil, OnboardingStatus
 from data.analysis import AnalysisUtil, AnalysisStatus
-from utilities.types import AnalysisItem
+from data.transaction import TransactionWriter, idempotency_token
+from utilities.exceptions import TransactionTokenMismatchError
 
 logger = Logger()
 tracer = Tracer()
 onboarding_util = OnboardingRequestUtil(os.environ['ONBOARDING_TABLE_NAME'])
 analysis_util = AnalysisUtil(os.environ['ANALYSIS_TABLE_NAME'])
 
+def handoff(request_id: str, analysis_id: str, updates: Dict[str, Any]) -> TransactionWriter:
+    """Transaction moving the onboarding request to CHECKING and starting its analysis"""
+    transaction = TransactionWriter()
+    onboarding_util.transact_update_status(transaction, request_id, OnboardingStatus.CHECKING)
+    analysis_util.transact_update(transaction, analysis_id, updates)
+    return transaction
+
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
 def lambda_handler(event: dict, context: LambdaContext) -> dict:
     """
-    Updates analysis status to STARTED and objectsData for the onboarding request
+    Moves the onboarding request to CHECKING and starts its analysis in one transaction
     """
     try:
         logger.info("Received event", extra={"event": event})
-        
-        # Get request_id and task token from the event
-        request_id = event['requestId']
+
+        # Get request_id from the stream record pk (format: REQUEST#uuid) and the task token
+        request_id = event.get('requestId') or event['pk'].split('#')[1]
         task_token = event['taskToken']
-            
+
         logger.info("Analyzing document", extra={"requestId": request_id})
-        
+
         # Get onboarding request to find analysisId and documents
-        onboarding_request = onboarding_util.get_request(request_id)
+        onboarding_request = onboarding_util.get_request(
+            request_id,
+            fields=['analysisId', 'documents', 'firstName', 'middleName', 'lastName', 'address']
+        )
         analysis_id = onboarding_request.get('analysisId')
         documents = onboarding_request.get('documents', [])
-        
+
         if not analysis_id:
             raise ValueError(f"No analysisId found for request {request_id}")
-            
+
         if not documents:
             raise ValueError(f"No documents found for request {request_id}")
-            
+
         # Construct objectsData from documents
         objects_data = [{'object': doc, 'data': []} for doc in documents]
-        
+
         # Construct analysisParameters from onboarding request
         analysis_parameters = {
             'firstName': onboarding_request.get('firstName'),
@@ -47,7 +59,7 @@ def lambda_handler(event: dict, context: LambdaContext) -> dict:
             'address': onboarding_request.get('address'),
             'onboardingId': request_id  # Include onboardingId in analysisParameters
         }
-        
+
         # Update analysis with all required fields
         updates = {
             'objectsData': objects_data,
@@ -55,18 +67,26 @@ def lambda_handler(event: dict, context: LambdaContext) -> dict:
             'taskToken': task_token,  # Store task token with analysis
             'analysisParameters': analysis_parameters
         }
-        
-        updated_analysis: AnalysisItem = analysis_util.update_analysis(
-            analysis_id=analysis_id,
-            updates=updates
-        )
-        
+
+        # Apply both state changes atomically, the task token keeps retries idempotent
+        try:
+            handoff(request_id, analysis_id, updates).commit(token=idempotency_token(task_token))
+        except TransactionTokenMismatchError:
+            # An earlier attempt used the token with other timestamps. It was
+            # applied if the analysis holds this task token, otherwise it was
+            # cancelled and the handoff is applied now without the token.
+            analysis = analysis_util.get_analysis(analysis_id, fields=['taskToken'], validate=True)
+            if analysis and analysis.get('taskToken') == task_token:
+                logger.info("Handoff already applied", extra={"requestId": request_id, "analysisId": analysis_id})
+            else:
+                handoff(request_id, analysis_id, updates).commit()
+
         return {
             "analysisId": analysis_id,
             "onboardingId": request_id,
             "taskToken": task_token
         }
-        
+
     except Exception as e:
         logger.exception("Error analyzing document")
-        raise
\ No newline at end of file
+        raise
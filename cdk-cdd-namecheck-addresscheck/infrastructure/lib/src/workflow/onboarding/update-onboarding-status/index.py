@@ -3,6 +3,7 @@ from typing import Dict, Any
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from data.onboarding_request import OnboardingRequestUtil, OnboardingStatus
+from data.base import ReturnValues
 
 logger = Logger()
 tracer = Tracer()
@@ -19,7 +20,8 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         # Update onboarding status to READY_TO_CHECK using dedicated status update method
         onboarding_util.update_request_status(
             unique_id=onboarding_id,
-            status=OnboardingStatus.READY_TO_CHECK
+            status=OnboardingStatus.READY_TO_CHECK,
+            returns=ReturnValues.NONE
         )
         
         logger.info("Updated onboarding status", extra={
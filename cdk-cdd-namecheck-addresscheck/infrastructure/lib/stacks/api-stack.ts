@@ -4,6 +4,8 @@ import * as lambda from "aws-cdk-lib/aws-lambda";
 import { Construct } from "constructs";
 import { RestApi } from "../constructs/api/gateway/rest-api";
 import { ListAnalysesFunction } from "../constructs/api/functions/analysis/list-analyses";
+import { ListMessagesFunction } from "../constructs/api/functions/analysis/list-messages";
+import { AppendMessageFunction } from "../constructs/api/functions/analysis/append-message";
 import { CreateAnalysisIdFunction } from "../constructs/api/functions/analysis/create-analysis-id";
 import { GenerateUrlsFunction } from "../constructs/api/functions/analysis/generate-urls";
 import { StartAnalysisFunction } from "../constructs/api/functions/analysis/start-analysis";
@@ -150,6 +152,7 @@ export class ApiStack extends cdk.Stack {
     const analysisResource = analysesResource.addResource("{analysis_id}");
     const uploadUrlsResource = analysisResource.addResource("upload-urls");
     const startResource = analysisResource.addResource("start");
+    const messagesResource = analysisResource.addResource("messages");
 
     // Create onboarding resources
     const onboardingResource = this.api.root.addResource("onboarding");
@@ -171,6 +174,24 @@ export class ApiStack extends cdk.Stack {
       commonLayer: this.apiLayer,
     });
 
+    const listMessagesFunction = new ListMessagesFunction(
+      this,
+      "ListMessages",
+      {
+        tableName: props.storageStack.analysisTable.tableName,
+        commonLayer: this.apiLayer,
+      }
+    );
+
+    const appendMessageFunction = new AppendMessageFunction(
+      this,
+      "AppendMessage",
+      {
+        tableName: props.storageStack.analysisTable.tableName,
+        commonLayer: this.apiLayer,
+      }
+    );
+
     const createAnalysisIdFunction = new CreateAnalysisIdFunction(
       this,
       "CreateAnalysisId",
@@ -259,6 +280,32 @@ export class ApiStack extends cdk.Stack {
       }
     );
 
+    messagesResource.addMethod(
+      "GET",
+      new apigateway.LambdaIntegration(listMessagesFunction.function, {
+        proxy: true,
+      }),
+      {
+        requestParameters: {
+          "method.request.path.analysis_id": true,
+          "method.request.querystring.limit": false,
+          "method.request.querystring.nextToken": false,
+        },
+      }
+    );
+
+    messagesResource.addMethod(
+      "POST",
+      new apigateway.LambdaIntegration(appendMessageFunction.function, {
+        proxy: true,
+      }),
+      {
+        requestParameters: {
+          "method.request.path.analysis_id": true,
+        },
+      }
+    );
+
     analysesResource.addMethod(
       "POST",
       new apigateway.LambdaIntegration(createAnalysisIdFunction.function, {
@@ -361,6 +408,7 @@ export class ApiStack extends cdk.Stack {
       "GenerateEmail",
       {
         commonLayer: this.apiLayer,
+        governorTableName: props.storageStack.governorTable.tableName,
       }
     );
 
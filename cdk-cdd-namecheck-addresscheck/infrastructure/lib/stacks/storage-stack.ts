@@ -3,7 +3,10 @@ import { Construct } from "constructs";
 import { AnalysisTable } from "../constructs/storage/tables/analysis-table";
 import { PromptsTable } from "../constructs/storage/tables/prompts-table";
 import { DocumentBucket } from "../constructs/storage/document-bucket";
+import { ArchiveBucket } from "../constructs/storage/archive-bucket";
 import { OnboardingRequestTable } from "../constructs/storage/tables/onboarding-request-table";
+import { AggregatesTable } from "../constructs/storage/tables/aggregates-table";
+import { GovernorTable } from "../constructs/storage/tables/governor-table";
 import { WebsiteBucket } from "../constructs/storage/website-bucket";
 import path = require("path");
 
@@ -11,7 +14,10 @@ export class StorageStack extends cdk.Stack {
   public readonly analysisTable: cdk.aws_dynamodb.Table;
   public readonly promptsTable: cdk.aws_dynamodb.Table;
   public readonly documentBucket: cdk.aws_s3.Bucket;
+  public readonly archiveBucket: cdk.aws_s3.Bucket;
   public readonly onboardingRequestTable: cdk.aws_dynamodb.Table;
+  public readonly aggregatesTable: cdk.aws_dynamodb.Table;
+  public readonly governorTable: cdk.aws_dynamodb.Table;
   public readonly publicWebsiteBucket: WebsiteBucket;
   public readonly adminPortalBucket: WebsiteBucket;
 
@@ -30,6 +36,10 @@ export class StorageStack extends cdk.Stack {
     const documentBucketConstruct = new DocumentBucket(this, "DocumentBucket");
     this.documentBucket = documentBucketConstruct.bucket;
 
+    // Create Archive S3 bucket for expired analyses
+    const archiveBucketConstruct = new ArchiveBucket(this, "ArchiveBucket");
+    this.archiveBucket = archiveBucketConstruct.bucket;
+
     // Create Onboarding Request Table
     const onboardingRequestTableConstruct = new OnboardingRequestTable(
       this,
@@ -37,6 +47,14 @@ export class StorageStack extends cdk.Stack {
     );
     this.onboardingRequestTable = onboardingRequestTableConstruct.table;
 
+    // Create Aggregates Table for token usage and throughput counters
+    const aggregatesTableConstruct = new AggregatesTable(this, "AggregatesTable");
+    this.aggregatesTable = aggregatesTableConstruct.table;
+
+    // Create Governor Table for Bedrock concurrency limits
+    const governorTableConstruct = new GovernorTable(this, "GovernorTable");
+    this.governorTable = governorTableConstruct.table;
+
     // Create public website bucket with CloudFront
     this.publicWebsiteBucket = new WebsiteBucket(this, "PublicWebsiteBucket", {
       websiteName: "digdoc-public",
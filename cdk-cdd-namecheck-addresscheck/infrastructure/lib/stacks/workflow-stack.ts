@@ -5,6 +5,7 @@ import { AnalysisStateMachine } from "../constructs/workflow/analysis/state-mach
 import { AnalysisPipe } from "../constructs/workflow/analysis/analysis-pipe";
 import { OnboardingStateMachine } from "../constructs/workflow/onboarding/state-machine";
 import { OnboardingPipe } from "../constructs/workflow/onboarding/onboarding-pipe";
+import { ArchiveExpiredFunction } from "../constructs/workflow/lifecycle/functions/archive-expired";
 import { StorageStack } from "./storage-stack";
 import * as path from "path";
 
@@ -47,6 +48,8 @@ export class WorkflowStack extends cdk.Stack {
       "AnalysisStateMachine",
       {
         tableName: props.storageStack.analysisTable.tableName,
+        aggregatesTableName: props.storageStack.aggregatesTable.tableName,
+        governorTableName: props.storageStack.governorTable.tableName,
         bucketName: props.storageStack.documentBucket.bucketName,
         commonLayer: this.workflowLayer,
       }
@@ -74,6 +77,13 @@ export class WorkflowStack extends cdk.Stack {
       stateMachine: onboardingWorkflow.stateMachine,
     });
 
+    // Archive analyses expired by TTL from the analysis table stream
+    new ArchiveExpiredFunction(this, "ArchiveExpiredFunction", {
+      table: props.storageStack.analysisTable,
+      archiveBucketName: props.storageStack.archiveBucket.bucketName,
+      commonLayer: this.workflowLayer,
+    });
+
     // Assign public properties
     this.analysisStateMachine = analysisWorkflow.stateMachine;
     this.onboardingStateMachine = onboardingWorkflow.stateMachine;
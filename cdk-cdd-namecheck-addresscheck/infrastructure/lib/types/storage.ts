@@ -16,14 +16,35 @@ export interface AnalysisTableItem {
     tokenInput: number;
     tokenOutput: number;
   }>;
-  chatHistory: Array<{
+  // Legacy inline history, new messages are ChatMessageTableItems
+  chatHistory?: Array<{
     role: "human" | "assistant";
     content: string;
     timestamp: string;
   }>;
   status: string;
-  yearMonth: string;
+  yearMonth?: string;
   createdAt: string;
   lastUpdatedAt: string;
   ttl?: number;
 }
+
+export interface ChatMessageTableItem {
+  pk: string; // ID#{analysisId}
+  sk: string; // CHAT#{timestamp}#{messageId}
+  analysisId: string;
+  messageId: string;
+  role: "human" | "assistant";
+  content: string;
+  timestamp: string;
+  metadata?: Record<string, unknown>;
+}
+
+export interface ChatSummaryTableItem {
+  pk: string; // ID#{analysisId}
+  sk: string; // CHATSUMMARY
+  analysisId: string;
+  summary: string;
+  summarizedThrough: string;
+  lastUpdatedAt: string;
+}